@@ -0,0 +1,333 @@
+'''Deterministic, latency-configurable stand-in for the LLM.'''
+
+from collections.abc import Callable
+from contextlib import contextmanager
+from typing import Iterator
+import asyncio
+import hashlib
+import random
+import threading
+import time
+
+from sqlscope import Query
+
+from sql_assignment_generator import llm
+from sql_assignment_generator.assignments import Dataset
+from sql_assignment_generator.assignments.exercise import strings
+from sql_assignment_generator.assignments.exercise.validation import validate_locally
+from sql_assignment_generator.db import get_database, QueryExecutionError
+from sql_assignment_generator.difficulty_level import DifficultyLevel
+from sql_assignment_generator.error_requirements import ERROR_REQUIREMENTS_MAP
+from sql_assignment_generator.exceptions import ConstraintValidationError
+from sql_assignment_generator.llm.message import MessageRole
+from sql_assignment_generator.llm.usage import record_request
+
+
+_TABLES = ['customers', 'products', 'orders', 'suppliers', 'employees', 'stores']
+
+_SIZES = {
+    # tables, columns per table, rows per table
+    DifficultyLevel.EASY: (2, 4, 3),
+    DifficultyLevel.MEDIUM: (4, 5, 4),
+    DifficultyLevel.HARD: (6, 6, 5),
+}
+
+
+def canned_dataset(difficulty: DifficultyLevel) -> llm.models.Schema:
+    '''
+    A dataset satisfying the base schema constraints of `difficulty`,
+    with shared non-key column names, long column names and CHECK constraints.
+    '''
+
+    n_tables, n_columns, n_rows = _SIZES[difficulty]
+
+    schema_tables: list[str] = []
+    insert_commands: list[str] = []
+
+    for idx, table in enumerate(_TABLES[:n_tables]):
+        columns = [
+            ('id', 'INT PRIMARY KEY', lambda row: str(row)),
+            ('name', 'VARCHAR(50) NOT NULL', lambda row, table=table: f"'{table[:-1]} {row}'"),
+        ]
+        if idx > 0:
+            # each table references the previous one, so that joins are possible
+            parent = _TABLES[idx - 1]
+            columns.append((f'{parent[:-1]}_id', f'INT REFERENCES {parent}(id)', lambda row: str(row)))
+        columns += [
+            (f'{table}_reference_code', 'VARCHAR(20)', lambda row, table=table: f"'{table[:3].upper()}-{row:03d}'"),
+            ('score', 'INT CHECK (score >= 0)', lambda row: str(row * 10 % 7)),
+            ('last_updated_date', 'DATE', lambda row: 'NULL' if row % 3 == 0 else f"'2024-01-{row:02d}'"),
+        ]
+        columns = columns[:n_columns]
+
+        definitions = ',\n    '.join(f'{name} {type_}' for name, type_, _ in columns)
+        schema_tables.append(f'CREATE TABLE {table} (\n    {definitions}\n);')
+
+        rows = ',\n    '.join(
+            '(' + ', '.join(value(row) for _, _, value in columns) + ')'
+            for row in range(1, n_rows + 1)
+        )
+        column_names = ', '.join(name for name, _, _ in columns)
+        insert_commands.append(f'INSERT INTO {table} ({column_names}) VALUES\n    {rows};')
+
+    # the LLM models are pydantic dataclasses, which can only be built through validation
+    return llm.models.Schema.model_validate({'schema_tables': schema_tables, 'insert_commands': insert_commands})
+
+
+_N = 7
+'''The number filling the `QUERIES` templates when checking which constraints they satisfy.'''
+
+QUERIES = [
+    "SELECT name, score FROM customers WHERE score > {n}",
+    "SELECT c.name, p.name FROM customers c JOIN products p ON p.customer_id = c.id WHERE c.score > {n} AND p.score < 5",
+    "SELECT name FROM customers WHERE name LIKE 'cust%{n}' ORDER BY name",
+    "SELECT c.name AS customer_name, COUNT(*) AS products FROM customers c JOIN products p ON p.customer_id = c.id GROUP BY c.name HAVING COUNT(*) > {n} ORDER BY products DESC",
+    "SELECT name FROM customers WHERE last_updated_date IS NULL LIMIT {n}",
+    "SELECT name FROM customers WHERE last_updated_date IS NOT NULL AND score >= {n}",
+    "SELECT DISTINCT score FROM customers LIMIT {n}",
+    "SELECT name FROM customers WHERE id IN (SELECT customer_id FROM products WHERE score > {n})",
+    "SELECT name FROM customers c WHERE EXISTS (SELECT 1 FROM products p WHERE p.customer_id = c.id AND p.score > (SELECT AVG(score) FROM products WHERE id > {n}))",
+    "SELECT name FROM customers c WHERE NOT EXISTS (SELECT 1 FROM products p WHERE p.customer_id = c.id) LIMIT {n}",
+    "SELECT name FROM customers UNION SELECT name FROM products LIMIT {n}",
+    "SELECT name FROM customers UNION ALL SELECT name FROM products LIMIT {n}",
+    "SELECT AVG(score), MAX(score), MIN(score) FROM customers LIMIT {n}",
+    "SELECT c1.name, c2.name FROM customers c1 JOIN customers c2 ON c1.score = c2.score AND c1.id < c2.id LIMIT {n}",
+    "SELECT c.name FROM customers c LEFT JOIN products p ON p.customer_id = c.id WHERE p.id IS NULL LIMIT {n}",
+    "SELECT name, score * 2 + 1 AS doubled FROM customers WHERE score + 1 > {n} ORDER BY score ASC, name DESC",
+    "SELECT name FROM customers WHERE name = '' OR customers_reference_code <> 'REF-{n}'",
+    "SELECT name FROM customers WHERE score > ANY (SELECT score FROM products WHERE id > {n})",
+    "SELECT name FROM customers WHERE score BETWEEN 1 AND {n} AND score <> 3 AND name NOT LIKE '%9'",
+    "SELECT customer_id, SUM(score) FROM products GROUP BY customer_id LIMIT {n}",
+    "SELECT DISTINCT c.name FROM customers c JOIN products p ON p.customer_id = c.id WHERE c.score > {n} AND p.id < 10",
+    "SELECT COUNT(*) FROM customers WHERE score > {n} AND id < 10",
+    "SELECT name, score AS points FROM customers WHERE score > {n} AND id < 10 ORDER BY score DESC",
+    "SELECT id, name, score FROM customers WHERE score > {n} AND id < 10 ORDER BY name",
+    "SELECT c1.name, c2.name FROM customers c1 JOIN customers c2 ON c1.score = c2.score WHERE c1.id < c2.id AND c1.score > {n}",
+    "SELECT c.name, p.name FROM customers c LEFT JOIN products p ON p.customer_id = c.id WHERE c.score > {n} AND c.id < 10",
+    "SELECT name FROM customers WHERE score > {n} AND id < 10 UNION ALL SELECT name FROM products WHERE id > 1 AND customer_id < 3",
+    "SELECT c.score FROM customers c WHERE EXISTS (SELECT 1 FROM products p WHERE p.customer_id = c.id) LIMIT {n}",
+    "SELECT name FROM customers WHERE customers_reference_code IS NULL AND score > {n}",
+    "SELECT name FROM customers WHERE score > (SELECT MIN(score) FROM customers WHERE id > {n})",
+    "SELECT SUM(score) FROM customers WHERE id > {n}",
+    "SELECT AVG(score) FROM customers WHERE id > {n}",
+    "SELECT name FROM customers WHERE score IS NOT NULL AND score > {n}",
+    "SELECT name FROM customers WHERE NOT (score > {n}) AND id < 10",
+    "SELECT name, COUNT(*) FROM customers WHERE score > {n} GROUP BY name HAVING COUNT(*) >= 1",
+    "SELECT DISTINCT name, COUNT(*) FROM customers WHERE score > (SELECT MIN(score) FROM customers WHERE id > {n}) GROUP BY name, score",
+    "SELECT DISTINCT name, COUNT(*) FROM customers WHERE score > {n} GROUP BY name, score",
+    "SELECT name FROM customers WHERE score > {n} AND id < 10 GROUP BY name, score",
+    "SELECT c.name, COUNT(p.id) FROM customers c JOIN products p ON p.customer_id = c.id WHERE c.score > {n} AND p.score < 1000 GROUP BY c.name",
+    "SELECT COUNT(*), MAX(score) FROM customers WHERE name <> 'name {n}' AND name LIKE 'cust%' AND customers_reference_code <> 'REF-000'",
+    "SELECT COUNT(*), AVG(score) FROM customers WHERE score > {n} AND score < 1000 AND id > 0 AND id < 1000",
+    "SELECT COUNT(*), MAX(score) FROM customers WHERE last_updated_date IS NULL AND customers_reference_code IS NULL AND score > {n}",
+    "SELECT SUM(score), SUM(id) FROM customers WHERE score > {n}",
+    "SELECT AVG(score), AVG(id) FROM customers WHERE score > {n}",
+    "SELECT COUNT(*) FROM customers WHERE name LIKE '%cust%' AND score > {n}",
+    "SELECT COUNT(*) FROM customers WHERE name <> '' AND last_updated_date IS NOT NULL AND customers_reference_code IS NULL AND score > {n}",
+    "SELECT name FROM customers WHERE score >= ALL (SELECT score FROM customers) AND id IN (SELECT customer_id FROM products) AND score > ANY (SELECT score FROM products WHERE id > {n})",
+    "SELECT COUNT(*) FROM customers WHERE NOT (score > {n}) AND id < 1000",
+    "SELECT COUNT(*) FROM customers c WHERE NOT EXISTS (SELECT 1 FROM products p WHERE p.customer_id = c.id AND p.score > {n})",
+    "SELECT COUNT(*), MAX(score) FROM customers WHERE score > {n} AND id > 0 AND name <> ''",
+    "SELECT DISTINCT name, COUNT(*) FROM customers WHERE score > {n} AND id > 0 AND name <> '' GROUP BY name, score",
+    "SELECT name, customers_reference_code AS code, score AS points, COUNT(*) AS total FROM customers WHERE score > {n} AND id > 0 AND name <> '' GROUP BY name, customers_reference_code, score",
+    "SELECT name, score, customers_reference_code, COUNT(*) FROM customers WHERE score > {n} AND id > 0 AND name <> '' GROUP BY name, score, customers_reference_code ORDER BY name DESC, score DESC, customers_reference_code DESC",
+    "SELECT c1.name, COUNT(*), MAX(c2.score) FROM customers c1 JOIN customers c2 ON c1.score = c2.score WHERE c1.id < c2.id AND c1.score > {n} AND c2.name <> '' GROUP BY c1.name",
+    "SELECT name, COUNT(*) FROM customers WHERE score > {n} AND id > 0 AND name <> '' GROUP BY name UNION ALL SELECT name, COUNT(*) FROM products WHERE score > 0 GROUP BY name",
+    "SELECT c.name, COUNT(p.id) FROM customers c LEFT JOIN products p ON p.customer_id = c.id WHERE c.score > {n} AND c.id < 1000 GROUP BY c.name",
+    "SELECT COUNT(*), MAX(score), MIN(score) FROM customers WHERE score > (SELECT MIN(score) FROM products WHERE id > {n}) AND id > 0 AND id < 1000 AND name <> ''",
+    "SELECT COUNT(*), MAX(c.score), MIN(p.score) FROM customers c JOIN products p ON p.customer_id = c.id WHERE c.score > (SELECT MIN(score) FROM orders WHERE id > {n}) AND c.id > 0 AND p.id < 1000 AND c.name <> ''",
+    "SELECT SUM(score), SUM(id) FROM customers WHERE score > (SELECT MIN(score) FROM products WHERE id > {n}) AND id < 1000",
+    "SELECT AVG(score), AVG(id) FROM customers WHERE score > (SELECT MIN(score) FROM products WHERE id > {n}) AND id < 1000",
+    "SELECT COUNT(*) FROM customers WHERE name <> 'name {n}' AND name LIKE 'cust%' AND customers_reference_code <> 'REF-000' AND score > (SELECT MIN(score) FROM products)",
+    "SELECT COUNT(*), AVG(score) FROM customers WHERE score >= (SELECT MIN(score) FROM products WHERE id > {n}) AND score < 1000 AND id > 0 AND id < 1000 AND name <> '' AND name LIKE 'cust%'",
+    "SELECT COUNT(*), MAX(score) FROM customers WHERE last_updated_date IS NULL AND customers_reference_code IS NULL AND id IN (SELECT customer_id FROM products WHERE products_reference_code IS NULL AND id > {n})",
+    "SELECT COUNT(*) FROM customers WHERE name <> '' AND last_updated_date IS NOT NULL AND customers_reference_code IS NULL AND score > (SELECT MIN(score) FROM products WHERE id > {n})",
+    "SELECT name FROM customers WHERE score >= ALL (SELECT score FROM customers) AND id IN (SELECT customer_id FROM products) AND score > ANY (SELECT MIN(score) FROM products WHERE id > {n})",
+    "SELECT DISTINCT name FROM customers WHERE score > {n} AND id > 0 AND id IN (SELECT customer_id FROM products WHERE score > 0)",
+    "SELECT COUNT(*) FROM customers WHERE NOT (score > {n}) AND NOT (id > 1000) AND score > (SELECT MIN(score) FROM products)",
+    "SELECT COUNT(*), MAX(c.score) FROM customers c WHERE NOT EXISTS (SELECT 1 FROM products p WHERE p.customer_id = c.id AND p.score > {n}) AND NOT EXISTS (SELECT 1 FROM orders o WHERE o.id = c.id)",
+    "SELECT COUNT(*), MAX(c.score) FROM customers c WHERE EXISTS (SELECT 1 FROM products p WHERE p.customer_id = c.id AND p.score > {n}) AND EXISTS (SELECT 1 FROM orders o WHERE o.id = c.id)",
+    "SELECT c.name, COUNT(o.id) FROM customers c JOIN products p ON p.customer_id = c.id JOIN orders o ON o.product_id = p.id WHERE c.score > (SELECT MIN(score) FROM suppliers WHERE id > {n}) AND p.score < 1000 AND o.id > 0 GROUP BY c.name",
+    "SELECT name, COUNT(*) FROM customers WHERE score > (SELECT MIN(score) FROM products) AND id > {n} GROUP BY name HAVING COUNT(*) >= 1 AND MAX(score) > 0",
+    "SELECT name, score, customers_reference_code, last_updated_date, COUNT(*) FROM customers WHERE score > (SELECT MIN(score) FROM products WHERE id > {n}) AND id > 0 AND id < 1000 AND name <> '' GROUP BY name, score, customers_reference_code, last_updated_date ORDER BY name DESC, score DESC, customers_reference_code DESC",
+    "SELECT DISTINCT name, COUNT(*) FROM customers WHERE score > (SELECT MIN(score) FROM products WHERE id > {n}) AND id > 0 AND id < 1000 AND name <> '' GROUP BY name, score",
+    "SELECT name, score, customers_reference_code AS code, last_updated_date AS updated, id AS ident, COUNT(*) AS total FROM customers WHERE score > (SELECT MIN(score) FROM products WHERE id > {n}) AND id > 0 AND id < 1000 AND name <> '' GROUP BY name, score, customers_reference_code, last_updated_date, id",
+    "SELECT c1.name, COUNT(*), MAX(c2.score) FROM customers c1 JOIN customers c2 ON c2.id > c1.id WHERE c1.score > (SELECT MIN(score) FROM products WHERE id > {n}) AND c2.name <> '' AND c2.id < 1000 AND c1.id > 0 GROUP BY c1.name",
+    "SELECT name, COUNT(*) FROM customers WHERE score > (SELECT MIN(score) FROM products WHERE id > {n}) AND id > 0 AND id < 1000 AND name <> '' GROUP BY name UNION ALL SELECT name, COUNT(*) FROM products WHERE score > 0 GROUP BY name",
+    "SELECT c.name, COUNT(p.id) FROM customers c LEFT JOIN products p ON p.customer_id = c.id WHERE c.score > (SELECT MIN(score) FROM orders WHERE id > {n}) AND c.id < 1000 GROUP BY c.name",
+    "SELECT DISTINCT name, score FROM customers WHERE score > (SELECT MIN(score) FROM products WHERE id > {n}) AND id > 0 AND name <> ''",
+    "SELECT name FROM customers WHERE id IN (SELECT customer_id FROM products WHERE score > {n}) AND id > 0 AND name <> '' GROUP BY name, score, customers_reference_code",
+]
+'''
+Templates of candidate exercise solutions over `canned_dataset`, covering a wide range of query features.
+`{n}` is replaced by a number chosen for each answer, so that solutions to different exercises are not duplicates.
+Some templates reference columns that only exist at higher difficulty levels.
+'''
+
+
+def canned_solutions(difficulty: DifficultyLevel, *, samples: int = 20) -> dict[str, set[str]]:
+    '''
+    The templates in `QUERIES` satisfying each exercise constraint of the supported errors at `difficulty` on `canned_dataset`,
+    by the description of the constraint, as listed in the exercise prompt (see `strings.prompt_generate`).
+    Templates that reference tables or columns missing from the dataset, or that cannot be executed on the embedded SQLite
+    backend used by the benchmark (e.g. `ANY` and `ALL` subqueries), never satisfy any constraint.
+    Requirements may pick some of their constraints at random, so each one is sampled `samples` times.
+    '''
+
+    schema = canned_dataset(difficulty)
+    dataset = Dataset.from_sql('\n'.join(schema.schema_tables + schema.insert_commands), 'postgres')
+
+    queries: list[tuple[str, Query]] = []
+    for template in QUERIES:
+        sql = template.format(n=_N)
+        validation = validate_locally(sql, dataset.catalog, [], sql_dialect='postgres', language='en')
+        if validation.query is None or validation.unresolved:
+            continue
+
+        with get_database('', 0, '', '', 'postgres', embedded=True) as database:
+            try:
+                database.load_dataset(dataset)
+                database.execute(sql)
+            except QueryExecutionError:
+                continue
+        queries.append((template, validation.query))
+
+    solutions: dict[str, set[str]] = {}
+    for requirement_class in ERROR_REQUIREMENTS_MAP.values():
+        requirement = requirement_class(language='en')
+        for _ in range(samples):
+            for constraint in requirement.exercise_constraints(difficulty):
+                description = constraint.description.get('en')
+                if description in solutions:
+                    continue
+
+                solutions[description] = set()
+                for template, query in queries:
+                    try:
+                        constraint.validate(query)
+                    except ConstraintValidationError:
+                        continue
+                    solutions[description].add(template)
+
+    return solutions
+
+
+class FakeLLM:
+    '''
+    Scripted replacement for the `llm` package functions.
+
+    Answers are chosen deterministically from the conversation and the number of times it was already answered, so that
+    repeated runs perform the same work, while exercises with identical prompts still get different answers.
+    With probability `success_rate`, the first exercise solution is picked among those satisfying the constraints of the
+    requested exercise (see `canned_solutions`), otherwise from all of `QUERIES`, so that both accepted and rejected answers
+    are exercised. Later attempts at the same exercise always pick a satisfying solution, so that every exercise is generated.
+    Each solution fills its template with a number drawn along with it, so different requests get distinct solutions.
+    Each call sleeps for `latency` seconds (plus up to `jitter` seconds) to simulate network and inference time.
+    '''
+
+    def __init__(self, difficulty: DifficultyLevel, *, latency: float = 0.0, jitter: float = 0.0, seed: int = 0, success_rate: float = 0.5) -> None:
+        self.difficulty = difficulty
+        self.latency = latency
+        self.jitter = jitter
+        self.seed = seed
+        self.success_rate = success_rate
+        self.calls: dict[str, int] = {}
+        self._solutions = canned_solutions(difficulty)
+        self._answered: dict[str, int] = {}
+        self._answered_lock = threading.Lock()
+
+    def _pick(self, message: llm.Message, salt: object = 0) -> random.Random:
+        digest = hashlib.sha256(repr((self.seed, salt, message.messages)).encode()).digest()
+        return random.Random(digest)
+
+    def _repeats(self, message: llm.Message, salt: int) -> int:
+        '''How many times the same conversation was already answered.'''
+
+        key = hashlib.sha256(repr((salt, message.messages)).encode()).hexdigest()
+        with self._answered_lock:
+            count = self._answered.get(key, 0)
+            self._answered[key] = count + 1
+        return count
+
+    def _delay(self, message: llm.Message) -> float:
+        return self.latency + self._pick(message, salt=-1).random() * self.jitter
+
+    def _answer(self, message: llm.Message, json_format: type, salt: int = 0):
+        self.calls[json_format.__name__] = self.calls.get(json_format.__name__, 0) + 1
+
+        answer = self._content(message, json_format, salt)
+
+        # rough estimate (4 characters per token), so that usage accounting and budgets can be exercised
+        prompt_tokens = sum(len(m['content']) for m in message.messages) // 4
+        record_request('fake', prompt_tokens=prompt_tokens, completion_tokens=len(answer.model_dump_json()) // 4)
+
+        return answer
+
+    def _content(self, message: llm.Message, json_format: type, salt: int):
+
+        if json_format is llm.models.Schema:
+            return canned_dataset(self.difficulty)
+        if json_format is llm.models.Assignment:
+            # like a sampled LLM, identical requests (e.g. exercises sharing their constraints) get different answers
+            pick = self._pick(message, (salt, self._repeats(message, salt)))
+            satisfying = self._satisfying(message)
+            retry = any(m['role'] == MessageRole.ASSISTANT for m in message.messages)
+            template = pick.choice(satisfying if satisfying and (retry or pick.random() < self.success_rate) else QUERIES)
+            solution = template.format(n=pick.randrange(1, 10**6))
+            return llm.models.Assignment.model_validate({'request': f'Write a query: {solution}', 'solution': solution})
+        if json_format is llm.models.RemoveHints:
+            return llm.models.RemoveHints.model_validate({'request_without_hints': message.messages[-1]['content'][:200]})
+
+        raise NotImplementedError(json_format)
+
+    def _satisfying(self, message: llm.Message) -> list[str]:
+        '''The templates satisfying all the known constraints listed in the conversation, if any is listed.'''
+
+        satisfying: set[str] | None = None
+        for m in message.messages:
+            # some descriptions span several lines, so they are searched as a whole list item
+            content = f"\n{m['content']}\n"
+            for description, solutions in self._solutions.items():
+                if f'\n- {description}\n' in content:
+                    satisfying = solutions if satisfying is None else satisfying & solutions
+
+        # in the order of `QUERIES`, so that picks are deterministic
+        return [sql for sql in QUERIES if satisfying is not None and sql in satisfying]
+
+    def generate_answer(self, message: llm.Message, *, json_format: type, add_to_messages: bool = True, **kwargs):
+        time.sleep(self._delay(message))
+
+        answer = self._answer(message, json_format)
+        if add_to_messages:
+            message.add_message_assistant(answer.model_dump_json())
+        return answer
+
+    async def generate_answer_async(self, message: llm.Message, *, json_format: type, add_to_messages: bool = True, **kwargs):
+        await asyncio.sleep(self._delay(message))
+
+        answer = self._answer(message, json_format)
+        if add_to_messages:
+            message.add_message_assistant(answer.model_dump_json())
+        return answer
+
+    def generate_answers(self, message: llm.Message, *, json_format: type, n: int, **kwargs):
+        time.sleep(self._delay(message))
+        return [self._answer(message, json_format, salt=i) for i in range(n)]
+
+    async def generate_answers_async(self, message: llm.Message, *, json_format: type, n: int, **kwargs):
+        await asyncio.sleep(self._delay(message))
+        return [self._answer(message, json_format, salt=i) for i in range(n)]
+
+    @contextmanager
+    def installed(self) -> Iterator['FakeLLM']:
+        '''Replace the `llm` package functions with this fake for the duration of the context.'''
+
+        replaced: dict[str, Callable] = {}
+        for name in ('generate_answer', 'generate_answer_async', 'generate_answers', 'generate_answers_async'):
+            replaced[name] = getattr(llm, name)
+            setattr(llm, name, getattr(self, name))
+        try:
+            yield self
+        finally:
+            for name, function in replaced.items():
+                setattr(llm, name, function)
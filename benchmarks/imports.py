@@ -0,0 +1,79 @@
+'''
+Import time of the package and of its most used subpackages, each measured in a fresh interpreter.
+
+Usage (from the repository root):
+
+    python -m benchmarks.imports [--repeat 5] [--json imports.json]
+'''
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+MODULES = [
+    'sql_assignment_generator',
+    'sql_assignment_generator.generation',
+    'sql_assignment_generator.constraints',
+    'sql_assignment_generator.error_requirements',
+    'sql_assignment_generator.db',
+]
+
+LAZY_DEPENDENCIES = [
+    'openai',
+    'dotenv',
+    'mysql.connector',
+    'sql_assignment_generator.db.drivers.mysql',
+    'sql_assignment_generator.db.drivers.postgresql',
+    'sql_assignment_generator.error_requirements.err_002',
+]
+'''Modules that must not be imported until they are used.'''
+
+_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [name for name in {lazy!r} if name in sys.modules]}}))
+'''
+
+
+def measure(module: str) -> dict:
+    '''Import `module` in a new interpreter, without an OpenAI API key, and report the time taken and the lazy dependencies loaded.'''
+
+    environment = {name: value for name, value in os.environ.items() if name != 'OPENAI_API_KEY'}
+    output = subprocess.run(
+        [sys.executable, '-c', _SCRIPT.format(module=module, lazy=LAZY_DEPENDENCIES)],
+        capture_output=True, text=True, check=True, env=environment,
+    )
+    return json.loads(output.stdout)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='Number of imports per module')
+    parser.add_argument('--json', metavar='PATH', help='Also write the raw measurements to PATH')
+    args = parser.parse_args(argv)
+
+    results = []
+    for module in MODULES:
+        runs = [measure(module) for _ in range(args.repeat)]
+        seconds = [run['seconds'] for run in runs]
+        results.append({'module': module, 'seconds': seconds, 'loaded': runs[-1]['loaded']})
+
+        print(f'{module:<45} median {statistics.median(seconds) * 1000:7.1f} ms   min {min(seconds) * 1000:7.1f} ms')
+        if runs[-1]['loaded']:
+            print(f'   eagerly imported: {", ".join(runs[-1]["loaded"])}')
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 1 if any(result['loaded'] for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
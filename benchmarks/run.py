@@ -0,0 +1,165 @@
+'''
+End-to-end benchmark of `generate_assignment`, using a scripted LLM and the embedded SQLite backend.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run [--difficulty EASY] [--latency 0.05] [--workers 8] [--processes 4] [--students 20] [--json results.json]
+'''
+
+from contextlib import contextmanager
+from typing import Iterator
+import argparse
+import json
+import os
+import sys
+import time
+
+from sql_assignment_generator import generate_assignment, generate_assignments, tracing
+from sql_assignment_generator.assignments import AssignmentSpec
+from sql_assignment_generator.difficulty_level import DifficultyLevel
+from sql_assignment_generator.error_requirements import ERROR_REQUIREMENTS_MAP
+from sql_assignment_generator.exceptions import DatasetGenerationError
+
+from .fake_llm import FakeLLM
+from .stages import StageTimer
+
+
+@contextmanager
+def _silenced() -> Iterator[None]:
+    '''Discard everything written to stderr (where progress messages are printed), including by C code.'''
+
+    sys.stderr.flush()
+    saved = os.dup(2)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    try:
+        os.dup2(devnull, 2)
+        yield
+    finally:
+        sys.stderr.flush()
+        os.dup2(saved, 2)
+        os.close(devnull)
+        os.close(saved)
+
+
+def run_once(difficulty: DifficultyLevel, args: argparse.Namespace) -> dict:
+    '''Generate one assignment covering all supported errors at `difficulty`, and return its measurements.'''
+
+    errors = [(error, difficulty) for error in ERROR_REQUIREMENTS_MAP]
+    fake = FakeLLM(difficulty, latency=args.latency, jitter=args.jitter, seed=args.seed)
+    timer = StageTimer()
+
+    generated = 0
+    tokens = 0
+    failure = None
+
+    start = time.perf_counter()
+    with fake.installed(), timer.installed(), tracing.collecting() as collector:
+        try:
+            if args.students > 1:
+                assignments = generate_assignments(
+                    [AssignmentSpec(errors, domain='retail') for _ in range(args.students)],
+                    'localhost', 0, '', '',
+                    'postgres',
+                    max_workers=args.workers,
+                    exercise_candidates=args.candidates,
+                    embedded_db=True,
+                    validation_processes=args.processes,
+                )
+                generated = sum(len(assignment.exercises) for assignment in assignments if assignment is not None)
+                tokens = sum(assignment.usage.total_tokens for assignment in assignments if assignment is not None)
+            else:
+                assignment = generate_assignment(
+                    errors,
+                    'localhost', 0, '', '',
+                    'postgres',
+                    domain='retail',
+                    max_workers=args.workers,
+                    exercise_candidates=args.candidates,
+                    embedded_db=True,
+                    validation_processes=args.processes,
+                )
+                generated = len(assignment.exercises)
+                tokens = assignment.usage.total_tokens
+        except DatasetGenerationError as e:
+            failure = str(e)
+    elapsed = time.perf_counter() - start
+
+    validation: dict[str, int] = {}
+    for name, value, _, attributes in collector.counters:
+        if name == 'exercise.validation':
+            validation[attributes['stage']] = validation.get(attributes['stage'], 0) + int(value)
+
+    return {
+        'difficulty': difficulty.name,
+        'requested': len(errors) * max(args.students, 1),
+        'generated': generated,
+        'failure': failure,
+        'wall_time': elapsed,
+        'llm_calls': dict(fake.calls),
+        'tokens': tokens,
+        'validation': dict(sorted(validation.items())),
+        'db_round_trips_saved': int(collector.total('db.round_trips_saved')),
+        'stages': {
+            name: {
+                'calls': stats.calls,
+                'total': stats.total,
+                'p50': stats.percentile(0.5),
+                'p95': stats.percentile(0.95),
+            }
+            for name, stats in sorted(timer.stages.items())
+        },
+    }
+
+
+def _report(result: dict) -> None:
+    print(f"\n== {result['difficulty']}: {result['generated']}/{result['requested']} exercises in {result['wall_time']:.2f}s")
+    if result['failure']:
+        print(f"   dataset generation failed: {result['failure']}")
+    print('   LLM calls: ' + ', '.join(f'{name}={count}' for name, count in sorted(result['llm_calls'].items())) + f" (~{result['tokens']} tokens)")
+
+    print('   validation outcomes: ' + ', '.join(f'{stage}={count}' for stage, count in result['validation'].items())
+          + f" ({result['db_round_trips_saved']} DB round-trips saved)")
+
+    print(f"   {'stage':<24} {'calls':>7} {'total s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, stats in result['stages'].items():
+        print(f"   {name:<24} {stats['calls']:>7} {stats['total']:>9.3f} {stats['p50'] * 1000:>9.2f} {stats['p95'] * 1000:>9.2f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--difficulty', choices=[d.name for d in DifficultyLevel], action='append',
+                        help='Difficulty level to benchmark (repeatable; default: all)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated seconds per LLM call')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Additional random seconds per LLM call, up to this value')
+    parser.add_argument('--workers', type=int, default=None, help='max_workers passed to generate_assignment')
+    parser.add_argument('--candidates', type=int, default=1, help='exercise_candidates passed to generate_assignment')
+    parser.add_argument('--processes', type=int, default=None, help='validation_processes passed to generate_assignment')
+    parser.add_argument('--students', type=int, default=1, help='Generate this many assignments at once with generate_assignments')
+    parser.add_argument('--repeat', type=int, default=1, help='Number of runs per difficulty level')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the scripted LLM answers')
+    parser.add_argument('--json', metavar='PATH', help='Also write the raw measurements to PATH')
+    parser.add_argument('--quiet', action='store_true', help='Hide the progress messages of the generator')
+    args = parser.parse_args(argv)
+
+    difficulties = [DifficultyLevel[name] for name in args.difficulty] if args.difficulty else list(DifficultyLevel)
+
+    results = []
+    for difficulty in difficulties:
+        for _ in range(args.repeat):
+            if args.quiet:
+                with _silenced():
+                    result = run_once(difficulty, args)
+            else:
+                result = run_once(difficulty, args)
+            results.append(result)
+            _report(result)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+'''Wall-clock timings of the pipeline stages, collected by temporarily wrapping the functions implementing them.'''
+
+from collections.abc import Callable
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Iterator
+import inspect
+import threading
+import time
+
+from sql_assignment_generator import llm
+from sql_assignment_generator.assignments import Dataset, Exercise
+from sql_assignment_generator.assignments.dataset import dataset as dataset_module
+from sql_assignment_generator.assignments.exercise import exercise as exercise_module
+from sql_assignment_generator.constraints import QueryConstraint, SchemaConstraint
+from sql_assignment_generator.db import Database, SQLiteDatabase
+
+
+@dataclass
+class StageStats:
+    '''Durations (in seconds) of all the calls to a stage.'''
+
+    durations: list[float] = field(default_factory=list)
+
+    @property
+    def calls(self) -> int:
+        return len(self.durations)
+
+    @property
+    def total(self) -> float:
+        return sum(self.durations)
+
+    def percentile(self, p: float) -> float:
+        if not self.durations:
+            return 0.0
+        ordered = sorted(self.durations)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def _subclasses(cls: type) -> list[type]:
+    result = []
+    for subclass in cls.__subclasses__():
+        result.append(subclass)
+        result.extend(_subclasses(subclass))
+    return result
+
+
+class StageTimer:
+    '''
+    Collects per-stage timings. Stages nest (e.g. `exercise.check` includes `exercise.parse` and `db.execute`),
+    so durations are inclusive and do not add up to the total run time.
+    '''
+
+    def __init__(self) -> None:
+        self.stages: dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, duration: float) -> None:
+        with self._lock:
+            self.stages.setdefault(stage, StageStats()).durations.append(duration)
+
+    def timed(self, stage: str | Callable[..., str], function: Callable) -> Callable:
+        '''Wrap `function` so that each call is recorded under `stage` (or under `stage(*args, **kwargs)`, if callable).'''
+
+        def _stage(args, kwargs) -> str:
+            return stage(*args, **kwargs) if callable(stage) else stage
+
+        if inspect.iscoroutinefunction(function):
+            @wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    self.record(_stage(args, kwargs), time.perf_counter() - start)
+            return async_wrapper
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(_stage(args, kwargs), time.perf_counter() - start)
+        return wrapper
+
+    @contextmanager
+    def _patched(self, owner: Any, attribute: str, stage: str | Callable[..., str]) -> Iterator[None]:
+        original = owner.__dict__[attribute] if isinstance(owner, type) else getattr(owner, attribute)
+
+        if isinstance(original, staticmethod):
+            replacement: Any = staticmethod(self.timed(stage, original.__func__))
+        else:
+            replacement = self.timed(stage, original)
+
+        setattr(owner, attribute, replacement)
+        try:
+            yield
+        finally:
+            setattr(owner, attribute, original)
+
+    @contextmanager
+    def installed(self) -> Iterator['StageTimer']:
+        '''Time the pipeline stages for the duration of the context. Install after the fake LLM.'''
+
+        def _llm_stage(*args, json_format: type, **kwargs) -> str:
+            return f'llm.{json_format.__name__}'
+
+        with ExitStack() as stack:
+            for name in ('generate_answer', 'generate_answer_async', 'generate_answers', 'generate_answers_async'):
+                stack.enter_context(self._patched(llm, name, _llm_stage))
+
+            stack.enter_context(self._patched(Dataset, '_check_answer', 'dataset.check'))
+            stack.enter_context(self._patched(dataset_module, 'build_catalog_from_sql', 'dataset.catalog'))
+            stack.enter_context(self._patched(Dataset, 'materialize', 'dataset.materialize'))
+
+            stack.enter_context(self._patched(Exercise, '_check_answer', 'exercise.check'))
+            stack.enter_context(self._patched(exercise_module, 'Query', 'exercise.parse'))
+
+            stack.enter_context(self._patched(Database, '__enter__', 'db.setup'))
+            stack.enter_context(self._patched(Database, '__exit__', 'db.teardown'))
+            stack.enter_context(self._patched(SQLiteDatabase, 'execute', 'db.execute'))
+
+            for constraint_class in _subclasses(QueryConstraint):
+                if 'validate' in constraint_class.__dict__:
+                    stack.enter_context(self._patched(constraint_class, 'validate', 'constraints.query'))
+            for constraint_class in _subclasses(SchemaConstraint):
+                if 'validate' in constraint_class.__dict__:
+                    stack.enter_context(self._patched(constraint_class, 'validate', 'constraints.schema'))
+
+            yield self
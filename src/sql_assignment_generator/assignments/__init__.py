@@ -1,5 +1,5 @@
 '''Data structures for SQL assignments.'''
 
-from .assignment import Assignment
+from .assignment import Assignment, AssignmentSpec, ExerciseResult
 from .exercise import Exercise
 from .dataset import Dataset
\ No newline at end of file
@@ -1,7 +1,10 @@
 from .dataset import Dataset
 from .exercise import Exercise
+from ..difficulty_level import DifficultyLevel
+from ..llm import Usage
+from sql_error_taxonomy import SqlErrors
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 @dataclass
 class Assignment:
@@ -11,4 +14,42 @@ class Assignment:
     '''The dataset associated with the assignment.'''
     
     exercises: list[Exercise]
-    '''The exercises included in the assignment.'''
\ No newline at end of file
+    '''The exercises included in the assignment.'''
+
+    usage: Usage = field(default_factory=Usage, compare=False)
+    '''Tokens used by all the LLM requests made to generate the assignment, including failed and discarded exercises.'''
+
+@dataclass
+class ExerciseResult:
+    '''Outcome of the generation of a single exercise, reported as soon as it is known.'''
+
+    index: int
+    '''Position of the (error, difficulty) pair in the requested list.'''
+
+    position: int
+    '''Position of the exercise in the assignment (differs from `index` when exercises are shuffled or unsupported errors are skipped).'''
+
+    error: SqlErrors
+    '''The SQL error the exercise was generated for.'''
+
+    difficulty: DifficultyLevel
+    '''The requested difficulty level.'''
+
+    exercise: Exercise | None
+    '''The generated exercise, or None if generation failed.'''
+
+@dataclass
+class AssignmentSpec:
+    '''Request for one assignment of a batch (see `generate_assignments`).'''
+
+    errors: list[tuple[SqlErrors, DifficultyLevel]]
+    '''The (error, difficulty) pairs to generate exercises for.'''
+
+    domain: str | None = None
+    '''The domain of the dataset. If None, a random domain is selected (shared by all specs without a domain).'''
+
+    dataset_str: str | None = None
+    '''Optional SQL string to use as the dataset, instead of generating one.'''
+
+    shuffle_exercises: bool = False
+    '''Whether to shuffle the exercises of this assignment.'''
@@ -1 +1,2 @@
-from .dataset import Dataset
\ No newline at end of file
+from .dataset import Dataset
+from .library import DatasetLibrary, get_library, set_library
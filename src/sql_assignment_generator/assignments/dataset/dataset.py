@@ -1,19 +1,28 @@
 from collections import OrderedDict
-from collections.abc import Sequence
-from dataclasses import dataclass
+from collections.abc import Callable, Generator, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from functools import partial
 import dav_tools
 import sqlglot
 from sqlglot import exp
 from sqlscope import Catalog, build_catalog_from_sql
+from typing import Any
+import time
 import os
 
 from . import strings
+from .synthesis import SyntheticRows, synthesize
 from ...constraints.schema import SchemaConstraint
 from ... import llm
 from ...constraints import SchemaConstraint, schema as schema_constraints
 from ...exceptions import SQLParsingError, ConstraintValidationError, DatasetGenerationError
 from ...translatable_text import TranslatableText
-from ...db import get_database, QueryExecutionError
+from ... import tracing
+from ...budget import Budget
+from ...environment import load_environment
+from ...steps import Step, step, run_steps, arun_steps
+from ...db import Database, RowBatch, get_database, QueryExecutionError
 
 
 def _normalize_inserts(parsed_inserts: list[exp.Insert], sql_dialect: str) -> list[str]:
@@ -67,6 +76,72 @@ def _normalize_inserts(parsed_inserts: list[exp.Insert], sql_dialect: str) -> li
     return result
 
 
+def _table_name(statement: exp.Create | exp.Insert) -> str:
+    '''Name (lowercase) of the table created or populated by `statement`.'''
+
+    table = statement.find(exp.Table)
+    return table.name.lower() if table is not None else ''
+
+
+def _replace_tables(old: list[exp.Expression], new: list[exp.Expression]) -> list[exp.Expression]:
+    '''
+    Replace the statements in `old` with those in `new` that refer to the same table.
+    Replacements take the position of the first replaced statement, so that tables referenced by foreign keys are still created (and populated) first.
+    Statements for tables not in `old` are appended.
+    '''
+
+    replacements: OrderedDict[str, list[exp.Expression]] = OrderedDict()
+    for statement in new:
+        replacements.setdefault(_table_name(statement), []).append(statement)
+
+    result = []
+    for statement in old:
+        table_name = _table_name(statement)
+        if table_name not in replacements:
+            result.append(statement)
+        elif replacements[table_name]:
+            result.extend(replacements[table_name])
+            replacements[table_name] = []   # only the first statement of the table is replaced
+
+    for statements in replacements.values():
+        result.extend(statements)
+
+    return result
+
+
+@dataclass
+class _Draft:
+    '''Parsed statements of a rejected dataset, kept so that the next attempt only has to regenerate the failing tables.'''
+
+    tables: list[exp.Create]
+    '''Parsed CREATE TABLE statements.'''
+
+    inserts: list[exp.Insert]
+    '''Parsed INSERT INTO statements.'''
+
+    failing_tables: set[str] | None
+    '''Tables violating the constraints, or None if the whole dataset has to be regenerated.'''
+
+    @property
+    def table_names(self) -> list[str]:
+        return [_table_name(table) for table in self.tables]
+
+    @property
+    def repairable(self) -> bool:
+        '''Whether the constraints can be satisfied by regenerating only some of the tables.'''
+
+        return bool(self.failing_tables) and set(self.failing_tables) < set(self.table_names)
+
+    def replace(self, tables: list[exp.Create], inserts: list[exp.Insert]) -> tuple[list[exp.Create], list[exp.Insert]]:
+        '''Statements of the dataset after replacing the regenerated tables (and all their INSERTs).'''
+
+        # regenerated tables without new INSERTs are left empty
+        emptied_tables = {_table_name(table) for table in tables} - {_table_name(insert) for insert in inserts}
+        kept_inserts = [insert for insert in self.inserts if _table_name(insert) not in emptied_tables]
+
+        return _replace_tables(self.tables, tables), _replace_tables(kept_inserts, inserts)
+
+
 @dataclass
 class Dataset:
     '''A SQL dataset related to a specific domain, including schema creation and data insertion commands.'''
@@ -80,6 +155,12 @@ class Dataset:
     domain: str
     '''The domain associated with the dataset.'''
 
+    usage: llm.Usage = field(default_factory=llm.Usage, compare=False)
+    '''Tokens used by the LLM requests made to generate the dataset, including failed attempts.'''
+
+    synthetic_rows: SyntheticRows | None = None
+    '''Rows to synthesize locally on top of `insert_commands` when the dataset is loaded (see `amplify`).'''
+
     _catalog_cache: Catalog | None = None
     '''Cached SQLScope Catalog for the dataset.'''
 
@@ -101,7 +182,10 @@ class Dataset:
         return self._catalog_cache
     
     def to_sql_no_context(self) -> str:
-        '''Generate the SQL commands to create and populate the dataset without schema context.'''
+        '''
+        Generate the SQL commands to create and populate the dataset without schema context.
+        Synthetic rows are not included, so that the result stays small enough for LLM prompts (see `iter_inserts`).
+        '''
 
         create_cmds = '\n'.join(self.create_commands)
         insert_cmds = '\n'.join(self.insert_commands)
@@ -115,9 +199,135 @@ class Dataset:
         schema = schema.lower().replace(' ', '_')
 
         create_cmds = '\n\n'.join(self.create_commands)
-        insert_cmds = '\n\n'.join(self.insert_commands)
+        insert_cmds = '\n\n'.join(self.insert_commands + [batch.to_sql() for batch in self._synthetic_batches()])
 
         return strings.to_sql_format(schema=schema, create_cmds=create_cmds, insert_cmds=insert_cmds)
+
+    def amplify(self, rows: int | dict[str, int], *, sql_dialect: str, seed: int = 0) -> 'Dataset':
+        '''
+        Return a copy of the dataset whose tables are scaled to `rows` rows each (or to `rows[table]` rows, by table name),
+        by synthesizing new rows locally from the existing ones. Synthetic rows respect keys, foreign keys, CHECK constraints
+        and the ratio of NULLs of the existing rows.
+
+        Rows are not stored: they are generated (deterministically from `seed`) each time the dataset is loaded.
+        '''
+
+        if isinstance(rows, int):
+            rows = {name.lower(): rows for schema_name in self.catalog.schema_names for name in self.catalog[schema_name].table_names}
+        else:
+            rows = {name.lower(): count for name, count in rows.items()}
+
+        return replace(self, synthetic_rows=SyntheticRows(rows=rows, sql_dialect=sql_dialect, seed=seed))
+
+    def to_dict(self) -> dict:
+        '''JSON-serializable representation of the dataset. LLM usage is not included.'''
+
+        return {
+            'create_commands': self.create_commands,
+            'insert_commands': self.insert_commands,
+            'domain': self.domain,
+            'synthetic_rows': asdict(self.synthetic_rows) if self.synthetic_rows is not None else None,
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> 'Dataset':
+        '''Inverse of `to_dict`.'''
+
+        synthetic_rows = data.get('synthetic_rows')
+
+        return Dataset(
+            create_commands=list(data['create_commands']),
+            insert_commands=list(data['insert_commands']),
+            domain=data['domain'],
+            synthetic_rows=SyntheticRows(**synthetic_rows) if synthetic_rows is not None else None,
+        )
+
+    def iter_inserts(self, *, sql_dialect: str | None = None, batch_size: int = 1000) -> Iterator[RowBatch | str]:
+        '''
+        Rows of the dataset, synthetic rows included, in insertion order and in batches of at most `batch_size` rows.
+        INSERT statements that cannot be split into rows (e.g. `INSERT INTO ... SELECT`) are yielded as SQL.
+        Rows are produced lazily, so that large datasets are never entirely held in memory.
+        '''
+
+        if sql_dialect is None and self.synthetic_rows is not None:
+            sql_dialect = self.synthetic_rows.sql_dialect
+
+        for command in self.insert_commands:
+            try:
+                statements = sqlglot.parse(command, read=sql_dialect)
+            except sqlglot.errors.ParseError:
+                yield command
+                continue
+
+            for statement in statements:
+                if statement is None:
+                    continue
+
+                batches = RowBatch.from_insert(statement, sql_dialect, batch_size=batch_size) if isinstance(statement, exp.Insert) else None
+                if batches is None:
+                    yield statement.sql(dialect=sql_dialect)
+                else:
+                    yield from batches
+
+        yield from self._synthetic_batches(batch_size=batch_size)
+
+    def _synthetic_batches(self, *, batch_size: int = 1000) -> Iterator[RowBatch]:
+        if self.synthetic_rows is None:
+            return
+
+        # no span here: the context must not change across yields
+        for batch in synthesize(self.create_commands, self.insert_commands, self.synthetic_rows, batch_size=batch_size):
+            tracing.increment('dataset.synthetic_rows', len(batch.rows))
+            yield batch
+
+    @contextmanager
+    def materialize(
+        self,
+        *,
+        db_host: str,
+        db_port: int,
+        db_user: str,
+        db_password: str,
+        sql_dialect: str,
+        embedded_db: bool = False
+    ) -> Iterator[str]:
+        '''
+        Load the dataset once into a new, persistent schema and yield its name.
+        The schema can be shared by read-only connections (see `get_database(..., read_only_schema=...)`)
+        and is dropped on exit.
+        '''
+
+        db = get_database(db_host, db_port, db_user, db_password, sql_dialect, embedded=embedded_db)
+        schema = f'sql_assignment_generator_dataset_{time.time_ns()}'
+
+        db.connect()
+        try:
+            with tracing.span('dataset.materialize'), tracing.timed('db.time'):
+                db.create_schema(schema)
+                db.load_dataset(self)
+                db.commit()
+        except BaseException:
+            try:
+                db.delete_schema()
+            except Exception:
+                pass
+            raise
+        finally:
+            # don't hold a (pooled) connection while the schema is in use
+            db.disconnect()
+
+        try:
+            yield schema
+        finally:
+            db.connect()
+            try:
+                db.schema = schema
+                db.delete_schema()
+                db.commit()
+            except Exception:
+                dav_tools.messages.warning(f'Could not drop dataset schema "{schema}".')
+            finally:
+                db.disconnect()
     
     @staticmethod
     def from_sql(sql_str: str, sql_dialect: str) -> 'Dataset':
@@ -161,13 +371,138 @@ class Dataset:
         db_user: str,
         db_password: str,
         language: str,
-        max_attempts: int = 5
+        max_attempts: int = 5,
+        db_isolation: str = 'schema',
+        embedded_db: bool = False,
+        budget: Budget | None = None
     ) -> 'Dataset':
-        '''Generate a SQL dataset based on the specified parameters.'''
+        '''
+        Generate a SQL dataset based on the specified parameters.
+
+        `db_isolation` selects how the validation of each attempt is isolated on the database (see `db.ISOLATION_STRATEGIES`).
+        If `embedded_db` is True, the generated SQL is executed on an in-memory SQLite database instead of the configured server.
+        If a `budget` is given, no attempt is started once it is exhausted, and `BudgetExhaustedError` is raised instead.
+
+        When only some tables violate the constraints (e.g. too few rows, too many columns), the next attempt asks the LLM
+        to regenerate just those tables, and keeps the others as they are.
+        '''
+
+        return run_steps(Dataset._generation_steps(
+            domain, sql_dialect, constraints, extra_details,
+            db_host=db_host, db_port=db_port, db_user=db_user, db_password=db_password, language=language,
+            max_attempts=max_attempts, db_isolation=db_isolation, embedded_db=embedded_db, budget=budget,
+        ))
+
+    @staticmethod
+    async def agenerate(
+        domain: str,
+        sql_dialect: str,
+        constraints: Sequence[SchemaConstraint],
+        extra_details: list[str] = [],
+        *,
+        db_host: str,
+        db_port: int,
+        db_user: str,
+        db_password: str,
+        language: str,
+        max_attempts: int = 5,
+        db_isolation: str = 'schema',
+        embedded_db: bool = False,
+        budget: Budget | None = None
+    ) -> 'Dataset':
+        '''
+        Asynchronous version of `generate`.
+        LLM calls are awaited, while parsing, validation and database checks run in a worker thread.
+        '''
+
+        return await arun_steps(Dataset._generation_steps(
+            domain, sql_dialect, constraints, extra_details,
+            db_host=db_host, db_port=db_port, db_user=db_user, db_password=db_password, language=language,
+            max_attempts=max_attempts, db_isolation=db_isolation, embedded_db=embedded_db, budget=budget,
+        ))
+
+    @staticmethod
+    def _generation_steps(
+        domain: str,
+        sql_dialect: str,
+        constraints: Sequence[SchemaConstraint],
+        extra_details: list[str] = [],
+        *,
+        db_host: str,
+        db_port: int,
+        db_user: str,
+        db_password: str,
+        language: str,
+        max_attempts: int = 5,
+        db_isolation: str = 'schema',
+        embedded_db: bool = False,
+        budget: Budget | None = None
+    ) -> Generator[Step, Any, 'Dataset']:
+        '''Logic of `generate` and `agenerate`, which yields a `Step` for each LLM request and validation (see `steps`).'''
+
+        load_environment()
 
         # merge similar constraints
         constraints = schema_constraints.merge_constraints(constraints)
 
+        messages = Dataset._initial_messages(domain, constraints, extra_details, sql_dialect=sql_dialect, language=language)
+        open_db = partial(get_database, db_host, db_port, db_user, db_password, sql_dialect, isolation=db_isolation, embedded=embedded_db)
+        
+        # rejected dataset whose failing tables are being regenerated, if any
+        repair: _Draft | None = None
+
+        with tracing.span('dataset.generate', domain=domain, sql_dialect=sql_dialect), llm.tracking_usage() as usage:
+            for attempt in range(max_attempts):
+                if budget is not None:
+                    budget.check('generating dataset')
+
+                # messages.print_chat()
+
+                with tracing.span('dataset.attempt', attempt=attempt + 1, repair=repair is not None) as attempt_span:
+                    tracing.increment('dataset.attempts')
+                    try:
+                        dav_tools.messages.progress(f'Generating dataset (Attempt {attempt + 1}/{max_attempts})...')
+
+                        answer = yield step(
+                            llm.generate_answer, llm.generate_answer_async,
+                            messages,
+                            json_format=llm.models.Schema,
+                            model=os.getenv('SQL_GENERATION_LLM_MODEL_DATASET', 'gpt-5.4-nano')
+                        )
+                        assert isinstance(answer, llm.models.Schema), "The response is not in the expected JSON format."
+
+                        result, errors, draft = yield step(
+                            Dataset._check_answer, None,
+                            answer, constraints, domain=domain, sql_dialect=sql_dialect, open_db=open_db, language=language, repair=repair
+                        )
+
+                        # no errors, return dataset
+                        if not errors:
+                            attempt_span.set(outcome='accepted')
+                            result.usage = usage
+                            return result
+
+                        attempt_span.set(outcome='rejected')
+                        repair = Dataset._reject(messages, errors, draft, attempt=attempt, sql_dialect=sql_dialect, language=language)
+
+                    except SQLParsingError as e:
+                        attempt_span.set(outcome='invalid_sql')
+                        Dataset._report_failure(messages, e, attempt=attempt, language=language, repairing=repair is not None)
+                        repair = None
+
+        raise DatasetGenerationError(f'Failed to generate a valid dataset after {max_attempts} attempts.')
+
+    @staticmethod
+    def _initial_messages(
+        domain: str,
+        constraints: Sequence[SchemaConstraint],
+        extra_details: list[str],
+        *,
+        sql_dialect: str,
+        language: str
+    ) -> llm.Message:
+        '''Build the conversation used to ask the LLM for a dataset.'''
+
         prompt_text = strings.prompt_generate(
             domain=domain,
             extra_details=extra_details,
@@ -177,108 +512,176 @@ class Dataset:
         )
 
         # query LLM to generate dataset
-        messages = llm.Message()
+        # (only the most recent attempts are sent back, so that the prompt size does not grow with each retry)
+        messages = llm.Message(max_history=int(os.getenv('SQL_GENERATION_LLM_MAX_HISTORY', '2')))
         messages.add_message_user(prompt_text)
-        
-        for attempt in range(max_attempts):
-            # messages.print_chat()
-            
+
+        return messages
+
+    @staticmethod
+    def _parse_answer(answer: llm.models.Schema, *, sql_dialect: str, language: str) -> tuple[list[exp.Create], list[exp.Insert]]:
+        '''
+        Parse the generated CREATE TABLE and INSERT INTO statements.
+
+        Raises:
+            SQLParsingError: If the SQL cannot be parsed.
+        '''
+
+        # parse CREATE TABLEs
+        parsed_tables = []
+        for create_table in answer.schema_tables:
             try:
-                dav_tools.messages.progress(f'Generating dataset (Attempt {attempt + 1}/{max_attempts})...')
-
-                answer = llm.generate_answer(
-                    messages,
-                    json_format=llm.models.Schema,
-                    model=os.getenv('SQL_GENERATION_LLM_MODEL_DATASET', 'gpt-5.4-nano')
-                ) 
-                assert isinstance(answer, llm.models.Schema), "The response is not in the expected JSON format."
-
-                # parse CREATE TABLEs
-                parsed_tables = []
-                for create_table in answer.schema_tables:
-                    try:
-                        parsed = sqlglot.parse_one(create_table, read=sql_dialect)
-                        parsed_tables.append(parsed)
-                    except Exception as e:
-                        raise SQLParsingError(
-                            TranslatableText(
-                                f"Syntax error in CREATE TABLE generated: {e}",
-                                it=f"Errore di sintassi nella CREATE TABLE generata: {e}"
-                            ).get(language),
-                            create_table
-                        )
-                create_commands = [f'{cmd.sql(pretty=True, dialect=sql_dialect)};' for cmd in parsed_tables]
+                parsed = sqlglot.parse_one(create_table, read=sql_dialect)
+                parsed_tables.append(parsed)
+            except Exception as e:
+                raise SQLParsingError(
+                    TranslatableText(
+                        f"Syntax error in CREATE TABLE generated: {e}",
+                        it=f"Errore di sintassi nella CREATE TABLE generata: {e}"
+                    ).get(language),
+                    create_table
+                )
 
-                # parse INSERT INTOs
-                parsed_inserts = []
-                for create_table in answer.insert_commands:
-                    try:
-                        parsed = sqlglot.parse_one(create_table, read=sql_dialect)
-                        parsed_inserts.append(parsed)
-                    except Exception as e:
-                        raise SQLParsingError(
-                            TranslatableText(
-                                f"Syntax error in INSERT COMMANDS generated: {e}",
-                                it=f"Errore di sintassi nei comandi INSERT generati: {e}"
-                            ).get(language),
-                            create_table
-                        )
-                insert_commands = _normalize_inserts(parsed_inserts, sql_dialect)
+        # parse INSERT INTOs
+        parsed_inserts = []
+        for create_table in answer.insert_commands:
+            try:
+                parsed = sqlglot.parse_one(create_table, read=sql_dialect)
+                parsed_inserts.append(parsed)
+            except Exception as e:
+                raise SQLParsingError(
+                    TranslatableText(
+                        f"Syntax error in INSERT COMMANDS generated: {e}",
+                        it=f"Errore di sintassi nei comandi INSERT generati: {e}"
+                    ).get(language),
+                    create_table
+                )
 
-                # try executing the generated SQL to ensure it's valid and to build the catalog for constraint validation
-                dav_tools.messages.progress('Executing SQL...')
-                
-                with get_database(db_host, db_port, db_user, db_password, sql_dialect) as db:
-                    full_sql = '\n'.join(create_commands + insert_commands)
-                    try:
-                        db.execute(full_sql)
-                    except QueryExecutionError as e:
-                        raise SQLParsingError(
-                            TranslatableText(
-                                f"Error executing generated SQL: {e}",
-                                it=f"Errore durante l'esecuzione dell'SQL generato: {e}"
-                            ).get(language),
-                            full_sql
-                        )
+        return parsed_tables, parsed_inserts
 
-                # build catalog for constraint validation
-                catalog = build_catalog_from_sql('; '.join(cmd.sql() for cmd in parsed_tables))
+    @staticmethod
+    def _check_answer(
+        answer: llm.models.Schema,
+        constraints: Sequence[SchemaConstraint],
+        *,
+        domain: str,
+        sql_dialect: str,
+        open_db: Callable[[], Database],
+        language: str,
+        repair: _Draft | None = None
+    ) -> tuple['Dataset', list[str], _Draft]:
+        '''
+        Parse and execute the generated SQL, then validate it against the constraints.
 
-                # check if constraints are satisfied
-                dav_tools.messages.progress('Checking constraints...')
-                
-                errors = []
-                for constraint in constraints:
-                    try:
-                        constraint.validate(catalog, parsed_tables, parsed_inserts)
-                    except ConstraintValidationError as e:
-                        errors.append(e.get(language=language))
-                        continue
-
-                # no errors, return dataset
-                if not errors:
-                    result = Dataset(
-                        create_commands=create_commands,
-                        insert_commands=insert_commands,
-                        domain=domain
-                    )
-                    # fill cache, since we already have the catalog
-                    result._catalog_cache = catalog
-                    result._catalog_cache_commands_hash = hash(tuple(create_commands))
-                    
-                    return result
-                
-                dav_tools.messages.error(f'Validation failed for attempt {attempt + 1}. Missing requirements: {", ".join(errors)}')
-                
-                messages.add_message_user(strings.feedback_constraint_violations(errors, language=language))
-
-            except SQLParsingError as e:
-                dav_tools.messages.error(f"Error during generation (Attempt {attempt + 1}): {e}")
-                messages.add_message_user(
+        If `repair` is given, the answer only contains the regenerated tables, which replace the corresponding ones in `repair`:
+        only the new statements are parsed, while the other tables are reused as they are.
+
+        Returns:
+            tuple[Dataset, list[str], _Draft]: The parsed dataset, the list of violated constraints,
+                and the parsed statements along with the tables that violate the constraints.
+        Raises:
+            SQLParsingError: If the SQL cannot be parsed or executed.
+        '''
+
+        with tracing.span('dataset.parse'):
+            parsed_tables, parsed_inserts = Dataset._parse_answer(answer, sql_dialect=sql_dialect, language=language)
+            if repair is not None:
+                parsed_tables, parsed_inserts = repair.replace(parsed_tables, parsed_inserts)
+
+            create_commands = [f'{cmd.sql(pretty=True, dialect=sql_dialect)};' for cmd in parsed_tables]
+            insert_commands = _normalize_inserts(parsed_inserts, sql_dialect)
+
+        # try executing the generated SQL to ensure it's valid and to build the catalog for constraint validation
+        dav_tools.messages.progress('Executing SQL...')
+        
+        result = Dataset(
+            create_commands=create_commands,
+            insert_commands=insert_commands,
+            domain=domain
+        )
+
+        with tracing.span('db.execute'), tracing.timed('db.time'), open_db() as db:
+            try:
+                db.load_dataset(result)
+            except QueryExecutionError as e:
+                raise SQLParsingError(
                     TranslatableText(
-                        f"Generated SQL code is not syntactically valid: {str(e)}. Please regenerate valid SQL.",
-                        it=f"Il codice SQL generato non è sintatticamente valido: {str(e)}. Per favore, rigenera un SQL valido."
-                    ).get(language)
+                        f"Error executing generated SQL: {e}",
+                        it=f"Errore durante l'esecuzione dell'SQL generato: {e}"
+                    ).get(language),
+                    '\n'.join(create_commands + insert_commands)
                 )
+
+        # build catalog for constraint validation
+        with tracing.span('dataset.catalog'):
+            catalog = build_catalog_from_sql('; '.join(cmd.sql() for cmd in parsed_tables))
+
+        # check if constraints are satisfied
+        dav_tools.messages.progress('Checking constraints...')
         
-        raise DatasetGenerationError(f'Failed to generate a valid dataset after {max_attempts} attempts.')
\ No newline at end of file
+        errors = []
+        failing_tables: set[str] | None = set()
+        with tracing.span('dataset.constraints'):
+            for constraint in constraints:
+                try:
+                    constraint.validate(catalog, parsed_tables, parsed_inserts)
+                except ConstraintValidationError as e:
+                    tracing.increment('dataset.constraint_failures', constraint=type(constraint).__name__)
+                    errors.append(e.get(language=language))
+
+                    # a single constraint that cannot be fixed table by table requires regenerating everything
+                    constraint_tables = constraint.failing_tables(catalog, parsed_tables, parsed_inserts)
+                    if failing_tables is not None:
+                        failing_tables = failing_tables | constraint_tables if constraint_tables else None
+                    continue
+
+        # fill cache, since we already have the catalog
+        result._catalog_cache = catalog
+        result._catalog_cache_commands_hash = hash(tuple(create_commands))
+
+        return result, errors, _Draft(parsed_tables, parsed_inserts, failing_tables if errors else None)
+
+    @staticmethod
+    def _reject(messages: llm.Message, errors: list[str], draft: _Draft, *, attempt: int, sql_dialect: str, language: str) -> _Draft | None:
+        '''
+        Log the violated constraints and ask the LLM to fix them.
+        If the violations are limited to some of the tables, only those tables are requested again, and `draft` is returned to be repaired.
+        '''
+
+        dav_tools.messages.error(f'Validation failed for attempt {attempt + 1}. Missing requirements: {", ".join(errors)}')
+
+        if draft.repairable:
+            assert draft.failing_tables is not None
+            tables = [name for name in draft.table_names if name in draft.failing_tables]
+            # the answer with the complete dataset may have been dropped from the conversation history, so the kept tables are repeated
+            kept_tables = [f'{table.sql(pretty=True, dialect=sql_dialect)};' for table in draft.tables if _table_name(table) not in draft.failing_tables]
+
+            tracing.increment('dataset.repairs')
+            dav_tools.messages.info(f'Regenerating only the failing tables: {", ".join(tables)}')
+            messages.add_message_user(strings.feedback_repair_tables(errors, tables, kept_tables, language=language))
+            return draft
+
+        messages.add_message_user(strings.feedback_constraint_violations(errors, language=language))
+        return None
+
+    @staticmethod
+    def _report_failure(messages: llm.Message, exception: SQLParsingError, *, attempt: int, language: str, repairing: bool = False) -> None:
+        '''
+        Log an invalid SQL error and ask the LLM to regenerate valid SQL.
+        If the failure happened while `repairing` some tables, the complete dataset is requested again.
+        '''
+
+        dav_tools.messages.error(f"Error during generation (Attempt {attempt + 1}): {exception}")
+        messages.add_message_user(
+            TranslatableText(
+                f"Generated SQL code is not syntactically valid: {str(exception)}. Please regenerate valid SQL.",
+                it=f"Il codice SQL generato non è sintatticamente valido: {str(exception)}. Per favore, rigenera un SQL valido."
+            ).get(language)
+        )
+        if repairing:
+            messages.add_message_user(
+                TranslatableText(
+                    "Regenerate the complete dataset, including all tables.",
+                    it="Rigenera il dataset completo, incluse tutte le tabelle."
+                ).get(language)
+            )
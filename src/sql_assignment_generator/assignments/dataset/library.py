@@ -0,0 +1,236 @@
+'''On-disk library of generated datasets, reused by later assignments with compatible requirements.'''
+
+from collections.abc import Sequence
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import sqlglot
+from sqlglot import exp
+
+from .dataset import Dataset
+from ...constraints import SchemaConstraint, schema as schema_constraints
+from ...exceptions import ConstraintValidationError
+from ... import tracing
+from ...environment import load_environment
+
+
+def constraints_signature(constraints: Sequence[SchemaConstraint]) -> str:
+    '''
+    Canonical representation of a set of schema constraints, after merging similar ones.
+    The same requirements give the same signature, regardless of their order.
+    '''
+
+    merged = schema_constraints.merge_constraints(constraints)
+    return json.dumps(sorted(
+        [type(constraint).__name__, sorted((key, repr(value)) for key, value in vars(constraint).items())]
+        for constraint in merged
+    ))
+
+
+def satisfies(dataset: Dataset, constraints: Sequence[SchemaConstraint], *, sql_dialect: str) -> bool:
+    '''Whether `dataset` satisfies all `constraints`.'''
+
+    try:
+        tables = [statement for command in dataset.create_commands for statement in sqlglot.parse(command, read=sql_dialect)]
+        inserts = [statement for command in dataset.insert_commands for statement in sqlglot.parse(command, read=sql_dialect)]
+    except sqlglot.errors.ParseError:
+        return False
+
+    tables = [table for table in tables if isinstance(table, exp.Create)]
+    inserts = [insert for insert in inserts if isinstance(insert, exp.Insert)]
+
+    for constraint in schema_constraints.merge_constraints(constraints):
+        try:
+            constraint.validate(dataset.catalog, tables, inserts)
+        except ConstraintValidationError:
+            return False
+
+    return True
+
+
+class DatasetLibrary:
+    '''
+    Generated datasets, stored in a SQLite file and indexed by domain, SQL dialect and constraints.
+
+    When the number of stored datasets exceeds `max_entries`, or their total size exceeds `max_bytes`,
+    the least recently used ones are evicted.
+    '''
+
+    def __init__(self, path: str, *, max_entries: int | None = None, max_bytes: int | None = None) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('''
+            CREATE TABLE IF NOT EXISTS datasets (
+                id INTEGER PRIMARY KEY,
+                domain TEXT NOT NULL,
+                sql_dialect TEXT NOT NULL,
+                signature TEXT NOT NULL,
+                extra_details TEXT NOT NULL,
+                content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS datasets_lookup ON datasets (sql_dialect, domain, accessed_at)')
+
+        self._loaded: dict[int, Dataset] = {}
+        '''Datasets already deserialized, whose catalogs can be reused across lookups.'''
+
+    def find(
+            self,
+            domain: str | None,
+            sql_dialect: str,
+            constraints: Sequence[SchemaConstraint],
+            extra_details: Sequence[str] = ()
+        ) -> Dataset | None:
+        '''
+        Return a stored dataset for `domain` (any domain if None) and `sql_dialect` that satisfies `constraints`,
+        and that was generated with at least the given `extra_details`. Returns None if there is none.
+
+        Datasets generated for the same constraints are returned directly; the others are checked against `constraints`.
+        The most recently used datasets are tried first.
+        '''
+
+        signature = constraints_signature(constraints)
+        required_details = set(extra_details)
+
+        with tracing.span('dataset.library', domain=domain, sql_dialect=sql_dialect) as library_span, self._lock:
+            query = 'SELECT id, signature, extra_details, content FROM datasets WHERE sql_dialect = ?'
+            params: tuple = (sql_dialect,)
+            if domain is not None:
+                query += ' AND domain = ?'
+                params += (domain,)
+            rows = self._connection.execute(query + ' ORDER BY signature = ? DESC, accessed_at DESC', params + (signature,)).fetchall()
+
+            for dataset_id, dataset_signature, dataset_details, content in rows:
+                if not required_details <= set(json.loads(dataset_details)):
+                    continue
+
+                dataset = self._loaded.get(dataset_id)
+                if dataset is None:
+                    dataset = Dataset.from_dict(json.loads(content))
+                    self._loaded[dataset_id] = dataset
+
+                if dataset_signature != signature and not satisfies(dataset, constraints, sql_dialect=sql_dialect):
+                    continue
+
+                self._connection.execute('UPDATE datasets SET accessed_at = ? WHERE id = ?', (time.time(), dataset_id))
+                tracing.increment('dataset.library_hits')
+                library_span.set(outcome='hit')
+                return dataset
+
+            tracing.increment('dataset.library_misses')
+            library_span.set(outcome='miss')
+            return None
+
+    def add(
+            self,
+            dataset: Dataset,
+            *,
+            sql_dialect: str,
+            constraints: Sequence[SchemaConstraint],
+            extra_details: Sequence[str] = ()
+        ) -> None:
+        '''Store a dataset generated for `constraints` and `extra_details`, evicting the least recently used ones if needed.'''
+
+        content = json.dumps(dataset.to_dict())
+        now = time.time()
+
+        with self._lock:
+            self._connection.execute(
+                '''
+                INSERT INTO datasets (domain, sql_dialect, signature, extra_details, content, size, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''',
+                (dataset.domain, sql_dialect, constraints_signature(constraints), json.dumps(sorted(set(extra_details))),
+                 content, len(content.encode('utf-8')), now, now)
+            )
+            self._evict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            count, = self._connection.execute('SELECT COUNT(*) FROM datasets').fetchone()
+            return count
+
+    def clear(self) -> None:
+        '''Remove all datasets.'''
+        with self._lock:
+            self._connection.execute('DELETE FROM datasets')
+            self._loaded.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _evict(self) -> None:
+        '''Must be called while holding the lock.'''
+
+        rows = self._connection.execute('SELECT id, size FROM datasets ORDER BY accessed_at DESC').fetchall()
+
+        kept = 0
+        total_size = 0
+        evicted = []
+        for dataset_id, size in rows:
+            kept += 1
+            total_size += size
+            if (self.max_entries is not None and kept > self.max_entries) or (self.max_bytes is not None and total_size > self.max_bytes):
+                evicted.append(dataset_id)
+
+        self._connection.executemany('DELETE FROM datasets WHERE id = ?', [(dataset_id,) for dataset_id in evicted])
+        for dataset_id in evicted:
+            self._loaded.pop(dataset_id, None)
+
+
+_library: DatasetLibrary | None = None
+_library_configured = False
+_library_lock = threading.Lock()
+
+
+def get_library() -> DatasetLibrary | None:
+    '''
+    Return the dataset library used by `generate_assignment`, or None if datasets are not reused.
+
+    Unless `set_library` was called, the library is configured from environment variables:
+    `SQL_GENERATION_DATASET_LIBRARY` (path of the library file; reuse is disabled if unset),
+    `SQL_GENERATION_DATASET_LIBRARY_MAX_ENTRIES` and `SQL_GENERATION_DATASET_LIBRARY_MAX_BYTES`.
+    '''
+
+    global _library, _library_configured
+
+    with _library_lock:
+        if not _library_configured:
+            load_environment()
+            path = os.getenv('SQL_GENERATION_DATASET_LIBRARY')
+            if path:
+                max_entries = os.getenv('SQL_GENERATION_DATASET_LIBRARY_MAX_ENTRIES')
+                max_bytes = os.getenv('SQL_GENERATION_DATASET_LIBRARY_MAX_BYTES')
+                _library = DatasetLibrary(
+                    path,
+                    max_entries=int(max_entries) if max_entries else None,
+                    max_bytes=int(max_bytes) if max_bytes else None,
+                )
+            _library_configured = True
+
+        return _library
+
+
+def set_library(library: DatasetLibrary | None) -> None:
+    '''Use `library` for all subsequent assignments. Passing None disables dataset reuse.'''
+
+    global _library, _library_configured
+
+    with _library_lock:
+        _library = library
+        _library_configured = True
@@ -104,4 +104,20 @@ def feedback_constraint_violations(errors: list[str], * , language: str) -> str:
     return TranslatableText(
         f"The previous JSON output was rejected because the SQL violated these constraints: {', '.join(errors)}\n Regenerate the JSON correcting the SQL to satisfy all mandatory constraints.",
         it=f"Il precedente output JSON è stato rifiutato perché il SQL ha violato queste constraint: {', '.join(errors)}\n Rigenera il JSON correggendo il SQL per soddisfare tutte le constraint obbligatorie."
-    ).get(language)
\ No newline at end of file
+    ).get(language)
+
+def feedback_repair_tables(errors: list[str], tables: Sequence[str], kept_tables: Sequence[str], *, language: str) -> str:
+    tables_str = ', '.join(f'"{table}"' for table in tables)
+    kept_tables_str = '\n'.join(kept_tables)
+    return TranslatableText(
+        f"The previous JSON output was rejected because the SQL violated these constraints: {', '.join(errors)}\n"
+        f"Regenerate ONLY the following tables: {tables_str}. "
+        "Return their CREATE TABLE and INSERT INTO statements in the same JSON format, without the other tables, which are kept as they are. "
+        "Keep the same table names, and keep all columns referenced by the FOREIGN KEYs of the other tables, so that the rest of the dataset remains valid.\n"
+        f"The other tables are:\n{kept_tables_str}",
+        it=f"Il precedente output JSON è stato rifiutato perché il SQL ha violato queste constraint: {', '.join(errors)}\n"
+        f"Rigenera SOLO le seguenti tabelle: {tables_str}. "
+        "Restituisci le loro istruzioni CREATE TABLE e INSERT INTO nello stesso formato JSON, senza le altre tabelle, che vengono mantenute così come sono. "
+        "Mantieni gli stessi nomi delle tabelle e tutte le colonne referenziate dalle FOREIGN KEY delle altre tabelle, in modo che il resto del dataset rimanga valido.\n"
+        f"Le altre tabelle sono:\n{kept_tables_str}"
+    ).get(language)
@@ -0,0 +1,602 @@
+'''
+Local synthesis of additional rows, to scale a generated dataset beyond the few rows the LLM can produce.
+
+Rows are derived from the rows generated by the LLM (the seed rows) and from the CREATE TABLE statements:
+- primary keys and UNIQUE columns get new, distinct values;
+- foreign keys reference existing (seed or synthesized) rows of the referenced table;
+- other columns are sampled from the range (numbers, dates) or from the values (text, booleans) of the seed rows,
+  with the same ratio of NULLs;
+- rows violating a CHECK constraint take the values of the checked columns from a seed row, which is known to satisfy it.
+
+Generation is deterministic for a given seed, so rows do not need to be stored: they are streamed in batches when the dataset is loaded.
+'''
+
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import dav_tools
+import random
+import re
+
+import sqlglot
+from sqlglot import exp
+
+from ...db.batch import RawValue, RowBatch, literal_value
+
+
+_MAX_RETRIES = 20
+'''Attempts to generate a row that does not violate a key, before giving up on the table.'''
+
+_DATE_TYPES = (exp.DataType.Type.DATE, exp.DataType.Type.DATE32)
+_DATETIME_TYPES = (
+    exp.DataType.Type.DATETIME, exp.DataType.Type.DATETIME64,
+    exp.DataType.Type.TIMESTAMP, exp.DataType.Type.TIMESTAMPTZ, exp.DataType.Type.TIMESTAMPLTZ,
+)
+_SERIAL_TYPES = (exp.DataType.Type.SERIAL, exp.DataType.Type.SMALLSERIAL, exp.DataType.Type.BIGSERIAL)
+
+
+@dataclass(frozen=True)
+class SyntheticRows:
+    '''Number of rows to synthesize for each table of a dataset.'''
+
+    rows: dict[str, int]
+    '''Total number of rows (seed rows included) for each table, by lowercase table name. Tables not listed are left as they are.'''
+
+    sql_dialect: str
+    '''Dialect of the dataset SQL commands.'''
+
+    seed: int = 0
+    '''Seed of the random generator.'''
+
+
+class _Unsupported(Exception):
+    '''Raised when a CHECK condition cannot be evaluated locally.'''
+
+
+def _compare(op: type[exp.Expression], left, right) -> bool | None:
+    if left is None or right is None:
+        return None
+
+    try:
+        # dates are stored as Python objects, but compared with string literals
+        if isinstance(left, date) and isinstance(right, str):
+            right = type(left).fromisoformat(right)
+        elif isinstance(right, date) and isinstance(left, str):
+            left = type(right).fromisoformat(left)
+
+        if op is exp.EQ:
+            return left == right
+        if op is exp.NEQ:
+            return left != right
+        if op is exp.GT:
+            return left > right
+        if op is exp.GTE:
+            return left >= right
+        if op is exp.LT:
+            return left < right
+        if op is exp.LTE:
+            return left <= right
+    except (TypeError, ValueError):
+        raise _Unsupported()
+    raise _Unsupported()
+
+
+def _evaluate(node: exp.Expression, row: dict[str, object]):
+    '''Evaluate a CHECK condition on a row, with SQL three-valued logic (None is unknown).'''
+
+    if isinstance(node, exp.Paren):
+        return _evaluate(node.this, row)
+    if isinstance(node, exp.Column):
+        if node.name.lower() not in row:
+            raise _Unsupported()
+        return row[node.name.lower()]
+    if isinstance(node, (exp.Literal, exp.Null, exp.Boolean, exp.Neg)):
+        value = literal_value(node, None)
+        if isinstance(value, RawValue):
+            raise _Unsupported()
+        return value
+    if isinstance(node, exp.Not):
+        value = _evaluate(node.this, row)
+        return None if value is None else not value
+    if isinstance(node, exp.And):
+        left, right = _evaluate(node.this, row), _evaluate(node.expression, row)
+        if left is False or right is False:
+            return False
+        return None if left is None or right is None else True
+    if isinstance(node, exp.Or):
+        left, right = _evaluate(node.this, row), _evaluate(node.expression, row)
+        if left is True or right is True:
+            return True
+        return None if left is None or right is None else False
+    if isinstance(node, (exp.EQ, exp.NEQ, exp.GT, exp.GTE, exp.LT, exp.LTE)):
+        return _compare(type(node), _evaluate(node.this, row), _evaluate(node.expression, row))
+    if isinstance(node, exp.Is):
+        if not isinstance(node.expression, exp.Null):
+            raise _Unsupported()
+        return _evaluate(node.this, row) is None
+    if isinstance(node, exp.Between):
+        value = _evaluate(node.this, row)
+        low = _compare(exp.GTE, value, _evaluate(node.args['low'], row))
+        high = _compare(exp.LTE, value, _evaluate(node.args['high'], row))
+        if low is False or high is False:
+            return False
+        return None if low is None or high is None else True
+    if isinstance(node, exp.In):
+        if not node.expressions:
+            raise _Unsupported()
+        value = _evaluate(node.this, row)
+        if value is None:
+            return None
+        return any(_compare(exp.EQ, value, _evaluate(item, row)) for item in node.expressions)
+    if isinstance(node, (exp.Add, exp.Sub, exp.Mul, exp.Div)):
+        left, right = _evaluate(node.this, row), _evaluate(node.expression, row)
+        if left is None or right is None:
+            return None
+        try:
+            if isinstance(node, exp.Add):
+                return left + right
+            if isinstance(node, exp.Sub):
+                return left - right
+            if isinstance(node, exp.Mul):
+                return left * right
+            return left / right
+        except (TypeError, ZeroDivisionError):
+            raise _Unsupported()
+    if isinstance(node, (exp.Like, exp.ILike)):
+        value, pattern = _evaluate(node.this, row), _evaluate(node.expression, row)
+        if value is None or pattern is None:
+            return None
+        regex = ''.join('.*' if char == '%' else '.' if char == '_' else re.escape(char) for char in str(pattern))
+        return re.fullmatch(regex, str(value), flags=re.DOTALL | (re.IGNORECASE if isinstance(node, exp.ILike) else 0)) is not None
+    if isinstance(node, exp.Length):
+        value = _evaluate(node.this, row)
+        return None if value is None else len(str(value))
+
+    raise _Unsupported()
+
+
+@dataclass
+class _Column:
+    name: str
+    '''Lowercase column name.'''
+
+    kind: exp.DataType.Type | None
+    '''Declared type.'''
+
+    unique: bool = False
+    '''Whether the column alone is a primary key or has a UNIQUE constraint.'''
+
+    nullable: bool = True
+    '''Whether the column accepts NULLs.'''
+
+    serial: bool = False
+    '''Whether values are generated by the database (SERIAL / AUTO_INCREMENT).'''
+
+
+@dataclass
+class _ForeignKey:
+    columns: tuple[str, ...]
+    '''Referencing columns (lowercase).'''
+
+    table: str
+    '''Referenced table (lowercase).'''
+
+    referenced_columns: tuple[str, ...]
+    '''Referenced columns (lowercase), or empty for the primary key of the referenced table.'''
+
+
+@dataclass
+class _Table:
+    name: str
+    '''Lowercase table name.'''
+
+    table_sql: str
+    '''Table name, as SQL.'''
+
+    columns: OrderedDict[str, _Column]
+    '''All columns of the table, by lowercase name.'''
+
+    primary_key: tuple[str, ...]
+
+    unique_keys: list[tuple[str, ...]]
+    '''Primary key and UNIQUE constraints.'''
+
+    foreign_keys: list[_ForeignKey]
+
+    checks: list[exp.Expression]
+
+    insert_columns: list[str] | None = None
+    '''Columns listed in the seed INSERTs (lowercase), or None if there are no seed rows.'''
+
+    insert_columns_sql: list[str] | None = None
+
+    seed_rows: list[tuple] | None = None
+
+
+def _parse_table(create: exp.Create, sql_dialect: str) -> _Table | None:
+    schema = create.this
+    if not isinstance(schema, exp.Schema) or not isinstance(schema.this, exp.Table):
+        return None
+
+    columns: OrderedDict[str, _Column] = OrderedDict()
+    primary_key: tuple[str, ...] = ()
+    unique_keys: list[tuple[str, ...]] = []
+    foreign_keys: list[_ForeignKey] = []
+    checks: list[exp.Expression] = []
+
+    def reference(ref: exp.Reference) -> tuple[str, tuple[str, ...]]:
+        target = ref.this
+        if isinstance(target, exp.Schema):
+            return target.this.name.lower(), tuple(col.name.lower() for col in target.expressions)
+        return target.name.lower(), ()
+
+    for item in schema.expressions:
+        if isinstance(item, exp.ColumnDef):
+            kind = item.args.get('kind')
+            column = _Column(item.name.lower(), kind.this if isinstance(kind, exp.DataType) else None)
+            column.serial = column.kind in _SERIAL_TYPES
+
+            for constraint in item.constraints:
+                constraint_kind = constraint.kind
+                if isinstance(constraint_kind, exp.PrimaryKeyColumnConstraint):
+                    primary_key = (column.name,)
+                    column.unique = True
+                    column.nullable = False
+                elif isinstance(constraint_kind, exp.UniqueColumnConstraint):
+                    column.unique = True
+                elif isinstance(constraint_kind, exp.NotNullColumnConstraint) and not constraint_kind.args.get('allow_null'):
+                    column.nullable = False
+                elif isinstance(constraint_kind, exp.AutoIncrementColumnConstraint):
+                    column.serial = True
+                elif isinstance(constraint_kind, exp.Reference):
+                    table, referenced = reference(constraint_kind)
+                    foreign_keys.append(_ForeignKey((column.name,), table, referenced))
+                elif isinstance(constraint_kind, exp.CheckColumnConstraint):
+                    checks.append(constraint_kind.this)
+
+            if column.unique:
+                unique_keys.append((column.name,))
+            columns[column.name] = column
+        elif isinstance(item, exp.PrimaryKey):
+            primary_key = tuple(
+                (key.this if isinstance(key, exp.Ordered) else key).name.lower()
+                for key in item.expressions
+            )
+            unique_keys.append(primary_key)
+        elif isinstance(item, exp.UniqueColumnConstraint) and isinstance(item.this, exp.Schema):
+            unique_keys.append(tuple(col.name.lower() for col in item.this.expressions))
+        elif isinstance(item, exp.ForeignKey):
+            ref = item.args.get('reference')
+            if isinstance(ref, exp.Reference):
+                table, referenced = reference(ref)
+                foreign_keys.append(_ForeignKey(tuple(col.name.lower() for col in item.expressions), table, referenced))
+        elif isinstance(item, (exp.CheckColumnConstraint, exp.Check)):
+            checks.append(item.this)
+
+    for name in primary_key:
+        if name in columns:
+            columns[name].nullable = False
+    for key in unique_keys:
+        if len(key) == 1 and key[0] in columns:
+            columns[key[0]].unique = True
+
+    return _Table(
+        name=schema.this.name.lower(),
+        table_sql=schema.this.sql(dialect=sql_dialect),
+        columns=columns,
+        primary_key=primary_key,
+        unique_keys=unique_keys,
+        foreign_keys=foreign_keys,
+        checks=checks,
+    )
+
+
+def _add_seed_rows(tables: dict[str, _Table], insert: exp.Insert, sql_dialect: str) -> None:
+    target = insert.this
+    table_node = target.this if isinstance(target, exp.Schema) else target
+    if not isinstance(table_node, exp.Table) or table_node.name.lower() not in tables:
+        return
+    table = tables[table_node.name.lower()]
+
+    if isinstance(target, exp.Schema):
+        columns = [col.name.lower() for col in target.expressions]
+        columns_sql = [col.sql(dialect=sql_dialect) for col in target.expressions]
+    else:
+        columns = list(table.columns)
+        columns_sql = [exp.to_identifier(name).sql(dialect=sql_dialect) for name in columns]
+
+    values = insert.expression
+    if not isinstance(values, exp.Values):
+        return
+
+    # only rows with the same columns as the first INSERT of the table are used
+    if table.insert_columns is None:
+        table.insert_columns = columns
+        table.insert_columns_sql = columns_sql
+        table.seed_rows = []
+    elif table.insert_columns != columns:
+        return
+
+    assert table.seed_rows is not None
+    for row in values.expressions:
+        if isinstance(row, exp.Tuple) and len(row.expressions) == len(columns):
+            table.seed_rows.append(tuple(literal_value(value, sql_dialect) for value in row.expressions))
+
+
+def _sorted_by_dependencies(tables: dict[str, _Table]) -> list[_Table]:
+    '''Tables sorted so that referenced tables come first (cycles are broken arbitrarily).'''
+
+    result: list[_Table] = []
+    visited: set[str] = set()
+
+    def visit(name: str) -> None:
+        if name in visited:
+            return
+        visited.add(name)
+        for foreign_key in tables[name].foreign_keys:
+            if foreign_key.table in tables:
+                visit(foreign_key.table)
+        result.append(tables[name])
+
+    for name in tables:
+        visit(name)
+
+    return result
+
+
+class _ColumnGenerator:
+    '''Generates values for a column, based on its seed values.'''
+
+    def __init__(self, column: _Column, seeds: list) -> None:
+        self.column = column
+        self.values = [value for value in seeds if value is not None]
+        self.null_ratio = (len(seeds) - len(self.values)) / len(seeds) if seeds and column.nullable else 0.0
+
+        # interpret dates, so that new ones can be generated in the same range
+        if column.kind in _DATE_TYPES + _DATETIME_TYPES:
+            parser = date.fromisoformat if column.kind in _DATE_TYPES else datetime.fromisoformat
+            try:
+                self.values = [parser(value) if isinstance(value, str) else value for value in self.values]
+            except ValueError:
+                pass
+
+        kinds = {type(value) for value in self.values}
+        if kinds == {int, Decimal}:
+            self.kind: type | None = Decimal
+        elif len(kinds) == 1:
+            self.kind = kinds.pop()
+        else:
+            self.kind = None
+
+        if self.kind in (int, Decimal):
+            self.low, self.high = min(self.values), max(self.values)
+            self.decimals = max((-value.as_tuple().exponent for value in self.values if isinstance(value, Decimal)), default=0)
+        elif self.kind in (date, datetime):
+            self.low, self.high = min(self.values), max(self.values)
+
+    def unique(self, n: int, rng: random.Random):
+        '''The `n`-th new value of a unique column: distinct from all seed values and from the other new values.'''
+
+        if self.kind is int:
+            return self.high + n
+        if self.kind is Decimal:
+            return Decimal(self.high + n).quantize(Decimal(1).scaleb(-self.decimals))
+        if self.kind is date:
+            return self.high + timedelta(days=n)
+        if self.kind is datetime:
+            return self.high + timedelta(minutes=n)
+        if self.kind is str:
+            base = self.values[n % len(self.values)]
+            name, at, domain = base.partition('@')
+            return f'{name}_{n}{at}{domain}'
+        return self.sample(rng)
+
+    def sample(self, rng: random.Random):
+        '''A random value, in the range or among the values of the seed rows.'''
+
+        if not self.values or (self.null_ratio and rng.random() < self.null_ratio):
+            return None
+
+        if self.kind is int:
+            return rng.randint(self.low, self.high)
+        if self.kind is Decimal:
+            # a multiple of the smallest unit of the seed values, so that their precision is kept
+            low, high = Decimal(self.low).scaleb(self.decimals), Decimal(self.high).scaleb(self.decimals)
+            return Decimal(rng.randint(int(low), int(high))).scaleb(-self.decimals)
+        if self.kind is date:
+            return self.low + timedelta(days=rng.randint(0, (self.high - self.low).days))
+        if self.kind is datetime:
+            return self.low + timedelta(seconds=rng.randint(0, int((self.high - self.low).total_seconds())))
+        return rng.choice(self.values)
+
+
+class _TableGenerator:
+    '''Generates the new rows of a table.'''
+
+    def __init__(self, table: _Table, pools: dict[tuple[str, tuple[str, ...]], list[tuple]], seed: int) -> None:
+        assert table.insert_columns is not None and table.seed_rows is not None
+
+        self.table = table
+        self.columns = table.insert_columns
+        self.positions = {name: idx for idx, name in enumerate(self.columns)}
+        self.rng = random.Random(f'{seed}:{table.name}')
+
+        self.generators = [
+            _ColumnGenerator(table.columns.get(name) or _Column(name, None), [row[idx] for row in table.seed_rows])
+            for idx, name in enumerate(self.columns)
+        ]
+
+        # foreign keys whose values can be taken from the referenced table
+        self.foreign_keys: list[tuple[list[int], list[tuple]]] = []
+        for foreign_key in table.foreign_keys:
+            pool = pools.get((foreign_key.table, foreign_key.referenced_columns))
+            if pool and all(name in self.positions for name in foreign_key.columns):
+                self.foreign_keys.append(([self.positions[name] for name in foreign_key.columns], pool))
+        # foreign key values must exist in the referenced table, so they are never invented
+        fk_columns = {name for foreign_key in table.foreign_keys for name in foreign_key.columns}
+        self.unique_positions = {
+            idx for idx, name in enumerate(self.columns)
+            if name in table.columns and table.columns[name].unique and name not in fk_columns
+        }
+
+        # keys whose uniqueness must be checked (keys including generated columns are skipped)
+        self.keys = [
+            [self.positions[name] for name in key]
+            for key in table.unique_keys
+            if all(name in self.positions for name in key)
+        ]
+        self.seen: list[set[tuple]] = [{tuple(row[idx] for idx in key) for row in table.seed_rows} for key in self.keys]
+
+        self.check_positions = sorted({
+            self.positions[column.name.lower()]
+            for check in table.checks
+            for column in check.find_all(exp.Column)
+            if column.name.lower() in self.positions
+        })
+
+        self.generated = 0
+
+    def _candidate(self) -> list:
+        n = self.generated + 1
+        row = [
+            generator.unique(n, self.rng) if idx in self.unique_positions else generator.sample(self.rng)
+            for idx, generator in enumerate(self.generators)
+        ]
+
+        for positions, pool in self.foreign_keys:
+            values = self.rng.choice(pool)
+            for idx, value in zip(positions, values):
+                row[idx] = value
+
+        if self.table.checks and not self._satisfies_checks(row):
+            # seed rows were accepted by the database, so their values satisfy all checks
+            assert self.table.seed_rows
+            source = self.rng.choice(self.table.seed_rows)
+            for idx in self.check_positions:
+                row[idx] = source[idx]
+
+        return row
+
+    def _satisfies_checks(self, row: list) -> bool:
+        values = dict(zip(self.columns, row))
+        try:
+            return all(_evaluate(check, values) is not False for check in self.table.checks)
+        except _Unsupported:
+            return False
+
+    def next_row(self) -> tuple | None:
+        '''A new row, or None if no row satisfying all keys could be generated.'''
+
+        for _ in range(_MAX_RETRIES):
+            row = self._candidate()
+
+            keys = [tuple(row[idx] for idx in key) for key in self.keys]
+            if any(None not in key and key in seen for key, seen in zip(keys, self.seen)):
+                continue
+
+            for key, seen in zip(keys, self.seen):
+                seen.add(key)
+            self.generated += 1
+            return tuple(row)
+
+        return None
+
+
+def _pool_keys(tables: dict[str, _Table]) -> set[tuple[str, tuple[str, ...]]]:
+    '''Referenced (table, columns) pairs.'''
+
+    return {(fk.table, fk.referenced_columns) for table in tables.values() for fk in table.foreign_keys if fk.table in tables}
+
+
+def _referenced_values(table: _Table, referenced_columns: tuple[str, ...], rows: list[tuple], first_serial: int) -> list[tuple] | None:
+    '''Values of the referenced columns in `rows`. Columns generated by the database are numbered from `first_serial`.'''
+
+    assert table.insert_columns is not None
+
+    columns = referenced_columns or table.primary_key
+    if not columns:
+        return None
+
+    positions = []
+    for name in columns:
+        if name in table.insert_columns:
+            positions.append(table.insert_columns.index(name))
+        elif name in table.columns and table.columns[name].serial and len(columns) == 1:
+            return [(first_serial + i,) for i in range(len(rows))]
+        else:
+            return None
+
+    return [tuple(row[idx] for idx in positions) for row in rows]
+
+
+def synthesize(
+        create_commands: list[str],
+        insert_commands: list[str],
+        config: SyntheticRows,
+        *,
+        batch_size: int = 1000
+    ) -> Iterator[RowBatch]:
+    '''
+    Generate the synthetic rows of a dataset, in batches of at most `batch_size` rows.
+    Batches are yielded in an order that satisfies foreign keys, provided that the seed rows have already been inserted.
+    '''
+
+    tables: dict[str, _Table] = {}
+    for command in create_commands:
+        statement = sqlglot.parse_one(command, read=config.sql_dialect)
+        if isinstance(statement, exp.Create):
+            table = _parse_table(statement, config.sql_dialect)
+            if table is not None:
+                tables[table.name] = table
+
+    for command in insert_commands:
+        for statement in sqlglot.parse(command, read=config.sql_dialect):
+            if isinstance(statement, exp.Insert):
+                _add_seed_rows(tables, statement, config.sql_dialect)
+
+    # values available to foreign keys, for each referenced (table, columns)
+    pool_keys = _pool_keys(tables)
+    pools: dict[tuple[str, tuple[str, ...]], list[tuple]] = {}
+    for table_name, columns in pool_keys:
+        table = tables[table_name]
+        if table.seed_rows:
+            values = _referenced_values(table, columns, table.seed_rows, first_serial=1)
+            if values is not None:
+                pools[(table_name, columns)] = values
+
+    for table in _sorted_by_dependencies(tables):
+        target = config.rows.get(table.name, 0)
+        if not table.seed_rows or target <= len(table.seed_rows):
+            continue
+
+        assert table.insert_columns_sql is not None
+        generator = _TableGenerator(table, pools, config.seed)
+        table_pools = [(columns, pools.get((table.name, columns))) for table_name, columns in pool_keys if table_name == table.name]
+
+        remaining = target - len(table.seed_rows)
+        while remaining > 0:
+            rows = []
+            for _ in range(min(batch_size, remaining)):
+                row = generator.next_row()
+                if row is None:
+                    break
+                rows.append(row)
+
+            if not rows:
+                break
+
+            # make the new rows available to the tables referencing this one
+            for columns, pool in table_pools:
+                if pool is not None:
+                    values = _referenced_values(table, columns, rows, first_serial=len(table.seed_rows) + generator.generated - len(rows) + 1)
+                    if values is not None:
+                        pool.extend(values)
+
+            remaining -= len(rows)
+            yield RowBatch(table.table_sql, table.insert_columns_sql, rows)
+
+            if len(rows) < batch_size and remaining > 0:
+                dav_tools.messages.warning(f'Could not synthesize more distinct rows for table "{table.name}" ({remaining} missing).')
+                break
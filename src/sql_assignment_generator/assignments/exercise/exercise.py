@@ -1,17 +1,43 @@
-from dataclasses import dataclass
+from collections.abc import Callable, Generator
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import partial
+from pydantic import BaseModel
+from typing import Any
 from sql_error_taxonomy import SqlErrors
-from sqlscope import Query
+from sqlscope import Catalog, Query
 import dav_tools
+import asyncio
+import contextvars
 import os
 
 from . import strings
+from .fingerprint import SolutionRegistry
+from .validation import validate_locally
 from ..dataset import Dataset
 from ...constraints import QueryConstraint
 from ...difficulty_level import DifficultyLevel
 from ... import llm
-from ...exceptions import ExerciseGenerationError, SQLParsingError, ConstraintValidationError
+from ...exceptions import ExerciseGenerationError, SQLParsingError, LLMRequestError
 from ...translatable_text import TranslatableText
-from ...db import get_database, QueryExecutionError
+from ... import tracing
+from ...budget import Budget
+from ...environment import load_environment
+from ...steps import Step, step, run_steps, arun_steps
+from ...db import Database, get_database, QueryExecutionError
+
+
+def _rejected_at(stage: str) -> None:
+    '''
+    Record the validation stage that rejected a candidate solution.
+    Candidates rejected by the local checks that precede execution (constraints and resolution) save a database round-trip,
+    and a dataset load if the dataset is not shared.
+    '''
+
+    tracing.increment('exercise.validation', stage=stage)
+    if stage in ('constraints', 'resolution'):
+        tracing.increment('db.round_trips_saved')
+
 
 @dataclass
 class Exercise:
@@ -32,6 +58,32 @@ class Exercise:
     error: SqlErrors
     '''The SQL error type associated with the exercise.'''
 
+    usage: llm.Usage = field(default_factory=llm.Usage, compare=False)
+    '''Tokens used by the LLM requests made to generate the exercise, including failed attempts.'''
+
+    def to_dict(self) -> dict:
+        '''JSON-serializable representation of the exercise. LLM usage is not included.'''
+
+        return {
+            'title': self.title,
+            'request': self.request,
+            'solutions': [solution.sql for solution in self.solutions],
+            'difficulty': self.difficulty.name,
+            'error': self.error.name,
+        }
+
+    @staticmethod
+    def from_dict(data: dict, *, catalog: Catalog) -> 'Exercise':
+        '''Inverse of `to_dict`. Solutions are parsed against `catalog`, the catalog of the exercise dataset.'''
+
+        return Exercise(
+            title=data['title'],
+            request=data['request'],
+            solutions=[Query(sql, catalog=catalog) for sql in data['solutions']],
+            difficulty=DifficultyLevel[data['difficulty']],
+            error=SqlErrors[data['error']],
+        )
+
     @staticmethod
     def generate(
         error: SqlErrors,
@@ -48,99 +100,440 @@ class Exercise:
         sql_dialect: str,
         language: str,
         max_attempts: int = 3,
+        dataset_schema: str | None = None,
+        db_isolation: str = 'schema',
+        embedded_db: bool = False,
+        use_cache: bool = True,
+        candidates: int = 1,
+        budget: Budget | None = None,
+        seen_solutions: SolutionRegistry | None = None,
+        validation_pool: Executor | None = None,
     ) -> 'Exercise':
-        '''Generate a SQL exercise based on the specified parameters.'''
+        '''
+        Generate a SQL exercise based on the specified parameters.
 
-        messages = llm.Message()
-        messages.add_message_user(strings.prompt_generate(
+        If `dataset_schema` is the name of a schema where the dataset has already been loaded (see `Dataset.materialize`),
+        candidate solutions are executed there in a read-only transaction, instead of loading the dataset on each attempt.
+        Otherwise, `db_isolation` selects how each attempt is isolated on the database (see `db.ISOLATION_STRATEGIES`).
+        If `embedded_db` is True, solutions are executed on an in-memory SQLite database instead of the configured server.
+        If `use_cache` is False, the LLM response cache is bypassed when asking for the exercise (e.g. to get a different solution for the same prompt).
+        Answers are stored in the cache only if they pass validation.
+        If `candidates` is greater than 1, each attempt asks the LLM for that many alternative exercises at once and validates them in parallel:
+        the first one satisfying all constraints is accepted, otherwise the closest one is used to give feedback for the next attempt.
+        If a `budget` is given, no attempt is started once it is exhausted, and `BudgetExhaustedError` is raised instead.
+        If `seen_solutions` is given, solutions equivalent to one of them (see `solution_fingerprint`) are rejected right after parsing,
+        before being executed or refined. The solution of the returned exercise is not added to `seen_solutions`.
+        If `validation_pool` is given, parsing and the other validation steps that do not need the database run there (see `_check_answer`),
+        e.g. in a `ProcessPoolExecutor` to use multiple cores.
+        '''
+
+        return run_steps(Exercise._generation_steps(
+            error, difficulty, constraints,
+            db_host=db_host, db_port=db_port, db_user=db_user, db_password=db_password,
+            extra_details=extra_details, dataset=dataset, title=title, sql_dialect=sql_dialect, language=language,
+            max_attempts=max_attempts, dataset_schema=dataset_schema, db_isolation=db_isolation, embedded_db=embedded_db,
+            use_cache=use_cache, candidates=candidates, budget=budget, seen_solutions=seen_solutions, validation_pool=validation_pool,
+        ))
+
+    @staticmethod
+    async def agenerate(
+        error: SqlErrors,
+        difficulty: DifficultyLevel,
+        constraints: list[QueryConstraint],
+        *,
+        db_host: str,
+        db_port: int,
+        db_user: str,
+        db_password: str,
+        extra_details: str,
+        dataset: Dataset,
+        title: str,
+        sql_dialect: str,
+        language: str,
+        max_attempts: int = 3,
+        dataset_schema: str | None = None,
+        db_isolation: str = 'schema',
+        embedded_db: bool = False,
+        use_cache: bool = True,
+        candidates: int = 1,
+        budget: Budget | None = None,
+        seen_solutions: SolutionRegistry | None = None,
+        validation_pool: Executor | None = None,
+    ) -> 'Exercise':
+        '''
+        Asynchronous version of `generate`.
+        LLM calls are awaited, while parsing, validation and database checks run in a worker thread.
+        '''
+
+        return await arun_steps(Exercise._generation_steps(
+            error, difficulty, constraints,
+            db_host=db_host, db_port=db_port, db_user=db_user, db_password=db_password,
+            extra_details=extra_details, dataset=dataset, title=title, sql_dialect=sql_dialect, language=language,
+            max_attempts=max_attempts, dataset_schema=dataset_schema, db_isolation=db_isolation, embedded_db=embedded_db,
+            use_cache=use_cache, candidates=candidates, budget=budget, seen_solutions=seen_solutions, validation_pool=validation_pool,
+        ))
+
+    @staticmethod
+    def _generation_steps(
+        error: SqlErrors,
+        difficulty: DifficultyLevel,
+        constraints: list[QueryConstraint],
+        *,
+        db_host: str,
+        db_port: int,
+        db_user: str,
+        db_password: str,
+        extra_details: str,
+        dataset: Dataset,
+        title: str,
+        sql_dialect: str,
+        language: str,
+        max_attempts: int = 3,
+        dataset_schema: str | None = None,
+        db_isolation: str = 'schema',
+        embedded_db: bool = False,
+        use_cache: bool = True,
+        candidates: int = 1,
+        budget: Budget | None = None,
+        seen_solutions: SolutionRegistry | None = None,
+        validation_pool: Executor | None = None,
+    ) -> Generator[Step, Any, 'Exercise']:
+        '''Logic of `generate` and `agenerate`, which yields a `Step` for each LLM request and validation (see `steps`).'''
+
+        load_environment()
+        messages = Exercise._initial_messages(dataset, constraints, extra_details=extra_details, sql_dialect=sql_dialect, language=language, difficulty=difficulty)
+        open_db = partial(get_database, db_host, db_port, db_user, db_password, sql_dialect, read_only_schema=dataset_schema, isolation=db_isolation, embedded=embedded_db)
+
+        check = partial(Exercise._check_answer, dataset=dataset, constraints=constraints, open_db=open_db, load_dataset=dataset_schema is None, language=language,
+                        sql_dialect=sql_dialect, seen_solutions=seen_solutions, validation_pool=validation_pool)
+
+        with tracing.span('exercise.generate', error=error.name, difficulty=difficulty.name), llm.tracking_usage() as usage:
+            for attempt in range(max_attempts):
+                if budget is not None:
+                    budget.check(f'generating exercise for {error.name}')
+
+                with tracing.span('exercise.attempt', attempt=attempt + 1) as attempt_span:
+                    tracing.increment('exercise.attempts')
+                    try:
+                        # answers are cached only once they pass validation, so that rejected ones are not replayed
+                        with llm.deferring_writes() as pending_writes:
+                            if candidates > 1:
+                                answers = yield step(
+                                    llm.generate_answers, llm.generate_answers_async,
+                                    messages,
+                                    json_format=llm.models.Assignment,
+                                    model=os.getenv('SQL_GENERATION_LLM_MODEL_EXERCISE', 'gpt-5.4-nano'),
+                                    n=candidates,
+                                    use_cache=use_cache,
+                                )
+                                picked = yield step(Exercise._first_valid, Exercise._afirst_valid, answers, check)
+                                answer, query, constraint_errors = Exercise._pick_candidate(messages, answers, picked)
+                            else:
+                                answer = yield step(
+                                    llm.generate_answer, llm.generate_answer_async,
+                                    messages,
+                                    json_format=llm.models.Assignment,
+                                    model=os.getenv('SQL_GENERATION_LLM_MODEL_EXERCISE', 'gpt-5.4-nano'),
+                                    use_cache=use_cache,
+                                )
+                                query, constraint_errors = yield step(check, None, answer)
+                        assert isinstance(answer, llm.models.Assignment)
+
+                        if constraint_errors:
+                            attempt_span.set(outcome='rejected')
+                            Exercise._reject(messages, constraint_errors, attempt=attempt, error=error, language=language)
+                            continue
+                        pending_writes.commit()
+
+                        # refine natural language request to remove hints
+                        with tracing.span('exercise.refine'):
+                            answer_refinement = yield step(
+                                llm.generate_answer, llm.generate_answer_async,
+                                Exercise._refinement_messages(answer, query, language=language),
+                                json_format=llm.models.RemoveHints,
+                                model=os.getenv('SQL_GENERATION_LLM_MODEL_EXERCISE_NL_REQUEST', 'gpt-4o-mini')
+                            )
+
+                        attempt_span.set(outcome='accepted')
+                        return Exercise._build(answer, answer_refinement, query, title=title, difficulty=difficulty, error=error, usage=usage)
+                    except Exception as e:
+                        attempt_span.set(outcome='failed', exception=type(e).__name__)
+                        tracing.increment('exercise.failures', exception=type(e).__name__)
+                        Exercise._report_failure(messages, e, attempt=attempt, language=language)
+
+        raise ExerciseGenerationError(f'Failed to generate a valid exercise for {error.name} after {max_attempts} attempts.')
+
+    @staticmethod
+    def _initial_messages(
+        dataset: Dataset,
+        constraints: list[QueryConstraint],
+        *,
+        extra_details: str,
+        sql_dialect: str,
+        language: str,
+        difficulty: DifficultyLevel
+    ) -> llm.Message:
+        '''Build the conversation used to ask the LLM for an exercise.'''
+
+        # only the most recent attempts are sent back, so that the prompt size does not grow with each retry
+        messages = llm.Message(max_history=int(os.getenv('SQL_GENERATION_LLM_MAX_HISTORY', '2')))
+
+        # the dataset comes first and is the same for all exercises, so that the provider can cache it
+        messages.add_message_user(strings.prompt_generate_context(
             dataset_str=dataset.to_sql_no_context(),
+            sql_dialect=sql_dialect,
+            language=language
+        ))
+        messages.add_message_user(strings.prompt_generate(
             extra_details=extra_details,
             constraints=constraints,
-            sql_dialect=sql_dialect,
             language=language,
             difficulty=difficulty
         ))
 
-        # start with a lower temperature for more focused generation,
-        # and increase it with each attempt to encourage more diversity in the generated solutions
-        for attempt in range(max_attempts):
+        return messages
+
+    @staticmethod
+    def _check_answer(
+        answer: llm.models.Assignment,
+        dataset: Dataset,
+        constraints: list[QueryConstraint],
+        *,
+        open_db: Callable[[], Database],
+        load_dataset: bool,
+        language: str,
+        sql_dialect: str = 'postgres',
+        seen_solutions: SolutionRegistry | None = None,
+        validation_pool: Executor | None = None
+    ) -> tuple[Query, list[str]]:
+        '''
+        Validate the generated solution in stages, from the cheapest to the most expensive, stopping at the first one that rejects it:
+        parsing, duplicate detection, constraints, resolution of its tables and columns against the dataset catalog, and finally execution.
+        Only solutions satisfying all constraints are executed on the database.
+
+        If `validation_pool` is given (e.g. a `ProcessPoolExecutor`), all stages but execution run there (see `validate_locally`).
+
+        Returns:
+            tuple[Query, list[str]]: The parsed solution and the list of violated constraints.
+        Raises:
+            SQLParsingError: If the solution cannot be parsed, references tables or columns that do not exist, or cannot be executed.
+        '''
+
+        if validation_pool is None:
+            local = validate_locally(answer.solution, dataset.catalog, constraints, sql_dialect=sql_dialect, language=language, seen_fingerprints=seen_solutions)
+        else:
+            with tracing.span('exercise.local_validation'):
+                local = validation_pool.submit(
+                    validate_locally,
+                    answer.solution,
+                    dataset.catalog,
+                    constraints,
+                    sql_dialect=sql_dialect,
+                    language=language,
+                    seen_fingerprints=seen_solutions.snapshot() if seen_solutions is not None else None
+                ).result()
+
+        # check syntax correctness of solution
+        if local.query is None:
+            _rejected_at('parse')
+            raise SQLParsingError(
+                TranslatableText(
+                    f"Generated SQL solution contains syntax errors: {local.parse_error}",
+                    it=f"La soluzione SQL generata contiene errori di sintassi: {local.parse_error}"
+                ).get(language),
+                answer.solution
+            )
+        query = local.query
+
+        # duplicates of other exercises are rejected before spending time on validating and executing them
+        if local.duplicate:
+            tracing.increment('exercise.duplicates')
+            _rejected_at('duplicate')
+            return query, [strings.feedback_duplicate_solution(language=language)]
+
+        # constraint validation only needs the AST, so it runs before the query is executed
+        for constraint_name in local.failed_constraints:
+            tracing.increment('exercise.constraint_failures', constraint=constraint_name)
+        if local.constraint_errors:
+            _rejected_at('constraints')
+            return query, local.constraint_errors
+
+        # references to missing tables or columns would make the execution fail anyway
+        if local.unresolved:
+            _rejected_at('resolution')
+            raise SQLParsingError(
+                TranslatableText(
+                    f"Generated SQL solution references tables or columns that do not exist in the dataset: {', '.join(local.unresolved)}",
+                    it=f"La soluzione SQL generata fa riferimento a tabelle o colonne che non esistono nel dataset: {', '.join(local.unresolved)}"
+                ).get(language),
+                query.sql
+            )
+
+        # execute the query to ensure it runs without errors
+        with tracing.span('db.execute'), tracing.timed('db.time'), open_db() as db:
             try:
-                answer = llm.generate_answer(
-                    messages,
-                    json_format=llm.models.Assignment,
-                    model=os.getenv('SQL_GENERATION_LLM_MODEL_EXERCISE', 'gpt-5.4-nano'),
+                if load_dataset:
+                    db.load_dataset(dataset)
+                db.execute(query.sql)
+            except QueryExecutionError as e:
+                _rejected_at('execution')
+                raise SQLParsingError(
+                    TranslatableText(
+                        f"Generated SQL solution cannot be executed: {e}",
+                        it=f"La soluzione SQL generata non può essere eseguita: {e}"
+                    ).get(language),
+                    query.sql
                 )
-                assert isinstance(answer, llm.models.Assignment)
-                
-                # check syntax correctness of solution
+
+        tracing.increment('exercise.validation', stage='accepted')
+        return query, []
+
+    @staticmethod
+    def _first_valid(
+        answers: list[llm.models.Assignment],
+        check: Callable[[llm.models.Assignment], tuple[Query, list[str]]]
+    ) -> tuple[int, tuple[Query, list[str]] | Exception]:
+        '''
+        Check all candidate answers in parallel and return the index and outcome of the first one satisfying all constraints.
+        If none does, return the one violating the fewest constraints, or the first one that could not be checked at all.
+        '''
+
+        executor = ThreadPoolExecutor(max_workers=len(answers))
+        try:
+            # each candidate runs in a copy of the current context, so that its spans are nested in the current attempt
+            futures = {executor.submit(contextvars.copy_context().run, check, answer): idx for idx, answer in enumerate(answers)}
+            outcomes: dict[int, tuple[Query, list[str]] | Exception] = {}
+
+            for future in as_completed(futures):
+                idx = futures[future]
                 try:
-                    query = Query(answer.solution, catalog=dataset.catalog)
+                    outcomes[idx] = future.result()
                 except Exception as e:
-                    raise SQLParsingError(
-                        TranslatableText(
-                            f"Generated SQL solution contains syntax errors: {e}",
-                            it=f"La soluzione SQL generata contiene errori di sintassi: {e}"
-                        ).get(language),
-                        answer.solution
-                    )
-                
-                # execute the query to ensure it runs without errors
-                with get_database(db_host, db_port, db_user, db_password, sql_dialect) as db:
-                    try:
-                        db.execute(dataset.to_sql_no_context())
-                        db.execute(query.sql)
-                    except QueryExecutionError as e:
-                        raise SQLParsingError(
-                            TranslatableText(
-                                f"Generated SQL solution cannot be executed: {e}",
-                                it=f"La soluzione SQL generata non può essere eseguita: {e}"
-                            ).get(language),
-                            query.sql
-                        )
-
-                # constraint validation
-                constraint_errors = []
-                
-                for constraint in constraints:
-                    try:
-                        constraint.validate(query)
-                    except ConstraintValidationError as e:
-                        constraint_errors.append(e.get(language))
-
-                if constraint_errors:
-                    missing_reqs = "\n\t- ".join(constraint_errors)
-                    dav_tools.messages.error(f'Validation failed for attempt {attempt + 1} (error: {error.name}). Missing requirements:\n\t- {missing_reqs}')
-                    messages.add_message_user(strings.feedback_validation_errors(constraint_errors, language=language))
+                    outcomes[idx] = e
                     continue
 
-                # refine natural language request to remove hints
-                messages_refinement = llm.Message()
-                messages_refinement.add_message_user(strings.prompt_refine_request(answer.request, query, language=language))
-                answer_refinement = llm.generate_answer(
-                    messages_refinement,
-                    json_format=llm.models.RemoveHints,
-                    model=os.getenv('SQL_GENERATION_LLM_MODEL_EXERCISE_NL_REQUEST', 'gpt-4o-mini')
-                )
+                if not outcomes[idx][1]:
+                    return idx, outcomes[idx]
+        finally:
+            # do not wait for the remaining candidates once one has been accepted
+            executor.shutdown(wait=False, cancel_futures=True)
 
-                assert isinstance(answer_refinement, llm.models.RemoveHints)
-                # dav_tools.messages.debug(f"Old Request: {answer.request}")
-                # dav_tools.messages.debug(f"Refined Request: {answer_refinement.request_without_hints}")
-                answer.request = answer_refinement.request_without_hints
-
-                return Exercise(
-                    title=title,
-                    request=answer.request,
-                    solutions=[query],
-                    difficulty=difficulty,
-                    error=error
-                )
+        return Exercise._closest(outcomes)
+
+    @staticmethod
+    async def _afirst_valid(
+        answers: list[llm.models.Assignment],
+        check: Callable[[llm.models.Assignment], tuple[Query, list[str]]]
+    ) -> tuple[int, tuple[Query, list[str]] | Exception]:
+        '''Asynchronous version of `_first_valid`.'''
+
+        async def _check(idx: int) -> tuple[int, tuple[Query, list[str]] | Exception]:
+            try:
+                return idx, await asyncio.to_thread(check, answers[idx])
             except Exception as e:
-                dav_tools.messages.error(f"Error during exercise generation (Attempt {attempt + 1}): {e}")
-                messages.add_message_user(
-                    TranslatableText(
-                        f"An error occurred: {str(e)}. Please regenerate valid JSON/SQL.",
-                        it=f"Si è verificato un errore: {str(e)}. Per favore rigenera JSON/SQL valido."
-                    ).get(language)
-                )
+                return idx, e
+
+        tasks = [asyncio.ensure_future(_check(idx)) for idx in range(len(answers))]
+        outcomes: dict[int, tuple[Query, list[str]] | Exception] = {}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                idx, outcome = await next_done
+                outcomes[idx] = outcome
+
+                if not isinstance(outcome, Exception) and not outcome[1]:
+                    return idx, outcome
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        return Exercise._closest(outcomes)
+
+    @staticmethod
+    def _closest(outcomes: dict[int, tuple[Query, list[str]] | Exception]) -> tuple[int, tuple[Query, list[str]] | Exception]:
+        '''Among rejected candidates, pick the one violating the fewest constraints. Candidates that failed to run come last.'''
+
+        def _rank(idx: int) -> tuple[int, int, int]:
+            outcome = outcomes[idx]
+            if isinstance(outcome, Exception):
+                return (1, 0, idx)
+            return (0, len(outcome[1]), idx)
+
+        best = min(outcomes, key=_rank)
+        return best, outcomes[best]
+
+    @staticmethod
+    def _pick_candidate(
+        messages: llm.Message,
+        answers: list[llm.models.Assignment],
+        picked: tuple[int, tuple[Query, list[str]] | Exception]
+    ) -> tuple[llm.models.Assignment, Query, list[str]]:
+        '''Record the picked candidate in the conversation, so that feedback refers to it. Re-raises its error, if any.'''
+
+        idx, outcome = picked
+        answer = answers[idx]
+        messages.add_message_assistant(answer.model_dump_json())
+
+        if isinstance(outcome, Exception):
+            raise outcome
+
+        query, constraint_errors = outcome
+        return answer, query, constraint_errors
+
+    @staticmethod
+    def _reject(messages: llm.Message, constraint_errors: list[str], *, attempt: int, error: SqlErrors, language: str) -> None:
+        '''Log the violated constraints and ask the LLM to fix them.'''
+
+        missing_reqs = "\n\t- ".join(constraint_errors)
+        dav_tools.messages.error(f'Validation failed for attempt {attempt + 1} (error: {error.name}). Missing requirements:\n\t- {missing_reqs}')
+        messages.add_message_user(strings.feedback_validation_errors(constraint_errors, language=language))
+
+    @staticmethod
+    def _report_failure(messages: llm.Message, exception: Exception, *, attempt: int, language: str) -> None:
+        '''Log an unexpected error and ask the LLM to regenerate its answer, unless the error is not caused by the answer.'''
+
+        dav_tools.messages.error(f"Error during exercise generation (Attempt {attempt + 1}): {exception}")
+        if isinstance(exception, LLMRequestError):
+            return
+
+        messages.add_message_user(
+            TranslatableText(
+                f"An error occurred: {str(exception)}. Please regenerate valid JSON/SQL.",
+                it=f"Si è verificato un errore: {str(exception)}. Per favore rigenera JSON/SQL valido."
+            ).get(language)
+        )
+
+    @staticmethod
+    def _refinement_messages(answer: llm.models.Assignment, query: Query, *, language: str) -> llm.Message:
+        '''Build the conversation used to remove hints from the natural language request.'''
+
+        messages_refinement = llm.Message()
+        messages_refinement.add_message_user(strings.prompt_refine_request(answer.request, query, language=language))
+
+        return messages_refinement
+
+    @staticmethod
+    def _build(
+        answer: llm.models.Assignment,
+        answer_refinement: BaseModel,
+        query: Query,
+        *,
+        title: str,
+        difficulty: DifficultyLevel,
+        error: SqlErrors,
+        usage: llm.Usage
+    ) -> 'Exercise':
+        '''Assemble the final exercise, using the refined natural language request.'''
+
+        assert isinstance(answer_refinement, llm.models.RemoveHints)
+        # dav_tools.messages.debug(f"Old Request: {answer.request}")
+        # dav_tools.messages.debug(f"Refined Request: {answer_refinement.request_without_hints}")
+        answer.request = answer_refinement.request_without_hints
 
-        raise ExerciseGenerationError(f'Failed to generate a valid exercise for {error.name} after {max_attempts} attempts.')
\ No newline at end of file
+        return Exercise(
+            title=title,
+            request=answer.request,
+            solutions=[query],
+            difficulty=difficulty,
+            error=error,
+            usage=usage
+        )
@@ -0,0 +1,157 @@
+'''Canonical fingerprints of SQL solutions, used to detect duplicate exercises.'''
+
+from sqlglot import exp
+from sqlglot.optimizer.qualify import qualify
+from sqlglot.optimizer.scope import traverse_scope
+from sqlscope import Catalog
+import hashlib
+import sqlglot
+import threading
+
+
+# comparisons written with the operands swapped, e.g. `a > b` is rewritten as `b < a`
+_MIRRORED_COMPARISONS: dict[type[exp.Expression], type[exp.Expression]] = {
+    exp.GT: exp.LT,
+    exp.GTE: exp.LTE,
+}
+
+_COMMUTATIVE_OPERATORS = (exp.EQ, exp.NEQ, exp.NullSafeEQ, exp.NullSafeNEQ)
+
+
+def _rename_table_aliases(ast: exp.Expression) -> None:
+    '''Replace table aliases with names derived from the table and its position, so that the chosen aliases do not matter.'''
+
+    for scope in traverse_scope(ast):
+        renamed: dict[str, str] = {}
+        occurrences: dict[str, int] = {}
+
+        for alias, (node, source) in scope.selected_sources.items():
+            if not isinstance(source, exp.Table) or not isinstance(node, exp.Table):
+                continue
+
+            occurrences[source.name] = occurrences.get(source.name, 0) + 1
+            renamed[alias] = f'{source.name}_{occurrences[source.name]}'
+            node.set('alias', exp.TableAlias(this=exp.to_identifier(renamed[alias])))
+
+        for column in scope.columns:
+            if column.table in renamed:
+                column.set('table', exp.to_identifier(renamed[column.table]))
+
+
+def _outer_selects(ast: exp.Expression) -> list[exp.Select]:
+    '''The SELECTs producing the result of the query: the query itself, or the branches of its set operations.'''
+
+    if isinstance(ast, exp.Select):
+        return [ast]
+    if isinstance(ast, exp.SetOperation):
+        return _outer_selects(ast.this) + _outer_selects(ast.expression)
+    if isinstance(ast, exp.Subquery):
+        return _outer_selects(ast.this)
+    return []
+
+
+def _strip_projection_aliases(ast: exp.Expression) -> None:
+    '''
+    Remove output column aliases, which only change the names of the result columns.
+    Aliases of CTEs and derived tables are kept, since the outer query refers to their columns by name.
+    '''
+
+    for select in _outer_selects(ast):
+        select.set('expressions', [
+            projection.this if isinstance(projection, exp.Alias) else projection
+            for projection in select.expressions
+        ])
+
+
+def _canonical_order(node: exp.Expression) -> exp.Expression:
+    '''
+    Sort the operands of commutative operators, and mirror comparisons to a single direction.
+    Children are canonicalized first, so that operands are sorted by their canonical form.
+    '''
+
+    for key, child in list(node.args.items()):
+        if isinstance(child, exp.Expression):
+            node.set(key, _canonical_order(child))
+        elif isinstance(child, list):
+            node.set(key, [_canonical_order(item) if isinstance(item, exp.Expression) else item for item in child])
+
+    if type(node) in _MIRRORED_COMPARISONS:
+        return _MIRRORED_COMPARISONS[type(node)](this=node.expression, expression=node.this)
+
+    if isinstance(node, _COMMUTATIVE_OPERATORS):
+        left, right = sorted((node.this, node.expression), key=lambda operand: operand.sql())
+        return type(node)(this=left, expression=right)
+
+    if isinstance(node, (exp.And, exp.Or)):
+        operands = sorted(node.flatten(), key=lambda operand: operand.sql())
+        combined = operands[0]
+        for operand in operands[1:]:
+            combined = type(node)(this=combined, expression=operand)
+        return combined
+
+    return node
+
+
+def solution_fingerprint(sql: str, *, catalog: Catalog | None = None, sql_dialect: str = 'postgres') -> str:
+    '''
+    Hash of a canonical form of the query: identifiers are qualified and normalized, table and column aliases are ignored,
+    and the operands of AND/OR and (in)equality conditions are sorted.
+    Queries that only differ by formatting, aliases or the order of their conditions have the same fingerprint.
+
+    If the query cannot be canonicalized, the fingerprint is computed on its lower-cased text.
+    '''
+
+    try:
+        ast = sqlglot.parse_one(sql, read=sql_dialect)
+        ast = qualify(
+            ast,
+            schema=catalog.to_sqlglot_schema() if catalog is not None else None,
+            dialect=sql_dialect,
+            validate_qualify_columns=False,
+        )
+        _rename_table_aliases(ast)
+        _strip_projection_aliases(ast)
+
+        ast = _canonical_order(ast)
+        canonical = ast.sql(dialect=sql_dialect, normalize=True)
+    except Exception:
+        canonical = ' '.join(sql.lower().split())
+
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class SolutionRegistry:
+    '''Thread-safe set of the fingerprints of the solutions generated so far, used for global deduplication.'''
+
+    def __init__(self) -> None:
+        self.fingerprints: set[str] = set()
+        self.lock = threading.Lock()
+
+    def __contains__(self, fingerprint: str) -> bool:
+        with self.lock:
+            return fingerprint in self.fingerprints
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.fingerprints)
+
+    def register(self, fingerprint: str) -> bool:
+        '''Record a solution fingerprint. Returns False if it had already been registered.'''
+
+        with self.lock:
+            if fingerprint in self.fingerprints:
+                return False
+            self.fingerprints.add(fingerprint)
+            return True
+
+    def update(self, fingerprints: set[str]) -> None:
+        '''Record fingerprints of solutions generated earlier (e.g. restored from a checkpoint).'''
+
+        with self.lock:
+            self.fingerprints.update(fingerprints)
+
+    def snapshot(self) -> set[str]:
+        '''Copy of the fingerprints registered so far.'''
+
+        with self.lock:
+            return set(self.fingerprints)
@@ -0,0 +1,57 @@
+'''Local check that a solution only references existing tables and columns, used to reject candidates without executing them.'''
+
+from sqlglot import exp
+from sqlglot.errors import OptimizeError
+from sqlglot.optimizer.qualify import qualify
+from sqlscope import Catalog
+import re
+import sqlglot
+
+
+# messages raised by `qualify` for columns that do not exist in any source
+_UNRESOLVED_COLUMN = re.compile(r"""Column '"?([^'"]+)"?' could not be resolved|Unknown column: (\S+)""")
+
+
+def unresolved_references(sql: str, *, catalog: Catalog, sql_dialect: str = 'postgres') -> list[str]:
+    '''
+    Tables and columns referenced by the query that do not exist in `catalog`.
+
+    The check is conservative: identifiers are compared case-insensitively, tables qualified with a schema are ignored,
+    and queries that cannot be analyzed are assumed to be valid, so that the database has the final say.
+    '''
+
+    try:
+        ast = sqlglot.parse_one(sql, read=sql_dialect)
+    except Exception:
+        return []
+
+    for identifier in ast.find_all(exp.Identifier):
+        identifier.set('this', identifier.this.lower())
+
+    known_tables = {
+        table_name.lower()
+        for schema_name in catalog.schema_names
+        for table_name in catalog[schema_name].table_names
+    }
+    cte_names = {cte.alias_or_name for cte in ast.find_all(exp.CTE)}
+
+    unknown_tables = sorted({
+        table.name
+        for table in ast.find_all(exp.Table)
+        if isinstance(table.this, exp.Identifier) and not table.db
+        and table.name not in known_tables and table.name not in cte_names
+    })
+    if unknown_tables:
+        return [f'table "{name}"' for name in unknown_tables]
+
+    try:
+        qualify(ast, schema=catalog.to_sqlglot_schema(), dialect=sql_dialect, validate_qualify_columns=True)
+    except OptimizeError as e:
+        # only missing columns are reported: other errors (e.g. ambiguous columns) are left to the database
+        match = _UNRESOLVED_COLUMN.search(str(e))
+        if match is not None:
+            return [f'column "{match.group(1) or match.group(2)}"']
+    except Exception:
+        pass
+
+    return []
@@ -3,15 +3,50 @@ from ...constraints import QueryConstraint
 from sqlscope import Query
 from ...translatable_text import TranslatableText
 
+def prompt_generate_context(dataset_str: str, *, sql_dialect: str, language: str) -> str:
+    '''
+    Part of the exercise generation prompt shared by all exercises on the same dataset.
+    It must not depend on the exercise, so that it is identical byte-for-byte across requests and can be cached by the provider.
+    '''
+
+    return TranslatableText(
+        f'''
+### CONTEXT (DATABASE SCHEMA AND DATA) ###
+{dataset_str}
+
+### GUIDELINES ###
+Generate a {sql_dialect} SQL exercise based on the dataset above.
+
+#### JSON REQUIRED OUTPUT FORMAT ####
+{{
+    "request": "Extract and return ONLY the natural language query request, following the specified constraints. Never ask to include mistakes. Be concise and clear. Do not provide hints or explanations.",
+    "solution": "Only a single syntactically and semantically correct (i.e. executable with minimum 1 returned row) SQL query that solves the exercise."
+}}
+''',
+            it=f'''
+### CONTESTO (SCHEMA DEL DATABASE E DATI) ###
+{dataset_str}
+
+### LINEE GUIDA ###
+Genera un esercizio SQL {sql_dialect} basato sul dataset sopra.
+
+#### FORMATO DI OUTPUT RICHIESTO IN JSON ####
+{{
+    "request": "Estrai e restituisci SOLO la richiesta in linguaggio naturale, seguendo i vincoli specificati. Non chiedere mai di includere errori. Sii conciso e chiaro. Non fornire suggerimenti o spiegazioni.",
+    "solution": "Solo una singola query SQL sintatticamente e semanticamente corretta (cioè eseguibile con almeno 1 riga restituita) che risolve l'esercizio."
+}}
+'''
+        ).get(language)
+
+
 def prompt_generate(
-        dataset_str: str,
         extra_details: str,
         constraints: list[QueryConstraint],
         *,
-        sql_dialect: str,
         language: str,
         difficulty: DifficultyLevel
     ) -> str:
+    '''Part of the exercise generation prompt specific to a single exercise. Sent after `prompt_generate_context`.'''
 
     if difficulty == DifficultyLevel.EASY:
         difficulty_str = TranslatableText('beginner', it='principiante').get(language)
@@ -32,39 +67,19 @@ def prompt_generate(
 
     return TranslatableText(
         f'''
-### CONTEXT (DATABASE SCHEMA AND DATA) ###
-{dataset_str}
-
-### GUIDELINES ###
-Generate a {sql_dialect} SQL exercise based on the dataset above.
+### EXERCISE ###
 The difficulty should be appropriate for a {difficulty_str} student.
 {extra_details_formatted}
 
 ### MANDATORY REQUIREMENTS FOR THE EXERCISE ###
 {formatted_constraints}
-
-#### JSON REQUIRED OUTPUT FORMAT ####
-{{
-    "request": "Extract and return ONLY the natural language query request, following the specified constraints. Never ask to include mistakes. Be concise and clear. Do not provide hints or explanations.",
-    "solution": "Only a single syntactically and semantically correct (i.e. executable with minimum 1 returned row) SQL query that solves the exercise."
-}}
 ''',
             it=f'''
-### CONTESTO (SCHEMA DEL DATABASE E DATI) ###
-{dataset_str}
-
-### LINEE GUIDA ###
-Genera un esercizio SQL {sql_dialect} basato sul dataset sopra.
+### ESERCIZIO ###
 {extra_details_formatted}
 
 ### REQUISITI OBBLIGATORI PER L'ESERCIZIO ###
 {formatted_constraints}
-
-#### FORMATO DI OUTPUT RICHIESTO IN JSON ####
-{{
-    "request": "Estrai e restituisci SOLO la richiesta in linguaggio naturale, seguendo i vincoli specificati. Non chiedere mai di includere errori. Sii conciso e chiaro. Non fornire suggerimenti o spiegazioni.",
-    "solution": "Solo una singola query SQL sintatticamente e semanticamente corretta (cioè eseguibile con almeno 1 riga restituita) che risolve l'esercizio."
-}}
 '''
         ).get(language)
 
@@ -77,6 +92,13 @@ def feedback_validation_errors(errors: list[str], *, language: str) -> str:
     ).get(language)
 
 
+def feedback_duplicate_solution(*, language: str) -> str:
+    return TranslatableText(
+        "The previous JSON output was rejected because its solution is equivalent to the one of another exercise. Generate a different exercise, satisfying the same constraints.",
+        it="Il precedente output JSON è stato rifiutato perché la sua soluzione è equivalente a quella di un altro esercizio. Genera un esercizio diverso, che soddisfi gli stessi vincoli."
+    ).get(language)
+
+
 def prompt_refine_request(request: str, query: Query, *, language: str) -> str:
     result = TranslatableText(
         f'''For the following query solution:
@@ -0,0 +1,83 @@
+'''
+Checks of a candidate solution that only need its AST and the dataset catalog.
+They are CPU-bound, and can run in worker processes: inputs and outputs are picklable.
+'''
+
+from collections.abc import Container
+from dataclasses import dataclass, field
+from sqlscope import Catalog, Query
+
+from .fingerprint import solution_fingerprint
+from .resolution import unresolved_references
+from ...constraints import QueryConstraint
+from ...exceptions import ConstraintValidationError
+from ... import tracing
+
+
+@dataclass
+class LocalValidation:
+    '''Outcome of the local validation stages of a candidate solution. Stages after the first failing one are not run.'''
+
+    query: Query | None = None
+    '''The parsed solution, or None if it could not be parsed.'''
+
+    parse_error: str | None = None
+    '''Why the solution could not be parsed.'''
+
+    duplicate: bool = False
+    '''Whether the solution is equivalent to one of the already generated solutions.'''
+
+    constraint_errors: list[str] = field(default_factory=list)
+    '''Descriptions of the violated constraints.'''
+
+    failed_constraints: list[str] = field(default_factory=list)
+    '''Class names of the violated constraints.'''
+
+    unresolved: list[str] = field(default_factory=list)
+    '''Tables and columns referenced by the solution that do not exist in the dataset.'''
+
+
+def validate_locally(
+        solution: str,
+        catalog: Catalog,
+        constraints: list[QueryConstraint],
+        *,
+        sql_dialect: str,
+        language: str,
+        seen_fingerprints: Container[str] | None = None
+    ) -> LocalValidation:
+    '''
+    Parse the solution, then check (in this order) that it is not a duplicate of one in `seen_fingerprints`,
+    that it satisfies all constraints, and that it only references tables and columns of `catalog`.
+    '''
+
+    result = LocalValidation()
+
+    try:
+        with tracing.span('exercise.parse'):
+            result.query = Query(solution, catalog=catalog)
+    except Exception as e:
+        result.parse_error = str(e)
+        return result
+
+    if seen_fingerprints is not None:
+        with tracing.span('exercise.fingerprint'):
+            fingerprint = solution_fingerprint(result.query.sql, catalog=catalog, sql_dialect=sql_dialect)
+        if fingerprint in seen_fingerprints:
+            result.duplicate = True
+            return result
+
+    with tracing.span('exercise.constraints'):
+        for constraint in constraints:
+            try:
+                constraint.validate(result.query)
+            except ConstraintValidationError as e:
+                result.failed_constraints.append(type(constraint).__name__)
+                result.constraint_errors.append(e.get(language))
+    if result.constraint_errors:
+        return result
+
+    with tracing.span('exercise.resolution'):
+        result.unresolved = unresolved_references(result.query.sql, catalog=catalog, sql_dialect=sql_dialect)
+
+    return result
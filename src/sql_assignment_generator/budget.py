@@ -0,0 +1,56 @@
+'''Limits on the tokens and time spent generating an assignment.'''
+
+from contextlib import AbstractContextManager
+import time
+
+from . import llm
+from .exceptions import BudgetExhaustedError
+
+
+class Budget:
+    '''
+    Token and time limits shared by all the generation steps of an assignment.
+
+    Tokens are counted for the LLM requests made within `tracking()`. Time is counted from the creation of the budget.
+    Once the budget is exhausted, generation steps stop retrying (see `BudgetExhaustedError`).
+    '''
+
+    def __init__(self, *, tokens: int | None = None, seconds: float | None = None) -> None:
+        self.tokens = tokens
+        '''Maximum number of (input + output) tokens, or None for no limit.'''
+
+        self.seconds = seconds
+        '''Maximum wall-clock time, or None for no limit.'''
+
+        self.usage = llm.Usage()
+        '''Usage of the requests made so far.'''
+
+        self._start = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        '''Seconds since the budget was created.'''
+        return time.monotonic() - self._start
+
+    def tracking(self) -> AbstractContextManager[llm.Usage]:
+        '''Count the tokens of all LLM requests made within the context against this budget.'''
+        return llm.tracking_usage(self.usage)
+
+    def exhausted_reason(self) -> str | None:
+        '''Describe which limit has been reached, or return None if the budget is not exhausted.'''
+
+        if self.tokens is not None and self.usage.total_tokens >= self.tokens:
+            return f'token budget exhausted ({self.usage.total_tokens}/{self.tokens} tokens used)'
+        if self.seconds is not None and self.elapsed >= self.seconds:
+            return f'time budget exhausted ({self.elapsed:.1f}/{self.seconds:.1f} seconds elapsed)'
+        return None
+
+    def exhausted(self) -> bool:
+        return self.exhausted_reason() is not None
+
+    def check(self, step: str) -> None:
+        '''Raise `BudgetExhaustedError` if the budget is exhausted. `step` describes what is being stopped.'''
+
+        reason = self.exhausted_reason()
+        if reason is not None:
+            raise BudgetExhaustedError(f'Stopped {step}: {reason}.')
@@ -0,0 +1,118 @@
+'''On-disk progress of an assignment generation, so that an interrupted generation can be resumed.'''
+
+from typing import Any, TypeVar
+import json
+import os
+import threading
+
+from sqlscope import Catalog
+
+from .assignments import Dataset, Exercise
+
+
+_T = TypeVar('_T')
+
+
+class Checkpoint:
+    '''
+    Files describing the progress of the generation of an assignment:
+
+    - `assignment.json`: the requested assignment, and the order of its exercises;
+    - `dataset.json`: the dataset, once generated;
+    - `exercises/<index>.json`: each completed exercise, by the index of its error in the request;
+    - `solutions.json`: fingerprints of the solutions of the completed exercises, used for deduplication.
+
+    Each file is replaced atomically, so that a crash never leaves a partially written file behind.
+    '''
+
+    def __init__(self, directory: str, spec: dict[str, Any]) -> None:
+        '''
+        Use `directory` for the checkpoint of the assignment described by `spec` (JSON-serializable).
+
+        Raises:
+            ValueError: If `directory` holds the checkpoint of a different assignment.
+        '''
+
+        self.directory = directory
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.join(directory, 'exercises'), exist_ok=True)
+
+        self._solutions: set[str] = set(self._read('solutions.json') or [])
+        self._solutions_lock = threading.Lock()
+
+        stored = self._read('assignment.json')
+        if stored is None:
+            self._write('assignment.json', {'spec': spec, 'order': None})
+            self._order: list[int] | None = None
+        elif stored['spec'] != json.loads(json.dumps(spec)):
+            raise ValueError(f'Checkpoint directory {directory} belongs to a different assignment.')
+        else:
+            self._order = stored['order']
+
+    def restore_order(self, items: list[_T], indices: list[int]) -> list[_T]:
+        '''
+        Put `items` (with their error indices in `indices`) in the order of the first run, so that positions do not change
+        when exercises are shuffled. On the first run, the current order is stored.
+        '''
+
+        if self._order is None:
+            self._order = list(indices)
+            self._write('assignment.json', {'spec': self._read('assignment.json')['spec'], 'order': self._order})
+            return items
+
+        rank = {index: position for position, index in enumerate(self._order)}
+        return [item for _, item in sorted(zip(indices, items), key=lambda pair: rank.get(pair[0], len(rank)))]
+
+    def load_dataset(self) -> Dataset | None:
+        data = self._read('dataset.json')
+        return Dataset.from_dict(data) if data is not None else None
+
+    def save_dataset(self, dataset: Dataset) -> None:
+        self._write('dataset.json', dataset.to_dict())
+
+    def load_exercises(self, catalog: Catalog) -> dict[int, Exercise]:
+        '''Completed exercises, by the index of their error in the request.'''
+
+        exercises = {}
+        for name in os.listdir(os.path.join(self.directory, 'exercises')):
+            index, extension = os.path.splitext(name)
+            if extension != '.json' or not index.isdigit():
+                continue
+            exercises[int(index)] = Exercise.from_dict(self._read(os.path.join('exercises', name)), catalog=catalog)
+        return exercises
+
+    def save_exercise(self, index: int, exercise: Exercise, fingerprint: str) -> None:
+        '''
+        Record a completed exercise, along with the `fingerprint` of its solution.
+        The exercise is written first, so that `solutions.json` only holds fingerprints of saved exercises.
+        '''
+
+        self._write(os.path.join('exercises', f'{index}.json'), exercise.to_dict())
+
+        # held while writing, so that concurrent saves cannot replace the file with an older set
+        with self._solutions_lock:
+            self._solutions.add(fingerprint)
+            self._write('solutions.json', sorted(self._solutions))
+
+    def load_solutions(self) -> set[str]:
+        with self._solutions_lock:
+            return set(self._solutions)
+
+    def _read(self, name: str) -> Any:
+        try:
+            with open(os.path.join(self.directory, name), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write(self, name: str, data: Any) -> None:
+        path = os.path.join(self.directory, name)
+        temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+
+        with self._lock:
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, path)
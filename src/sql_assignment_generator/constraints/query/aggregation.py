@@ -1,5 +1,6 @@
 from sqlscope import Query
 from .base import QueryConstraint
+from .features import QueryFeatures
 from sqlglot import exp
 from ...exceptions import ConstraintValidationError
 from ...translatable_text import TranslatableText
@@ -9,17 +10,16 @@ class NoPartitioning(QueryConstraint):
     '''Requires the absence of window functions in the SQL query.'''
 
     def validate(self, query: Query) -> None:
-        for select in query.selects:
-            query_ast = select.ast
-            if query_ast is None:
+        for select in QueryFeatures.of(query).selects:
+            if select.select.ast is None:
                 raise ConstraintValidationError(
                     TranslatableText(
-                        f'Invalid query: unable to parse the SQL query: {select.sql}',
-                        it=f'Query non valida: impossibile analizzare la query SQL: {select.sql}'
+                        f'Invalid query: unable to parse the SQL query: {select.select.sql}',
+                        it=f'Query non valida: impossibile analizzare la query SQL: {select.select.sql}'
                     )
                 )
 
-            window_functions_found = list(query_ast.find_all(exp.Window))
+            window_functions_found = select.find_all(exp.Window)
             if len(window_functions_found) > 0:
                 raise ConstraintValidationError(
                     TranslatableText(
@@ -39,17 +39,16 @@ class NoAggregation(QueryConstraint):
     '''Requires the absence of aggregation functions in the SQL query.'''
 
     def validate(self, query: Query) -> None:
-        for select in query.selects:
-            query_ast = select.ast
-            if query_ast is None:
+        for select in QueryFeatures.of(query).selects:
+            if select.select.ast is None:
                 raise ConstraintValidationError(
                     TranslatableText(
-                        f'Invalid query: unable to parse the SQL query: {select.sql}',
-                        it=f'Query non valida: impossibile analizzare la query SQL: {select.sql}'
+                        f'Invalid query: unable to parse the SQL query: {select.select.sql}',
+                        it=f'Query non valida: impossibile analizzare la query SQL: {select.select.sql}'
                     )
                 )
 
-            aggregations_found = list(query_ast.find_all(exp.AggFunc))
+            aggregations_found = select.find_all(exp.AggFunc)
             if len(aggregations_found) > 0:
                 raise ConstraintValidationError(
                     TranslatableText(
@@ -104,18 +103,17 @@ class Aggregation(QueryConstraint):
     def validate(self, query: Query) -> None:
         all_aggregations_found = []
 
-        for select in query.selects:
-            select = select.strip_subqueries()      # get rid of subqueries to avoid double counting
-            query_ast = select.ast
-            if query_ast is None:
+        for select in QueryFeatures.of(query).selects:
+            select = select.stripped      # get rid of subqueries to avoid double counting
+            if select.select.ast is None:
                 raise ConstraintValidationError(
                     TranslatableText(
-                        f'Invalid query: unable to parse the SQL query: {select.sql}',
-                        it=f'Query non valida: impossibile analizzare la query SQL: {select.sql}'
+                        f'Invalid query: unable to parse the SQL query: {select.select.sql}',
+                        it=f'Query non valida: impossibile analizzare la query SQL: {select.select.sql}'
                     )
                 )
             
-            aggregations_found = list(query_ast.find_all(tuple(self.allowed_exps))) # type: ignore
+            aggregations_found = select.find_all(*self.allowed_exps)
             all_aggregations_found.extend(aggregations_found)
 
         count = len(all_aggregations_found)
@@ -1,8 +1,8 @@
 from .base import QueryConstraint
+from .features import QueryFeatures
 from sqlscope import Query
 from ...exceptions import ConstraintValidationError
 from collections import Counter
-from sqlglot import exp
 from ...translatable_text import TranslatableText
 
 class TableReferences(QueryConstraint):
@@ -18,9 +18,8 @@ class TableReferences(QueryConstraint):
     def validate(self, query: Query):
         referenced_tables: list[str] = []
 
-        for select in query.selects:
-            for table in select.referenced_tables:
-                referenced_tables.append(table.real_name)
+        for select in QueryFeatures.of(query).selects:
+            referenced_tables.extend(select.referenced_table_names)
 
         if not self.allow_self_join:
             referenced_tables = list(set(referenced_tables))
@@ -66,24 +65,18 @@ class LeftJoin(QueryConstraint):
     '''
 
     def validate(self, query: Query) -> None:
-        for select in query.selects:
-            ast = select.ast
-
-            if ast is None:
+        for select in QueryFeatures.of(query).selects:
+            if select.select.ast is None:
                 raise ConstraintValidationError(
                     TranslatableText(
-                        f'Query parsing failed for SELECT clause: {select.sql}. Check if the SQL syntax is correct.',
-                        it=f'Analisi della query fallita per la clausola SELECT: {select.sql}. Verifica che la sintassi SQL sia corretta.'
+                        f'Query parsing failed for SELECT clause: {select.select.sql}. Check if the SQL syntax is correct.',
+                        it=f'Analisi della query fallita per la clausola SELECT: {select.select.sql}. Verifica che la sintassi SQL sia corretta.'
                     )
                 )
 
-            for join in ast.find_all(exp.Join):
-                # control side and join type
-                kind = (join.kind or '').upper()
-                side = (join.side or '').upper()
-
-                if 'LEFT' in kind or 'LEFT' in side:
-                    return
+            # control side and join type
+            if any('LEFT' in join for join in select.join_sides):
+                return
         
         raise ConstraintValidationError(
             TranslatableText(
@@ -105,23 +98,17 @@ class RightJoin(QueryConstraint):
     '''
 
     def validate(self, query: Query) -> None:
-        for select in query.selects:
-            ast = select.ast
-
-            if ast is None:
+        for select in QueryFeatures.of(query).selects:
+            if select.select.ast is None:
                 raise ConstraintValidationError(
                     TranslatableText(
-                        f'Query parsing failed for SELECT clause: {select.sql}. Check if the SQL syntax is correct.',
-                        it=f'Analisi della query fallita per la clausola SELECT: {select.sql}. Verifica che la sintassi SQL sia corretta.'
+                        f'Query parsing failed for SELECT clause: {select.select.sql}. Check if the SQL syntax is correct.',
+                        it=f'Analisi della query fallita per la clausola SELECT: {select.select.sql}. Verifica che la sintassi SQL sia corretta.'
                     )
                 )
 
-            for join in ast.find_all(exp.Join):
-                kind = (join.kind or '').upper()
-                side = (join.side or '').upper()
-
-                if 'RIGHT' in kind or 'RIGHT' in side:
-                    return
+            if any('RIGHT' in join for join in select.join_sides):
+                return
         
         raise ConstraintValidationError(
             TranslatableText(
@@ -168,10 +155,9 @@ class SelfJoin(QueryConstraint):
 
     def validate(self, query: Query) -> None:
         # iterate in main query and in subquery
-        for select in query.selects:
-            # extract name table and count all occurrences
-            table_names = [table.real_name for table in select.referenced_tables]
-            counts = Counter(table_names)
+        for select in QueryFeatures.of(query).selects:
+            # count all occurrences of each table name
+            counts = Counter(select.referenced_table_names)
 
             # require at least one table to be referenced more than once (self join) 
             if not any(count > 1 for count in counts.values()):
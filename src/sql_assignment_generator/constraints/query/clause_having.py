@@ -1,5 +1,5 @@
 from .base import QueryConstraint
-from sqlglot import exp
+from .features import QueryFeatures
 from sqlscope import Query
 from ...exceptions import ConstraintValidationError
 from ...translatable_text import TranslatableText
@@ -37,18 +37,12 @@ class Having(QueryConstraint):
     def validate(self, query: Query) -> None:
         having_conditions: list[int] = []
 
-        for select in query.selects:
-            if select.having is None:
+        for select in QueryFeatures.of(query).selects:
+            if select.select.having is None:
                 continue
 
-            conditions = 0
-            # count main HAVING condition
-            conditions += 1
-
-            # count additional conditions connected by AND/OR
-            conditions += len(list(select.having.find_all((exp.And, exp.Or)))) # type: ignore
-
-            having_conditions.append(conditions)
+            # main HAVING condition, plus additional conditions connected by AND/OR
+            having_conditions.append(select.having_conditions)
 
         # check if any having condition count satisfies the min/max condition
         for condition_count in having_conditions:
@@ -1,5 +1,5 @@
 from .base import QueryConstraint
-from sqlglot import exp
+from .features import QueryFeatures
 from sqlscope import Query
 from ...exceptions import ConstraintValidationError
 from ...translatable_text import TranslatableText
@@ -43,24 +43,11 @@ class OrderBy(QueryConstraint):
             whether each column in the ORDER BY clause is ascending (True) or descending (False).
         '''
 
-        order_bys: list[list[bool]] = []
-
-        for select in query.selects:
-            if len(select.order_by) == 0:
-                continue
-
-            order_by_columns: list[bool] = []
-            for order in select.order_by:
-                # Determine if the ordering is ascending (True) or descending (False)
-                is_ascending = True
-                if isinstance(order, exp.Ordered):
-                    if order.args.get('desc', False):
-                        is_ascending = False
-                order_by_columns.append(is_ascending)
-
-            order_bys.append(order_by_columns)
-
-        return order_bys
+        return [
+            select.order_by_directions
+            for select in QueryFeatures.of(query).selects
+            if len(select.order_by_directions) > 0
+        ]
     
     def validate(self, query: Query) -> None:
         order_bys = self.find_order_bys(query)
@@ -2,6 +2,7 @@ from collections import Counter
 import random
 from typing import Callable
 from .base import QueryConstraint
+from .features import QueryFeatures
 from sqlscope import Query
 from sqlglot import exp
 from ...exceptions import ConstraintValidationError
@@ -40,17 +41,14 @@ class Condition(QueryConstraint):
     def validate(self, query: Query) -> None:
         condition_count: list[int] = []
 
-        for select in query.main_query.selects:
+        for select in QueryFeatures.of(query).main_selects:
             # avoid counting conditions in subqueries for this constraint,
             # since they will be counted separately when the validator visits those subqueries
-            select = select.strip_subqueries()
+            select = select.stripped
             
-            where = select.where
-            if where is not None:
-                count = 1  # Start with 1 for the initial condition
-                count += len(list(where.find_all(exp.And)))
-                count += len(list(where.find_all(exp.Or)))
-                condition_count.append(count)
+            if select.select.where is not None:
+                # 1 for the initial condition, plus conditions connected by AND/OR
+                condition_count.append(select.where_conditions)
 
         count: int = sum(condition_count)
         if self.max is None:
@@ -120,23 +118,23 @@ class StringComparison(QueryConstraint):
     def validate(self, query: Query) -> None:
         condition_count: list[int] = []
 
-        for select in query.main_query.selects:
+        for select in QueryFeatures.of(query).main_selects:
             # avoid counting conditions in subqueries for this constraint,
             # since they will be counted separately when the validator visits those subqueries
-            select = select.strip_subqueries()
+            select = select.stripped
 
-            where = select.where
+            where = select.select.where
             if where is not None:
                 count = 0
 
                 # LIKE requires the right side to be a string literal
-                for like in where.find_all(tuple(op for op in (exp.Like, exp.ILike) if op in self.allowed_operators)): # type: ignore
+                for like in select.find_all_in_where(*(op for op in (exp.Like, exp.ILike) if op in self.allowed_operators)):
                     right_side = like.expression
                     if isinstance(right_side, exp.Literal) and right_side.is_string:
                         count += 1
 
                 # Other comparison operators can have string literals on either side
-                for comparison in where.find_all(tuple(op for op in (exp.EQ, exp.NEQ, exp.GT, exp.LT, exp.GTE, exp.LTE) if op in self.allowed_operators)): # type: ignore
+                for comparison in select.find_all_in_where(*(op for op in (exp.EQ, exp.NEQ, exp.GT, exp.LT, exp.GTE, exp.LTE) if op in self.allowed_operators)):
                     left_side = comparison.this
                     right_side = comparison.expression
 
@@ -202,17 +200,17 @@ class EmptyStringComparison(QueryConstraint):
     def validate(self, query: Query) -> None:
         condition_count: list[int] = []
 
-        for select in query.main_query.selects:
+        for select in QueryFeatures.of(query).main_selects:
             # avoid counting conditions in subqueries for this constraint,
             # since they will be counted separately when the validator visits those subqueries
-            select = select.strip_subqueries()
+            select = select.stripped
 
-            where = select.where
+            where = select.select.where
             if where is not None:
                 count = 0
 
                 # Look for '=' and '<>' comparisons to empty string
-                for comparison in where.find_all((exp.EQ, exp.NEQ)): # type: ignore
+                for comparison in select.find_all_in_where(exp.EQ, exp.NEQ):
                     left_side = comparison.this
                     right_side = comparison.expression
 
@@ -275,17 +273,17 @@ class NullComparison(QueryConstraint):
     def validate(self, query: Query) -> None:
         condition_count: list[int] = []
 
-        for select in query.main_query.selects:
+        for select in QueryFeatures.of(query).main_selects:
             # avoid counting conditions in subqueries for this constraint,
             # since they will be counted separately when the validator visits those subqueries
-            select = select.strip_subqueries()
+            select = select.stripped
 
-            where = select.where
+            where = select.select.where
             if where is not None:
                 count = 0
 
                 # Look for IS NULL comparisons
-                for is_null in where.find_all(exp.Is):
+                for is_null in select.find_all_in_where(exp.Is):
                     if isinstance(is_null.expression, exp.Null):
                         # Ensure it's not IS NOT NULL
                         if not isinstance(is_null.parent, exp.Not):
@@ -342,17 +340,17 @@ class NotNullComparison(QueryConstraint):
     def validate(self, query: Query) -> None:
         condition_count: list[int] = []
 
-        for select in query.main_query.selects:
+        for select in QueryFeatures.of(query).main_selects:
             # avoid counting conditions in subqueries for this constraint,
             # since they will be counted separately when the validator visits those subqueries
-            select = select.strip_subqueries()
+            select = select.stripped
 
-            where = select.where
+            where = select.select.where
             if where is not None:
                 count = 0
 
                 # Look for IS NOT NULL comparisons
-                for is_null in where.find_all(exp.Is):
+                for is_null in select.find_all_in_where(exp.Is):
                     if isinstance(is_null.expression, exp.Null):
                         # Ensure it's IS NOT NULL
                         if isinstance(is_null.parent, exp.Not):
@@ -399,11 +397,11 @@ class NoLike(QueryConstraint):
     '''Requires that there are no LIKE operators in the WHERE clause of the SQL query.'''
 
     def validate(self, query: Query) -> None:
-        for select in query.main_query.selects:
-            where = select.where
+        for select in QueryFeatures.of(query).main_selects:
+            where = select.select.where
             if where is not None:
                 # Look for LIKE comparisons
-                like_nodes = list(where.find_all((exp.Like, exp.ILike))) # type: ignore
+                like_nodes = select.find_all_in_where(exp.Like, exp.ILike)
                 if like_nodes:
                     raise ConstraintValidationError(
                         TranslatableText(
@@ -429,17 +427,17 @@ class Not(QueryConstraint):
     def validate(self, query: Query) -> None:
         condition_count: list[int] = []
 
-        for select in query.main_query.selects:
+        for select in QueryFeatures.of(query).main_selects:
             # avoid counting NOT operators in subqueries for this constraint,
             # since they will be counted separately when the validator visits those subqueries
-            select = select.strip_subqueries()
+            select = select.stripped
                 
-            where = select.where
+            where = select.select.where
             if where is not None:
                 count = 0
 
                 # Look for NOT operators
-                not_nodes = list(where.find_all(exp.Not))
+                not_nodes = select.find_all_in_where(exp.Not)
                 count += len(not_nodes)
 
                 condition_count.append(count)
@@ -489,17 +487,17 @@ class Exists(QueryConstraint):
     def validate(self, query: Query) -> None:
         condition_count: list[int] = []
 
-        for select in query.main_query.selects:
+        for select in QueryFeatures.of(query).main_selects:
             # avoid counting NOT operators in subqueries for this constraint,
             # since they will be counted separately when the validator visits those subqueries
-            select = select.strip_subqueries()
+            select = select.stripped
             
-            where = select.where
+            where = select.select.where
             if where is not None:
                 count = 0
 
                 # Look for EXIST operators
-                for exists_node in where.find_all(exp.Exists):
+                for exists_node in select.find_all_in_where(exp.Exists):
                     # if parent isn't NOT
                     if not isinstance(exists_node.parent, exp.Not):
                         count += 1
@@ -551,17 +549,17 @@ class NotExist(QueryConstraint):
     def validate(self, query: Query) -> None:
         condition_count: list[int] = []
 
-        for select in query.main_query.selects:
+        for select in QueryFeatures.of(query).main_selects:
             # avoid counting NOT operators in subqueries for this constraint,
             # since they will be counted separately when the validator visits those subqueries
-            select = select.strip_subqueries()
+            select = select.stripped
             
-            where = select.where
+            where = select.select.where
             if where is not None:
                 count = 0
 
                 # Look for NOT EXIST operators
-                for not_node in where.find_all(exp.Not):
+                for not_node in select.find_all_in_where(exp.Not):
                     if isinstance(not_node.this, exp.Exists):
                         count += 1
 
@@ -620,17 +618,17 @@ class MathOperators(QueryConstraint):
             exp.Mod   # %
         )
 
-        for select in query.main_query.selects:
+        for select in QueryFeatures.of(query).main_selects:
             # avoid counting NOT operators in subqueries for this constraint,
             # since they will be counted separately when the validator visits those subqueries
-            select = select.strip_subqueries()
+            select = select.stripped
             
-            where = select.where
+            where = select.select.where
             if where is not None:
                 count = 0
 
                 # Look for mathematical comparison operators
-                for math_op in where.find_all(math_operators): # type: ignore
+                for math_op in select.find_all_in_where(*math_operators):
                     count += 1
 
                 condition_count.append(count)
@@ -685,24 +683,24 @@ class ExistsNotExists_InNotIn(QueryConstraint):
         pos_count = 0
         neg_count = 0
 
-        for select in query.main_query.selects:
+        for select in QueryFeatures.of(query).main_selects:
             # avoid counting NOT operators in subqueries for this constraint,
             # since they will be counted separately when the validator visits those subqueries
-            select = select.strip_subqueries()
+            select = select.stripped
             
-            where = select.where
+            where = select.select.where
             if where is not None:
                 # Look for EXISTS and IN operators
-                for exists_node in where.find_all(exp.Exists):
+                for exists_node in select.find_all_in_where(exp.Exists):
                     if not isinstance(exists_node.parent, exp.Not):
                         pos_count += 1
 
-                for in_node in where.find_all(exp.In):
+                for in_node in select.find_all_in_where(exp.In):
                     if not isinstance(in_node.parent, exp.Not):
                         pos_count += 1
 
                 # Look for NOT EXISTS and NOT IN operators
-                for not_node in where.find_all(exp.Not):
+                for not_node in select.find_all_in_where(exp.Not):
                     if isinstance(not_node.this, exp.Exists):
                         neg_count += 1
                     elif isinstance(not_node.this, exp.In):
@@ -782,16 +780,16 @@ class WildcardCharacters(QueryConstraint):
         wildcard_status: dict[str, bool] = {}
         '''True if the wildcard contains all required characters with required counts, False if it's an invalid wildcard.'''
         
-        for select in query.main_query.selects:
+        for select in QueryFeatures.of(query).main_selects:
             # avoid counting NOT operators in subqueries for this constraint,
             # since they will be counted separately when the validator visits those subqueries
-            select = select.strip_subqueries()
+            select = select.stripped
             
-            where = select.where
+            where = select.select.where
             if where is None:
                 continue
 
-            for like in where.find_all((exp.Like, exp.ILike)): # type: ignore
+            for like in select.find_all_in_where(exp.Like, exp.ILike):
                 right_side = like.expression
                 if isinstance(right_side, exp.Literal) and right_side.is_string:
                     literal_value = right_side.this
@@ -832,14 +830,14 @@ class WildcardLength(QueryConstraint):
     
         wildcard_lengths: dict[str, int] = {}
     
-        for select in query.main_query.selects:
+        for select in QueryFeatures.of(query).main_selects:
             # avoid counting NOT operators in subqueries for this constraint,
             # since they will be counted separately when the validator visits those subqueries
-            select = select.strip_subqueries()
+            select = select.stripped
             
-            where = select.where
+            where = select.select.where
             if where is not None:
-                for like in where.find_all((exp.Like, exp.ILike)): # type: ignore
+                for like in select.find_all_in_where(exp.Like, exp.ILike):
                     right_side = like.expression
                     if isinstance(right_side, exp.Literal) and right_side.is_string:
                         literal_value = right_side.this
@@ -909,16 +907,16 @@ class MultipleConditionsOnSameColumn(QueryConstraint):
         self.min_columns = min_columns
 
     def validate(self, query: Query) -> None:
-        for select in query.main_query.selects:
+        for select in QueryFeatures.of(query).main_selects:
             # avoid counting NOT operators in subqueries for this constraint,
             # since they will be counted separately when the validator visits those subqueries
-            select = select.strip_subqueries()
+            select = select.stripped
             
-            where = select.where
+            where = select.select.where
             if where is not None:
                 column_counter = Counter()
 
-                for condition in where.find_all((exp.EQ, exp.NEQ, exp.GT, exp.LT, exp.GTE, exp.LTE, exp.Like, exp.ILike, exp.Between)): # type: ignore
+                for condition in select.find_all_in_where(exp.EQ, exp.NEQ, exp.GT, exp.LT, exp.GTE, exp.LTE, exp.Like, exp.ILike, exp.Between):
                     column = condition.this
                     if isinstance(column, exp.Column):
                         column_name = column.sql()
@@ -955,17 +953,16 @@ class InAnyAll(QueryConstraint):
     def validate(self, query: 'Query') -> None:
         count = 0
 
-        for select in query.main_query.selects:
+        for select in QueryFeatures.of(query).main_selects:
             # avoid counting NOT operators in subqueries for this constraint,
             # since they will be counted separately when the validator visits those subqueries
-            select = select.strip_subqueries()
+            select = select.stripped
 
-            if select.ast is None:
+            if select.select.ast is None:
                 # bogus SELECT, created by strip_subqueries - it has no AST
                 continue
             
-            exps = select.ast.find_all((exp.In, exp.Any, exp.All)) # type: ignore
-            count += len(list(exps))
+            count += len(select.find_all(exp.In, exp.Any, exp.All))
 
         if count < self.min:
             error_msg = TranslatableText()
@@ -0,0 +1,168 @@
+'''Syntactic features of a query, extracted once and shared by all query constraints.'''
+
+from collections import defaultdict
+from functools import cached_property
+from sqlglot import exp
+from sqlscope import Query
+from sqlscope.query.set_operations.select import Select
+import sqlglot
+import threading
+import weakref
+
+
+class _NodeIndex:
+    '''All nodes of an expression tree, grouped by type. Built with a single breadth-first traversal.'''
+
+    def __init__(self, root: exp.Expression | None) -> None:
+        self._nodes: dict[type[exp.Expression], list[tuple[int, exp.Expression]]] = defaultdict(list)
+
+        if root is None:
+            return
+
+        for position, node in enumerate(root.bfs()):
+            self._nodes[type(node)].append((position, node))
+
+    def find_all(self, *expression_types: type[exp.Expression]) -> list[exp.Expression]:
+        '''Same as `exp.Expression.find_all`, including subclasses, and in the same (breadth-first) order.'''
+
+        found: list[tuple[int, exp.Expression]] = []
+        for node_type, nodes in self._nodes.items():
+            if issubclass(node_type, expression_types):
+                found.extend(nodes)
+
+        found.sort(key=lambda item: item[0])
+        return [node for _, node in found]
+
+
+class SelectFeatures:
+    '''
+    Features of a single SELECT statement.
+    Each clause is traversed at most once, the first time one of its features is requested.
+    '''
+
+    def __init__(self, select: Select) -> None:
+        self.select = select
+
+    @cached_property
+    def stripped(self) -> 'SelectFeatures':
+        '''Features of the same SELECT, with all of its subqueries removed.'''
+        return SelectFeatures(self.select.strip_subqueries())
+
+    @cached_property
+    def unnested(self) -> 'SelectFeatures':
+        '''Features of the same SELECT, with only nested subqueries (depth >= 2) removed.'''
+        return SelectFeatures(self.select.strip_subqueries(min_depth=2))
+
+    @cached_property
+    def _ast(self) -> _NodeIndex:
+        return _NodeIndex(self.select.ast)
+
+    @cached_property
+    def _where(self) -> _NodeIndex:
+        return _NodeIndex(self.select.where)
+
+    @cached_property
+    def _having(self) -> _NodeIndex:
+        return _NodeIndex(self.select.having)
+
+    def find_all(self, *expression_types: type[exp.Expression]) -> list[exp.Expression]:
+        '''Nodes of the given types anywhere in the SELECT.'''
+        return self._ast.find_all(*expression_types)
+
+    def find_all_in_where(self, *expression_types: type[exp.Expression]) -> list[exp.Expression]:
+        '''Nodes of the given types in the WHERE clause.'''
+        return self._where.find_all(*expression_types)
+
+    def find_all_in_having(self, *expression_types: type[exp.Expression]) -> list[exp.Expression]:
+        '''Nodes of the given types in the HAVING clause.'''
+        return self._having.find_all(*expression_types)
+
+    @property
+    def where_conditions(self) -> int:
+        '''Number of conditions in the WHERE clause (0 if there is no WHERE clause).'''
+        if self.select.where is None:
+            return 0
+        return 1 + len(self.find_all_in_where(exp.And, exp.Or))
+
+    @property
+    def having_conditions(self) -> int:
+        '''Number of conditions in the HAVING clause (0 if there is no HAVING clause).'''
+        if self.select.having is None:
+            return 0
+        return 1 + len(self.find_all_in_having(exp.And, exp.Or))
+
+    @cached_property
+    def order_by_directions(self) -> list[bool]:
+        '''For each ORDER BY term, whether the ordering is ascending (True) or descending (False).'''
+
+        directions: list[bool] = []
+        for order in self.select.order_by:
+            is_ascending = True
+            if isinstance(order, exp.Ordered):
+                if order.args.get('desc', False):
+                    is_ascending = False
+            directions.append(is_ascending)
+
+        return directions
+
+    @cached_property
+    def join_sides(self) -> list[str]:
+        '''Upper-cased side and kind of each JOIN (e.g. 'LEFT OUTER', 'INNER').'''
+        return [f'{(join.side or "").upper()} {(join.kind or "").upper()}' for join in self.find_all(exp.Join)]
+
+    @cached_property
+    def referenced_table_names(self) -> list[str]:
+        '''Real names of the tables referenced in the FROM clause, including repeated ones.'''
+        return [table.real_name for table in self.select.referenced_tables]
+
+
+class QueryFeatures:
+    '''
+    Syntactic features of a query, computed lazily and cached.
+
+    Use `QueryFeatures.of(query)` to get the features of a query: all constraints validating the same query share
+    the same instance, so each part of the query is traversed only once, regardless of the number of constraints.
+    '''
+
+    _cache: 'weakref.WeakKeyDictionary[Query, QueryFeatures]' = weakref.WeakKeyDictionary()
+    _cache_lock = threading.Lock()
+
+    def __init__(self, query: Query) -> None:
+        self.query = query
+
+    @classmethod
+    def of(cls, query: Query) -> 'QueryFeatures':
+        '''Return the (cached) features of `query`.'''
+
+        with cls._cache_lock:
+            features = cls._cache.get(query)
+            if features is None:
+                features = cls(query)
+                cls._cache[query] = features
+            return features
+
+    @cached_property
+    def selects(self) -> list[SelectFeatures]:
+        '''Features of all SELECT statements in the query, including subqueries.'''
+        return [SelectFeatures(select) for select in self.query.selects]
+
+    @cached_property
+    def main_selects(self) -> list[SelectFeatures]:
+        '''Features of the SELECT statements making up the main query (more than one in case of set operations).'''
+        return [SelectFeatures(select) for select in self.query.main_query.selects]
+
+    @cached_property
+    def union_counts(self) -> tuple[int, int]:
+        '''Number of UNION and UNION ALL operations in the query.'''
+
+        union_count = 0
+        union_all_count = 0
+
+        ast = sqlglot.parse_one(self.query.sql)
+        for union_node in ast.find_all(exp.Union):
+            if union_node.args.get('distinct'):
+                union_count += 1
+            else:
+                union_all_count += 1
+
+        return union_count, union_all_count
@@ -1,6 +1,5 @@
 from .base import QueryConstraint
-from sqlglot import exp
-import sqlglot
+from .features import QueryFeatures
 from sqlscope import Query
 from ...exceptions import ConstraintValidationError
 from ...translatable_text import TranslatableText
@@ -23,18 +22,7 @@ class Union(QueryConstraint):
             A tuple (union_count, union_all_count).
         '''
 
-        union_count = 0
-        union_all_count = 0
-
-        sql = query.sql
-        ast = sqlglot.parse_one(sql)
-        for union_node in ast.find_all(exp.Union):
-            if union_node.args.get('distinct'):
-                union_count += 1
-            else:
-                union_all_count += 1
-
-        return union_count, union_all_count
+        return QueryFeatures.of(query).union_counts
 
 
     def validate(self, query: Query) -> None:
@@ -1,5 +1,6 @@
 from collections import Counter
 from .base import QueryConstraint
+from .features import QueryFeatures
 from sqlscope import Query
 from ...exceptions import ConstraintValidationError
 from ...translatable_text import TranslatableText
@@ -57,9 +58,9 @@ class Subqueries(QueryConstraint):
     def validate(self, query: Query) -> None:
         unnested_subquery_counts: list[int] = []
         
-        for select in query.selects:
-            select = select.strip_subqueries(min_depth=2) # Strip all nested subqueries, leaving only unnested subqueries at the top level of the SELECT clause
-            unnested_subquery_counts.append(len(select.subqueries))
+        for select in QueryFeatures.of(query).selects:
+            select = select.unnested # Strip all nested subqueries, leaving only unnested subqueries at the top level of the SELECT clause
+            unnested_subquery_counts.append(len(select.select.subqueries))
 
         for count in unnested_subquery_counts:
             if self.max is None:
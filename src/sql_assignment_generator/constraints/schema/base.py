@@ -23,6 +23,17 @@ class SchemaConstraint(BaseConstraint):
         # but for now we also keep the raw SQL expressions for checks not yet supported in sqlscope. 
         pass
 
+    def failing_tables(self, catalog: Catalog, tables_sql: list[exp.Create], values_sql: list[exp.Insert]) -> set[str] | None:
+        '''
+        Names (lowercase) of the tables that violate the constraint, if it can be satisfied by regenerating only those tables.
+
+        Returns:
+            set[str] | None: The violating tables, or None if the constraint concerns the schema as a whole
+                (e.g. the number of tables), in which case the whole dataset has to be regenerated.
+        '''
+
+        return None
+
     @abstractmethod
     def merge(self, other: 'SchemaConstraint') -> 'SchemaConstraint':
         '''Merges this constraint with another constraint of the same type.'''
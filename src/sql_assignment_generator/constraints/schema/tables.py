@@ -276,6 +276,14 @@ class MaxColumns(SchemaConstraint):
                         )
                     )
                 
+    def failing_tables(self, catalog: Catalog, tables_sql: list[exp.Create], values_sql: list[exp.Insert]) -> set[str] | None:
+        return {
+            table_name.lower()
+            for schema_name in catalog.schema_names
+            for table_name in catalog[schema_name].table_names
+            if len(catalog[schema_name][table_name].columns) > self.max_columns
+        }
+
     @property
     def description(self) -> TranslatableText:
         return TranslatableText(
@@ -11,8 +11,11 @@ class MinRows(SchemaConstraint):
     def __init__(self, min_: int = 3) -> None:
         self.min = min_
 
-    def validate(self, catalog: Catalog, tables_sql: list[exp.Create], values_sql: list[exp.Insert]) -> None:
-        table_row_counts = Counter()
+    @staticmethod
+    def _row_counts(values_sql: list[exp.Insert]) -> Counter[str]:
+        '''Number of rows inserted into each table.'''
+
+        table_row_counts: Counter[str] = Counter()
 
         for value in values_sql:
 
@@ -24,6 +27,11 @@ class MinRows(SchemaConstraint):
                 rows_in_statement = len(values_node.expressions)
                 table_row_counts[table_name] += rows_in_statement
 
+        return table_row_counts
+
+    def validate(self, catalog: Catalog, tables_sql: list[exp.Create], values_sql: list[exp.Insert]) -> None:
+        table_row_counts = self._row_counts(values_sql)
+
         # if no tables found but min > 0, fail
         if not table_row_counts and self.min > 0:
             raise ConstraintValidationError(
@@ -43,6 +51,15 @@ class MinRows(SchemaConstraint):
                     )
                 )
 
+    def failing_tables(self, catalog: Catalog, tables_sql: list[exp.Create], values_sql: list[exp.Insert]) -> set[str] | None:
+        table_row_counts = self._row_counts(values_sql)
+
+        # no data at all: the whole dataset has to be regenerated
+        if not table_row_counts and self.min > 0:
+            return None
+
+        return {table_name for table_name, count in table_row_counts.items() if count < self.min}
+
     @property
     def description(self) -> TranslatableText:
         return TranslatableText(
@@ -60,14 +77,20 @@ class MinRows(SchemaConstraint):
 class SingleInsertPerTable(SchemaConstraint):
     '''Requires that each table has exactly one INSERT statement (multi-row format).'''
 
-    def validate(self, catalog: Catalog, tables_sql: list[exp.Create], values_sql: list[exp.Insert]) -> None:
-        table_insert_counts = Counter()
+    @staticmethod
+    def _violating_tables(values_sql: list[exp.Insert]) -> list[str]:
+        '''Tables with more than one INSERT statement.'''
+
+        table_insert_counts: Counter[str] = Counter()
 
         for value in values_sql:
             table_name = value.this.this.name.lower()
             table_insert_counts[table_name] += 1
 
-        violating_tables = [t for t, c in table_insert_counts.items() if c > 1]
+        return [t for t, c in table_insert_counts.items() if c > 1]
+
+    def validate(self, catalog: Catalog, tables_sql: list[exp.Create], values_sql: list[exp.Insert]) -> None:
+        violating_tables = self._violating_tables(values_sql)
         if violating_tables:
             table_list = ', '.join(f'"{t}"' for t in violating_tables)
             raise ConstraintValidationError(
@@ -77,6 +100,9 @@ class SingleInsertPerTable(SchemaConstraint):
                 )
             )
 
+    def failing_tables(self, catalog: Catalog, tables_sql: list[exp.Create], values_sql: list[exp.Insert]) -> set[str] | None:
+        return set(self._violating_tables(values_sql))
+
     @property
     def description(self) -> TranslatableText:
         return TranslatableText(
@@ -1,22 +1,118 @@
-from .database import Database
-from .drivers import PostgresqlDatabase, MySQLDatabase
-from .exceptions import QueryExecutionError
+from .batch import RowBatch
+from .database import Database, ISOLATION_STRATEGIES
+from .exceptions import QueryExecutionError, PoolExhaustedError
+from .pool import ConnectionPool
+from typing import TYPE_CHECKING
 import dav_tools
+import threading
+import os
 
+from . import drivers
+from ..environment import load_environment
 
-def get_database(host: str, port: int, user: str, password: str, dbms: str) -> Database:
-    '''Factory function to get the appropriate database backend.'''
+if TYPE_CHECKING:
+    from .drivers import PostgresqlDatabase, MySQLDatabase, SQLiteDatabase
+
+
+_pools: dict[tuple, ConnectionPool] = {}
+'''Connection pools shared by all `get_database` callers, keyed by DBMS and connection parameters.'''
+
+_pools_lock = threading.Lock()
+
+
+def get_pool(host: str, port: int, user: str, password: str, dbms: str) -> ConnectionPool | None:
+    '''
+    Return the shared connection pool for the given connection parameters, creating it on first use.
+    Returns None for database systems that do not support pooling.
+
+    Pool size and idle timeout can be tuned with the `SQL_GENERATION_DB_POOL_SIZE` and
+    `SQL_GENERATION_DB_POOL_IDLE_TIMEOUT` environment variables.
+    '''
 
     if dbms == 'postgres':
-        return PostgresqlDatabase(host, port, user, password)
+        db_class = drivers.PostgresqlDatabase
+    elif dbms == 'mysql':
+        db_class = drivers.MySQLDatabase
+    else:
+        return None
+
+    key = (dbms, host, port, user, password)
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            load_environment()
+            pool = ConnectionPool(
+                connect=lambda: db_class.create_connection(host, port, user, password),
+                is_alive=db_class.is_connection_alive,
+                reset=db_class.reset_connection,
+                on_close=db_class.discard_connection_state,
+                max_size=int(os.getenv('SQL_GENERATION_DB_POOL_SIZE', '8')),
+                max_idle_time=float(os.getenv('SQL_GENERATION_DB_POOL_IDLE_TIMEOUT', '300')),
+            )
+            _pools[key] = pool
+
+    return pool
+
+
+def close_pools() -> None:
+    '''Close all shared connection pools.'''
+
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.close_all()
+
+
+def get_database(
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        dbms: str,
+        *,
+        pooled: bool = True,
+        read_only_schema: str | None = None,
+        isolation: str = 'schema',
+        embedded: bool = False
+    ) -> Database:
+    '''
+    Factory function to get the appropriate database backend.
+
+    If `embedded` is True, or if `dbms` is 'sqlite', queries are executed on an in-memory SQLite database,
+    after being transpiled from the `dbms` dialect. Host, port, user and password are ignored in that case.
+    Other unsupported database systems get a `DummyDatabase`, which skips execution.
+
+    If `pooled` is True, connections are borrowed from a shared pool (see `get_pool`) instead of being opened on each use.
+    If `read_only_schema` is set, the database attaches to that existing schema in a read-only transaction
+    instead of creating a new, empty schema.
+    `isolation` selects how each `with` block is isolated (see `ISOLATION_STRATEGIES`).
+    '''
+
+    if embedded or dbms == 'sqlite':
+        return drivers.SQLiteDatabase(host, port, user, password, read_only_schema=read_only_schema, isolation=isolation, dialect=dbms)
+
+    pool = get_pool(host, port, user, password, dbms) if pooled else None
+
+    if dbms == 'postgres':
+        return drivers.PostgresqlDatabase(host, port, user, password, pool=pool, read_only_schema=read_only_schema, isolation=isolation)
 
     if dbms == 'mysql':
-        return MySQLDatabase(host, port, user, password)
+        return drivers.MySQLDatabase(host, port, user, password, pool=pool, read_only_schema=read_only_schema, isolation=isolation)
 
     dav_tools.messages.warning(f'Unsupported database system "{dbms}". Skipping SQL execution steps.')
     return DummyDatabase(host, port, user, password)
 
 
+def __getattr__(name: str):
+    # backends are imported on first access (see `drivers`)
+    if name in ('PostgresqlDatabase', 'MySQLDatabase', 'SQLiteDatabase'):
+        return getattr(drivers, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
 class DummyDatabase(Database):
     '''A dummy database implementation that does not actually connect to anything. Used for unsupported database systems.'''
     def connect(self) -> None:
@@ -25,11 +121,27 @@ class DummyDatabase(Database):
     def disconnect(self) -> None:
         pass
 
+    @staticmethod
+    def create_connection(host: str, port: int, user: str, password: str) -> None:
+        return None
+
     def execute(self, query: str) -> list[tuple]:
         return []
-    
+
+    def commit(self) -> None:
+        pass
+
+    def use_schema_read_only(self, schema: str) -> None:
+        pass
+
+    def begin_isolated_transaction(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
     def create_schema(self, schema: str) -> None:
         super().create_schema(schema)
 
     def delete_schema(self) -> None:
-        super().delete_schema()
\ No newline at end of file
+        super().delete_schema()
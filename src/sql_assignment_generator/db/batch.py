@@ -0,0 +1,106 @@
+'''Rows to be loaded in bulk into a table, independently from the SQL statement used to insert them.'''
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlglot import exp
+
+
+@dataclass(frozen=True)
+class RawValue:
+    '''A value that is not a literal (e.g. `CURRENT_DATE`), kept as SQL.'''
+
+    sql: str
+
+
+def literal_value(node: exp.Expression, sql_dialect: str | None):
+    '''Python value of a literal, or a `RawValue` for any other expression.'''
+
+    if isinstance(node, exp.Null):
+        return None
+    if isinstance(node, exp.Boolean):
+        return node.this
+    if isinstance(node, exp.Neg) and isinstance(node.this, exp.Literal) and not node.this.is_string:
+        return -literal_value(node.this, sql_dialect)
+    if isinstance(node, exp.Literal):
+        if node.is_string:
+            return node.this
+        try:
+            return int(node.this)
+        except ValueError:
+            # kept exact: a float would round NUMERIC values with more than 15 significant digits
+            return Decimal(node.this)
+    return RawValue(node.sql(dialect=sql_dialect))
+
+
+def to_sql_literal(value) -> str:
+    '''SQL literal for a row value.'''
+
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return f"'{value.isoformat(sep=' ')}'"
+    if isinstance(value, date):
+        return f"'{value.isoformat()}'"
+    if isinstance(value, RawValue):
+        return value.sql
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+@dataclass
+class RowBatch:
+    '''Rows to be inserted into a table.'''
+
+    table: str
+    '''Table name, as SQL.'''
+
+    columns: list[str]
+    '''Column names, as SQL. If empty, rows contain a value for each column of the table, in order.'''
+
+    rows: list[tuple]
+    '''Row values, as Python objects (`RawValue` for values that are not literals).'''
+
+    @property
+    def has_raw_values(self) -> bool:
+        '''Whether some values are SQL expressions, which cannot be sent as query parameters.'''
+        return any(isinstance(value, RawValue) for row in self.rows for value in row)
+
+    def to_sql(self) -> str:
+        '''Multi-row INSERT statement for the batch.'''
+
+        columns = f" ({', '.join(self.columns)})" if self.columns else ''
+        values = ',\n'.join(f"({', '.join(to_sql_literal(value) for value in row)})" for row in self.rows)
+        return f'INSERT INTO {self.table}{columns} VALUES\n{values};'
+
+    @staticmethod
+    def from_insert(insert: exp.Insert, sql_dialect: str | None, *, batch_size: int) -> Iterator['RowBatch'] | None:
+        '''
+        Split a parsed `INSERT INTO ... VALUES` statement into batches of at most `batch_size` rows.
+        Returns None for other kinds of INSERT statements (e.g. `INSERT INTO ... SELECT`).
+        '''
+
+        target = insert.this
+        values = insert.expression
+        if not isinstance(values, exp.Values) or not all(isinstance(row, exp.Tuple) for row in values.expressions):
+            return None
+        if insert.args.get('returning') or insert.args.get('conflict'):
+            return None
+
+        if isinstance(target, exp.Schema):
+            table = target.this.sql(dialect=sql_dialect)
+            columns = [column.sql(dialect=sql_dialect) for column in target.expressions]
+        else:
+            table = target.sql(dialect=sql_dialect)
+            columns = []
+
+        rows = [tuple(literal_value(value, sql_dialect) for value in row.expressions) for row in values.expressions]
+
+        return (RowBatch(table, columns, rows[start:start + batch_size]) for start in range(0, len(rows), batch_size))
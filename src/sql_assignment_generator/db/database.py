@@ -1,31 +1,101 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, TYPE_CHECKING
+import dav_tools
 import time
 
+from .batch import RowBatch
+from .exceptions import QueryExecutionError
+from .pool import ConnectionPool
+
+if TYPE_CHECKING:
+    from ..assignments import Dataset
+
+
+ISOLATION_STRATEGIES = ('schema', 'transaction')
+'''
+How each `with database:` block is isolated from the others:
+- `schema`: a new schema is created on enter and dropped on exit.
+- `transaction`: each connection reuses a single scratch schema, and all changes made inside the block are rolled back on exit.
+'''
+
 
 class Database(ABC):
-    def __init__(self, host: str, port: int, user: str, password: str):
+    supports_transactional_ddl: bool = True
+    '''Whether DDL statements can be rolled back, which is required by the `transaction` isolation strategy.'''
+
+    dialect: str | None = None
+    '''sqlglot dialect of the SQL accepted by `execute`.'''
+
+    def __init__(
+            self,
+            host: str,
+            port: int,
+            user: str,
+            password: str,
+            *,
+            pool: ConnectionPool | None = None,
+            read_only_schema: str | None = None,
+            isolation: str = 'schema'
+        ):
+        if isolation not in ISOLATION_STRATEGIES:
+            raise ValueError(f'Unknown isolation strategy "{isolation}". Supported strategies: {", ".join(ISOLATION_STRATEGIES)}.')
+
+        if isolation == 'transaction' and not self.supports_transactional_ddl:
+            dav_tools.messages.warning(f'{self.__class__.__name__} cannot roll back DDL statements. Falling back to "schema" isolation.')
+            isolation = 'schema'
+
         self.host = host
         self.port = port
         self.user = user
         self.password = password
+        self.pool = pool
+        self.read_only_schema = read_only_schema
+        '''If set, the context manager attaches to this existing schema in a read-only transaction instead of creating a new one.'''
+        self.isolation = isolation
         self.schema: str | None = None
+        self.connection: Any = None
+        self._connection_info: dict = {}
 
     def __enter__(self) -> 'Database':
         self.connect()
-        
-        self.create_schema(f'sql_assignment_generator_{time.time_ns()}')
-        
+
+        if self.read_only_schema is not None:
+            self.use_schema_read_only(self.read_only_schema)
+        elif self.isolation == 'transaction':
+            self.begin_isolated_transaction()
+        else:
+            self.create_schema(f'sql_assignment_generator_{time.time_ns()}')
+
         return self
 
     def __exit__(self, exc_type, exc, tb) -> None:
         try:
-            self.delete_schema()
+            if self.read_only_schema is not None or self.isolation == 'transaction':
+                self.rollback()
+            else:
+                self.delete_schema()
         except Exception as err:
             pass
         finally:
             self.disconnect()
 
+    @property
+    def connection_info(self) -> dict:
+        '''State attached to the current connection, which survives across pooled acquisitions.'''
+        if self.pool is not None:
+            return self.pool.info(self.connection)
+        return self._connection_info
+
+    def begin_isolated_transaction(self) -> None:
+        '''
+        Start a transaction using this connection's scratch schema as search path, creating the schema on first use.
+        Everything executed until `rollback` is discarded.
+        Only called with `transaction` isolation, which `__init__` never selects if `supports_transactional_ddl` is False.
+        '''
+        raise QueryExecutionError(f'{self.__class__.__name__} does not support "transaction" isolation.')
+
     @abstractmethod
     def create_schema(self, schema: str) -> None:
         '''Create a new schema in the database and set it as the search path.'''
@@ -38,13 +108,83 @@ class Database(ABC):
             self.schema = None
 
     @abstractmethod
-    def execute(self, query: str) -> list[tuple]:
+    def use_schema_read_only(self, schema: str) -> None:
+        '''
+        Set an existing schema as the search path and start a read-only transaction.
+        The transaction is never committed: it is rolled back when the connection is released.
+        '''
         pass
 
     @abstractmethod
-    def connect(self) -> None:
+    def execute(self, query: str) -> list[tuple]:
         pass
 
-    @abstractmethod
+    def load_dataset(self, dataset: Dataset, *, batch_size: int = 1000) -> None:
+        '''
+        Create the tables of `dataset` and insert its rows, synthetic rows included.
+        Rows are streamed in batches of at most `batch_size` rows, each loaded with `insert_rows`,
+        instead of sending the whole dataset as a single SQL string.
+        '''
+
+        self.execute('\n'.join(dataset.create_commands))
+
+        for item in dataset.iter_inserts(sql_dialect=self.dialect, batch_size=batch_size):
+            if isinstance(item, RowBatch):
+                self.insert_rows(item)
+            else:
+                self.execute(item)
+
+    def insert_rows(self, batch: RowBatch) -> None:
+        '''Insert a batch of rows. Drivers override this with the bulk loading method of their database.'''
+        self.execute(batch.to_sql())
+
+    def commit(self) -> None:
+        '''Commit the current transaction.'''
+        self.connection.commit()
+
+    def rollback(self) -> None:
+        '''Roll back the current transaction.'''
+        self.connection.rollback()
+
+    def connect(self) -> None:
+        '''Open a connection, borrowing it from the pool if one is configured.'''
+        if self.pool is not None:
+            self.connection = self.pool.acquire()
+        else:
+            self.connection = self.create_connection(self.host, self.port, self.user, self.password)
+
     def disconnect(self) -> None:
+        '''Close the connection, or give it back to the pool if it was borrowed from one.'''
+        if self.connection is None:
+            return
+
+        if self.pool is not None:
+            self.pool.release(self.connection)
+        else:
+            try:
+                self.discard_connection_state(self.connection, self._connection_info)
+            finally:
+                self.connection.close()
+                self._connection_info = {}
+        self.connection = None
+
+    @staticmethod
+    @abstractmethod
+    def create_connection(host: str, port: int, user: str, password: str) -> Any:
+        '''Open a new raw DBAPI connection.'''
+        pass
+
+    @staticmethod
+    def is_connection_alive(connection: Any) -> bool:
+        '''Check whether a pooled connection can still be used.'''
+        return True
+
+    @staticmethod
+    def reset_connection(connection: Any) -> None:
+        '''Discard any pending transaction state before a connection goes back to the pool.'''
+        connection.rollback()
+
+    @staticmethod
+    def discard_connection_state(connection: Any, info: dict) -> None:
+        '''Clean up server-side state attached to a connection (see `connection_info`) before it is closed.'''
         pass
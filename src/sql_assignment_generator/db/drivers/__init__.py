@@ -1,2 +1,27 @@
-from .mysql import MySQLDatabase
-from .postgresql import PostgresqlDatabase
\ No newline at end of file
+'''
+Database backends. Each one is imported on first access, so that database drivers that are not used are never imported.
+'''
+
+from typing import TYPE_CHECKING
+import importlib
+
+if TYPE_CHECKING:
+    from .mysql import MySQLDatabase
+    from .postgresql import PostgresqlDatabase
+    from .sqlite import SQLiteDatabase
+
+
+_BACKENDS = {
+    'MySQLDatabase': '.mysql',
+    'PostgresqlDatabase': '.postgresql',
+    'SQLiteDatabase': '.sqlite',
+}
+
+
+def __getattr__(name: str):
+    if name not in _BACKENDS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    backend = getattr(importlib.import_module(_BACKENDS[name], __name__), name)
+    globals()[name] = backend
+    return backend
@@ -1,19 +1,30 @@
 import mysql.connector
 
+from ...batch import RowBatch
 from ...database import Database
 from ...exceptions import QueryExecutionError
 
 class MySQLDatabase(Database):
-    def connect(self) -> None:
-        self.connection = mysql.connector.connect(
-            host=self.host,
-            port=self.port,
-            user=self.user,
-            password=self.password,
+    dialect = 'mysql'
+
+    supports_transactional_ddl = False
+    '''MySQL implicitly commits DDL statements, so CREATE TABLEs cannot be rolled back.'''
+
+    @staticmethod
+    def create_connection(host: str, port: int, user: str, password: str) -> mysql.connector.MySQLConnection:
+        return mysql.connector.connect(
+            host=host,
+            port=port,
+            user=user,
+            password=password,
         )
 
-    def disconnect(self) -> None:
-        self.connection.close()
+    @staticmethod
+    def is_connection_alive(connection: mysql.connector.MySQLConnection) -> bool:
+        try:
+            return connection.is_connected()
+        except mysql.connector.Error:
+            return False
 
     def execute(self, query: str) -> list[tuple]:
         with self.connection.cursor() as cursor:
@@ -28,26 +39,49 @@ class MySQLDatabase(Database):
                 raise QueryExecutionError(f'Error occurred while executing query: {err}') from err
 
         return [tuple(row) for row in results]
-    
+
+    def insert_rows(self, batch: RowBatch) -> None:
+        # SQL expressions (e.g. CURRENT_DATE) cannot be sent as parameters
+        if batch.has_raw_values or not batch.rows:
+            super().insert_rows(batch)
+            return
+
+        columns = f" ({', '.join(batch.columns)})" if batch.columns else ''
+        placeholders = ', '.join(['%s'] * len(batch.rows[0]))
+
+        with self.connection.cursor() as cursor:
+            try:
+                # the connector rewrites this into multi-row INSERTs
+                cursor.executemany(f'INSERT INTO {batch.table}{columns} VALUES ({placeholders})', batch.rows)
+            except mysql.connector.Error as err:
+                raise QueryExecutionError(f'Error occurred while loading rows: {err}') from err
+
     def create_schema(self, schema: str) -> None:
         with self.connection.cursor() as cursor:
             try:
                 cursor.execute(f'CREATE SCHEMA `{schema}`')
                 cursor.execute(f'USE `{schema}`')
-                
+
                 super().create_schema(schema)
             except mysql.connector.Error as err:
                 raise QueryExecutionError(f'Error occurred while creating schema: {err}') from err
-            
+
+    def use_schema_read_only(self, schema: str) -> None:
+        with self.connection.cursor() as cursor:
+            try:
+                cursor.execute(f'USE `{schema}`')
+                cursor.execute('START TRANSACTION READ ONLY')
+            except mysql.connector.Error as err:
+                raise QueryExecutionError(f'Error occurred while attaching to schema: {err}') from err
 
     def delete_schema(self) -> None:
         if self.schema is None:
             return
-        
+
         with self.connection.cursor() as cursor:
             try:
                 cursor.execute(f'DROP SCHEMA `{self.schema}`')
-                
+
                 super().delete_schema()
             except mysql.connector.Error as err:
-                raise QueryExecutionError(f'Error occurred while deleting schema: {err}') from err
\ No newline at end of file
+                raise QueryExecutionError(f'Error occurred while deleting schema: {err}') from err
@@ -1,19 +1,57 @@
+from datetime import date, datetime
+from decimal import Decimal
 import psycopg2
+import time
+import io
 
+from ...batch import RowBatch
 from ...database import Database
 from ...exceptions import QueryExecutionError
 
+
+def _copy_value(value) -> str:
+    '''Representation of a value in the text format of COPY.'''
+
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
 class PostgresqlDatabase(Database):
-    def connect(self) -> None:
-        self.connection = psycopg2.connect(
-            host=self.host,
-            port=self.port,
-            user=self.user,
-            password=self.password,
+    dialect = 'postgres'
+
+    @staticmethod
+    def create_connection(host: str, port: int, user: str, password: str) -> psycopg2.extensions.connection:
+        return psycopg2.connect(
+            host=host,
+            port=port,
+            user=user,
+            password=password,
         )
 
-    def disconnect(self) -> None:
-        self.connection.close()
+    @staticmethod
+    def is_connection_alive(connection: psycopg2.extensions.connection) -> bool:
+        if connection.closed:
+            return False
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.rollback()
+        except psycopg2.Error:
+            return False
+
+        return True
 
     def execute(self, query: str) -> list[tuple]:
         with self.connection.cursor() as cursor:
@@ -22,31 +60,86 @@ class PostgresqlDatabase(Database):
 
                 if cursor.description is None:
                     return []
-                
+
                 results = cursor.fetchall()
             except psycopg2.Error as err:
                 raise QueryExecutionError(f'Error occurred while executing query: {err}') from err
-        
+
         return results
-    
+
+    def insert_rows(self, batch: RowBatch) -> None:
+        # SQL expressions (e.g. CURRENT_DATE) cannot be loaded with COPY
+        if batch.has_raw_values:
+            super().insert_rows(batch)
+            return
+
+        columns = f" ({', '.join(batch.columns)})" if batch.columns else ''
+        data = io.StringIO(''.join('\t'.join(_copy_value(value) for value in row) + '\n' for row in batch.rows))
+
+        with self.connection.cursor() as cursor:
+            try:
+                cursor.copy_expert(f'COPY {batch.table}{columns} FROM STDIN', data)
+            except psycopg2.Error as err:
+                raise QueryExecutionError(f'Error occurred while loading rows: {err}') from err
+
     def create_schema(self, schema: str) -> None:
         with self.connection.cursor() as cursor:
             try:
                 cursor.execute(f'CREATE SCHEMA "{schema}"')
                 cursor.execute(f'SET search_path TO "{schema}"')
-                
+
                 super().create_schema(schema)
             except psycopg2.Error as err:
                 raise QueryExecutionError(f'Error occurred while creating schema: {err}') from err
 
+    def use_schema_read_only(self, schema: str) -> None:
+        with self.connection.cursor() as cursor:
+            try:
+                # psycopg2 opens a transaction implicitly, SET TRANSACTION must be its first statement
+                cursor.execute('SET TRANSACTION READ ONLY')
+                cursor.execute(f'SET LOCAL search_path TO "{schema}"')
+            except psycopg2.Error as err:
+                raise QueryExecutionError(f'Error occurred while attaching to schema: {err}') from err
+
+    def begin_isolated_transaction(self) -> None:
+        info = self.connection_info
+
+        with self.connection.cursor() as cursor:
+            try:
+                scratch_schema = info.get('scratch_schema')
+                if scratch_schema is None:
+                    scratch_schema = f'sql_assignment_generator_{time.time_ns()}'
+                    cursor.execute(f'CREATE SCHEMA "{scratch_schema}"')
+                    self.connection.commit()
+                    info['scratch_schema'] = scratch_schema
+
+                # SET LOCAL only lasts until the end of the transaction, so the connection is left untouched after the rollback
+                cursor.execute(f'SET LOCAL search_path TO "{scratch_schema}"')
+            except psycopg2.Error as err:
+                raise QueryExecutionError(f'Error occurred while starting isolated transaction: {err}') from err
+
+    @staticmethod
+    def discard_connection_state(connection: psycopg2.extensions.connection, info: dict) -> None:
+        scratch_schema = info.get('scratch_schema')
+        if scratch_schema is None or connection.closed:
+            return
+
+        try:
+            connection.rollback()
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP SCHEMA IF EXISTS "{scratch_schema}" CASCADE')
+            connection.commit()
+        except psycopg2.Error:
+            pass
+
     def delete_schema(self) -> None:
         if self.schema is None:
             return
-        
+
         with self.connection.cursor() as cursor:
             try:
                 cursor.execute(f'DROP SCHEMA "{self.schema}" CASCADE')
-                
+
                 super().delete_schema()
             except psycopg2.Error as err:
-                raise QueryExecutionError(f'Error occurred while deleting schema: {err}') from err
\ No newline at end of file
+                raise QueryExecutionError(f'Error occurred while deleting schema: {err}') from err
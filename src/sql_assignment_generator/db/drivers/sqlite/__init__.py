@@ -0,0 +1,159 @@
+from datetime import date, datetime
+from decimal import Decimal
+import sqlite3
+import threading
+import sqlglot
+from sqlglot import exp
+
+from ...batch import RowBatch
+from ...database import Database
+from ...exceptions import QueryExecutionError
+
+
+_SERIAL_TYPES = (exp.DataType.Type.SERIAL, exp.DataType.Type.SMALLSERIAL, exp.DataType.Type.BIGSERIAL)
+
+
+def _parameter(value):
+    '''Value bound as a query parameter. SQLite has no date or decimal types.'''
+
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        # as text, which the column affinity converts to a number only if no precision is lost
+        return str(value)
+    return value
+
+
+class SQLiteDatabase(Database):
+    '''
+    Embedded, in-memory database backed by SQLite.
+    Queries are written in `dialect` and transpiled to SQLite with sqlglot before being executed.
+
+    Each schema is a named, shared-cache in-memory database, which stays alive until the schema is deleted.
+    '''
+
+    _schemas: dict[str, sqlite3.Connection] = {}
+    '''Connections keeping in-memory schemas alive, even when no `SQLiteDatabase` is connected to them.'''
+
+    _schemas_lock = threading.Lock()
+
+    def __init__(self, *args, dialect: str = 'sqlite', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dialect = dialect
+
+    @staticmethod
+    def create_connection(host: str, port: int, user: str, password: str) -> sqlite3.Connection:
+        return SQLiteDatabase._open(':memory:')
+
+    @staticmethod
+    def _open(schema: str) -> sqlite3.Connection:
+        if schema == ':memory:':
+            connection = sqlite3.connect(':memory:', check_same_thread=False, isolation_level=None)
+        else:
+            connection = sqlite3.connect(f'file:{schema}?mode=memory&cache=shared', uri=True, check_same_thread=False, isolation_level=None)
+
+        connection.execute('PRAGMA foreign_keys = ON')
+        return connection
+
+    def transpile(self, query: str) -> list[str]:
+        '''Translate `query` from the source dialect to a list of SQLite statements.'''
+
+        statements = sqlglot.parse(query, read=self.dialect)
+
+        result = []
+        for statement in statements:
+            if statement is None:
+                continue
+
+            # SQLite only auto-generates values for INTEGER PRIMARY KEY columns
+            for column_type in statement.find_all(exp.DataType):
+                if column_type.this in _SERIAL_TYPES:
+                    column_type.set('this', exp.DataType.Type.INT)
+
+            result.append(statement.sql(dialect='sqlite'))
+
+        return result
+
+    def execute(self, query: str) -> list[tuple]:
+        try:
+            statements = self.transpile(query)
+        except sqlglot.errors.SqlglotError as err:
+            raise QueryExecutionError(f'Error occurred while translating query to SQLite: {err}') from err
+
+        results: list[tuple] = []
+        cursor = self.connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+
+                results = cursor.fetchall() if cursor.description is not None else []
+        except sqlite3.Error as err:
+            raise QueryExecutionError(f'Error occurred while executing query: {err}') from err
+        finally:
+            cursor.close()
+
+        return results
+
+    def insert_rows(self, batch: RowBatch) -> None:
+        # SQL expressions (e.g. CURRENT_DATE) must be transpiled, so they go through `execute`
+        if batch.has_raw_values or not batch.rows:
+            super().insert_rows(batch)
+            return
+
+        columns = f" ({', '.join(batch.columns)})" if batch.columns else ''
+        placeholders = ', '.join(['?'] * len(batch.rows[0]))
+        rows = (tuple(_parameter(value) for value in row) for row in batch.rows)
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.executemany(f'INSERT INTO {batch.table}{columns} VALUES ({placeholders})', rows)
+        except sqlite3.Error as err:
+            raise QueryExecutionError(f'Error occurred while loading rows: {err}') from err
+        finally:
+            cursor.close()
+
+    def create_schema(self, schema: str) -> None:
+        keeper = self._open(schema)
+        with self._schemas_lock:
+            self._schemas[schema] = keeper
+
+        self.connection.close()
+        self.connection = self._open(schema)
+
+        super().create_schema(schema)
+
+    def use_schema_read_only(self, schema: str) -> None:
+        with self._schemas_lock:
+            if schema not in self._schemas:
+                raise QueryExecutionError(f'Error occurred while attaching to schema: schema "{schema}" does not exist.')
+
+        self.connection.close()
+        self.connection = self._open(schema)
+        self.connection.execute('PRAGMA query_only = ON')
+        self.connection.execute('BEGIN')
+
+    def begin_isolated_transaction(self) -> None:
+        # each SQLiteDatabase has its own private in-memory database, and SQLite DDL is transactional
+        self.connection.execute('BEGIN')
+
+    def rollback(self) -> None:
+        if self.connection.in_transaction:
+            self.connection.rollback()
+
+    def delete_schema(self) -> None:
+        if self.schema is None:
+            return
+
+        with self._schemas_lock:
+            keeper = self._schemas.pop(self.schema, None)
+        if keeper is not None:
+            keeper.close()
+
+        super().delete_schema()
+
+    @staticmethod
+    def reset_connection(connection: sqlite3.Connection) -> None:
+        if connection.in_transaction:
+            connection.rollback()
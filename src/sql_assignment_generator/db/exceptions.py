@@ -1,3 +1,7 @@
 class QueryExecutionError(Exception):
     '''Exception raised when a query execution fails.'''
-    pass
\ No newline at end of file
+    pass
+
+class PoolExhaustedError(QueryExecutionError):
+    '''Exception raised when no pooled database connection becomes available in time.'''
+    pass
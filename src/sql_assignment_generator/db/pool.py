@@ -0,0 +1,180 @@
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+import threading
+import time
+
+from .exceptions import PoolExhaustedError
+
+
+@dataclass
+class _IdleConnection:
+    connection: Any
+    '''The raw DBAPI connection.'''
+
+    released_at: float
+    '''Monotonic timestamp of when the connection was returned to the pool.'''
+
+
+@dataclass
+class ConnectionPool:
+    '''
+    A bounded, thread-safe pool of DBAPI connections.
+
+    Connections are created lazily up to `max_size`. Idle connections are health-checked before being handed out,
+    and connections that stayed idle for longer than `max_idle_time` seconds are closed.
+    '''
+
+    connect: Callable[[], Any]
+    '''Factory creating a new raw connection.'''
+
+    is_alive: Callable[[Any], bool]
+    '''Health check, returns False if the connection cannot be used anymore.'''
+
+    reset: Callable[[Any], None]
+    '''Brings a connection back to a clean state before returning it to the pool (e.g. rolls back open transactions).'''
+
+    close: Callable[[Any], None] = lambda connection: connection.close()
+    '''Closes a raw connection.'''
+
+    on_close: Callable[[Any, dict], None] | None = None
+    '''Optional cleanup hook, called with the connection and its `info` dictionary right before it is closed.'''
+
+    max_size: int = 8
+    '''Maximum number of connections (idle + in use) held by the pool.'''
+
+    max_idle_time: float = 300.0
+    '''Seconds after which an idle connection is evicted.'''
+
+    acquire_timeout: float | None = None
+    '''Seconds to wait for a free connection before raising `PoolExhaustedError`. None waits forever.'''
+
+    _idle: deque[_IdleConnection] = field(default_factory=deque, init=False, repr=False)
+    _info: dict[int, dict] = field(default_factory=dict, init=False, repr=False)
+    _in_use: int = field(default=0, init=False, repr=False)
+    _closed: bool = field(default=False, init=False, repr=False)
+    _condition: threading.Condition = field(default_factory=threading.Condition, init=False, repr=False)
+
+    @property
+    def size(self) -> int:
+        '''Number of connections currently held by the pool, either idle or in use.'''
+        with self._condition:
+            return len(self._idle) + self._in_use
+
+    def info(self, connection: Any) -> dict:
+        '''
+        Per-connection dictionary that lives as long as the connection itself.
+        Used by database backends to remember connection-level state across acquisitions.
+        '''
+        with self._condition:
+            return self._info.setdefault(id(connection), {})
+
+    def acquire(self) -> Any:
+        '''Get a healthy connection from the pool, creating a new one if needed and allowed.'''
+
+        deadline = None if self.acquire_timeout is None else time.monotonic() + self.acquire_timeout
+        evicted: list[Any] = []
+
+        try:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise PoolExhaustedError('Connection pool has been closed.')
+
+                    evicted.extend(self._evict_idle())
+
+                    if self._idle:
+                        # most recently released first: it is the most likely to still be alive
+                        candidate = self._idle.pop().connection
+                        self._in_use += 1
+                        break
+
+                    if self._in_use < self.max_size:
+                        candidate = None
+                        self._in_use += 1
+                        break
+
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise PoolExhaustedError(f'No database connection available after {self.acquire_timeout} seconds (pool size: {self.max_size}).')
+                    self._condition.wait(remaining)
+        finally:
+            for connection in evicted:
+                self._close_quietly(connection)
+
+        # slow operations (health checks, connecting) happen outside the lock
+        try:
+            if candidate is not None:
+                if self.is_alive(candidate):
+                    return candidate
+                self._close_quietly(candidate)
+            return self.connect()
+        except BaseException:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, connection: Any, *, discard: bool = False) -> None:
+        '''Return a connection to the pool. Broken connections (or `discard=True`) are closed instead.'''
+
+        if not discard:
+            try:
+                self.reset(connection)
+            except Exception:
+                discard = True
+
+        with self._condition:
+            self._in_use -= 1
+            if not discard and not self._closed:
+                self._idle.append(_IdleConnection(connection, time.monotonic()))
+                connection = None
+            self._condition.notify()
+
+        if connection is not None:
+            self._close_quietly(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        '''Context manager acquiring a connection and releasing it on exit.'''
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close_all(self) -> None:
+        '''Close all idle connections and refuse further acquisitions. In-use connections are closed when released.'''
+        with self._condition:
+            self._closed = True
+            idle = [entry.connection for entry in self._idle]
+            self._idle.clear()
+            self._condition.notify_all()
+
+        for connection in idle:
+            self._close_quietly(connection)
+
+    def _evict_idle(self) -> list[Any]:
+        '''Remove and return connections idle for too long, which must then be closed. Must be called while holding the lock.'''
+        evicted = []
+        now = time.monotonic()
+        while self._idle and now - self._idle[0].released_at > self.max_idle_time:
+            evicted.append(self._idle.popleft().connection)
+        return evicted
+
+    def _close_quietly(self, connection: Any) -> None:
+        with self._condition:
+            info = self._info.pop(id(connection), {})
+
+        if self.on_close is not None:
+            try:
+                self.on_close(connection, info)
+            except Exception:
+                pass
+
+        try:
+            self.close(connection)
+        except Exception:
+            pass
@@ -0,0 +1,24 @@
+'''Configuration loaded from the environment.'''
+
+import threading
+
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_environment() -> None:
+    '''
+    Load the variables defined in a `.env` file (if any) into the environment, on the first call.
+
+    Called before reading any configuration variable, instead of at import time, since `dotenv` is slow to import.
+    '''
+
+    global _loaded
+
+    with _lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            _loaded = True
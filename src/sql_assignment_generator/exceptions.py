@@ -33,4 +33,12 @@ class ExerciseGenerationError(Exception):
 
 class DatasetGenerationError(Exception):
     '''Custom exception for errors during dataset generation.'''
-    pass
\ No newline at end of file
+    pass
+
+class BudgetExhaustedError(Exception):
+    '''Custom exception for generation steps stopped because the token or time budget is exhausted.'''
+    pass
+
+class LLMRequestError(Exception):
+    '''Custom exception for LLM requests rejected by the API, or still failing after all retries.'''
+    pass
@@ -0,0 +1,1037 @@
+'''Generate SQL assignments based on specified SQL errors and difficulty levels.'''
+
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Callable, Generator, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from functools import partial
+import contextvars
+import multiprocessing
+import threading
+import asyncio
+import random
+
+from .difficulty_level import DifficultyLevel
+from .domains import random_domain
+from .assignments import Assignment, AssignmentSpec, Dataset, Exercise, ExerciseResult
+from .assignments.dataset import get_library
+from .assignments.exercise.fingerprint import SolutionRegistry, solution_fingerprint
+from .constraints import SchemaConstraint, QueryConstraint
+from .error_requirements import SqlErrorRequirements, ERROR_REQUIREMENTS_MAP
+from .exceptions import ExerciseGenerationError, BudgetExhaustedError, DatasetGenerationError
+from .db import Database, QueryExecutionError
+from . import llm, tracing
+from .budget import Budget
+from .checkpoint import Checkpoint
+from .steps import Step, step, run_steps, arun_steps
+
+import dav_tools
+from sql_error_taxonomy import SqlErrors
+
+
+def generate_assignment(
+        errors: list[tuple[SqlErrors, DifficultyLevel]],
+        db_host: str,
+        db_port: int,
+        db_user: str,
+        db_password: str,
+        sql_dialect: str = 'postgres',
+        *,
+        language: str = 'en',
+        domain: str | None = None,
+        dataset_str: str | None = None,
+        shuffle_exercises: bool = False,
+        naming_func: Callable[[SqlErrors, DifficultyLevel], str] = lambda error, difficulty: f'{error.name} - {difficulty.name}',
+        max_dataset_attempts: int = 3,
+        max_exercise_attempts: int = 3,
+        max_unique_attempts: int = 3,
+        exercise_candidates: int = 1,
+        max_workers: int | None = None,
+        reuse_dataset_schema: bool = True,
+        db_isolation: str = 'schema',
+        embedded_db: bool = False,
+        token_budget: int | None = None,
+        time_budget: float | None = None,
+        dataset_rows: int | dict[str, int] | None = None,
+        checkpoint_dir: str | None = None,
+        validation_processes: int | None = None
+    ) -> Assignment:
+    '''
+    Generate SQL assignments based on the given SQL errors and their corresponding difficulty levels.
+
+    - Exercises are returned in the same order as the input `errors`.
+    - Logging happens as soon as possible (during generation), and each message uses the exercise title as its id.
+    - Deduplication is global across all generated exercises (thread-safe), and ignores differences in formatting, aliases and condition order.
+
+    Args:
+        errors (list[tuple[SqlErrors, DifficultyLevel]]): A list of (error, difficulty) pairs.
+        sql_dialect (str): The SQL dialect to use for generating the dataset and exercises (e.g., 'postgres', 'mysql').
+        domain (str | None): The domain for the assignments. If None, a random domain will be selected.
+            If a dataset library is configured (see `assignments.dataset.get_library`), a stored dataset satisfying the same requirements
+            is reused instead of generating a new one (from any domain, if None).
+        language (str): The language for the assignment generation (e.g., 'en' for English).
+        dataset_str (str | None): Optional SQL string to use as the dataset. If provided, it will be used instead of generating a new dataset.
+        shuffle_exercises (bool): Whether to shuffle exercises to prevent ordering bias (shuffles input order).
+        naming_func (Callable[[SqlErrors, DifficultyLevel], str]): Generates exercise titles.
+        max_dataset_attempts (int): Maximum retries for generating a valid dataset before skipping.
+        max_exercise_attempts (int): Maximum retries for generating a valid exercise before skipping.
+        max_unique_attempts (int): Maximum retries to avoid duplicate solutions per (error, difficulty).
+        exercise_candidates (int): Number of alternative exercises requested from the LLM on each attempt and validated in parallel.
+            The first one satisfying all constraints is accepted. Values greater than 1 reduce the number of sequential attempts for hard errors.
+        max_workers (int | None): Thread pool size. If None, uses ThreadPoolExecutor default.
+        reuse_dataset_schema (bool): Whether to load the dataset once into a shared schema and validate all exercises against it read-only,
+            instead of reloading the dataset for each exercise attempt.
+        db_isolation (str): How each validation is isolated on the database: 'schema' creates and drops a schema per check,
+            'transaction' reuses one schema per connection and rolls back each check (only for DBMSs with transactional DDL).
+        embedded_db (bool): Whether to run all SQL checks on an in-memory SQLite database (transpiled from `sql_dialect`) instead of the database server.
+            `db_host`, `db_port`, `db_user` and `db_password` are ignored in that case.
+        token_budget (int | None): Maximum number of LLM tokens (input + output) to spend. Once exceeded, no new attempt is started
+            and the remaining exercises are skipped. Requests already in progress are completed, so the budget can be slightly exceeded.
+        time_budget (float | None): Maximum number of seconds to spend, with the same behaviour as `token_budget`.
+        dataset_rows (int | dict[str, int] | None): If set, the tables of the dataset are scaled to this number of rows
+            (or to `dataset_rows[table]` rows, by table name) by synthesizing new rows locally from those generated by the LLM
+            (see `Dataset.amplify`). Exercises are validated against the scaled dataset, while prompts only include the generated rows.
+        checkpoint_dir (str | None): If set, the dataset, each completed exercise and the fingerprints of the generated solutions
+            are saved in this directory as soon as they are ready (see `checkpoint.Checkpoint`). Calling again with the same arguments
+            and directory (e.g. after a crash) resumes the generation: only the missing exercises are generated.
+        validation_processes (int | None): If set, candidate solutions are parsed and checked against the constraints and the dataset catalog
+            by a pool of this many processes, so that validation is not limited to a single core. LLM calls and database checks still run in threads.
+            Processes are started with the 'spawn' method: scripts must guard their entry point with `if __name__ == '__main__':`.
+
+    Returns:
+        Assignment: The generated assignment (stable order).
+    '''
+
+    results = iter_assignment(
+        errors,
+        db_host,
+        db_port,
+        db_user,
+        db_password,
+        sql_dialect,
+        language=language,
+        domain=domain,
+        dataset_str=dataset_str,
+        shuffle_exercises=shuffle_exercises,
+        naming_func=naming_func,
+        max_dataset_attempts=max_dataset_attempts,
+        max_exercise_attempts=max_exercise_attempts,
+        max_unique_attempts=max_unique_attempts,
+        exercise_candidates=exercise_candidates,
+        max_workers=max_workers,
+        reuse_dataset_schema=reuse_dataset_schema,
+        db_isolation=db_isolation,
+        embedded_db=embedded_db,
+        token_budget=token_budget,
+        time_budget=time_budget,
+        dataset_rows=dataset_rows,
+        checkpoint_dir=checkpoint_dir,
+        validation_processes=validation_processes
+    )
+
+    with tracing.span('assignment', requested=len(errors)) as assignment_span, llm.tracking_usage() as usage:
+        dataset = next(results)
+        assert isinstance(dataset, Dataset)
+
+        # results arrive in completion order: sort them back into assignment order
+        exercise_results = sorted(results, key=lambda result: result.position)  # type: ignore
+
+        exercises = [result.exercise for result in exercise_results if result.exercise is not None]
+        assignment_span.set(generated=len(exercises))
+
+    return Assignment(
+        dataset=dataset,
+        exercises=exercises,
+        usage=usage
+    )
+
+
+def iter_assignment(
+        errors: list[tuple[SqlErrors, DifficultyLevel]],
+        db_host: str,
+        db_port: int,
+        db_user: str,
+        db_password: str,
+        sql_dialect: str = 'postgres',
+        *,
+        language: str = 'en',
+        domain: str | None = None,
+        dataset_str: str | None = None,
+        shuffle_exercises: bool = False,
+        naming_func: Callable[[SqlErrors, DifficultyLevel], str] = lambda error, difficulty: f'{error.name} - {difficulty.name}',
+        max_dataset_attempts: int = 3,
+        max_exercise_attempts: int = 3,
+        max_unique_attempts: int = 3,
+        exercise_candidates: int = 1,
+        max_workers: int | None = None,
+        reuse_dataset_schema: bool = True,
+        db_isolation: str = 'schema',
+        embedded_db: bool = False,
+        token_budget: int | None = None,
+        time_budget: float | None = None,
+        dataset_rows: int | dict[str, int] | None = None,
+        checkpoint_dir: str | None = None,
+        validation_processes: int | None = None
+    ) -> Iterator[Dataset | ExerciseResult]:
+    '''
+    Generate an assignment like `generate_assignment`, reporting progress as soon as possible.
+
+    The first item is the `Dataset`, yielded as soon as it is ready.
+    Then, an `ExerciseResult` is yielded for each requested exercise, in completion order, as soon as its generation ends
+    (successfully or not). Use `ExerciseResult.position` to rebuild the assignment order.
+
+    Stopping the iteration early cancels the exercises that have not started yet.
+
+    Args:
+        (same as `generate_assignment`)
+    '''
+
+    budget = Budget(tokens=token_budget, seconds=time_budget)
+    requirements, checkpoint, dataset = run_steps(_assignment_steps(
+        errors,
+        language=language,
+        shuffle_exercises=shuffle_exercises,
+        checkpoint_dir=checkpoint_dir,
+        domain=domain,
+        dataset_str=dataset_str,
+        sql_dialect=sql_dialect,
+        max_dataset_attempts=max_dataset_attempts,
+        db_host=db_host,
+        db_port=db_port,
+        db_user=db_user,
+        db_password=db_password,
+        db_isolation=db_isolation,
+        embedded_db=embedded_db,
+        budget=budget,
+        dataset_rows=dataset_rows
+    ))
+
+    yield dataset
+
+    generated_solutions = SolutionRegistry()
+    restored, pending = _split_restored(requirements, _restore_exercises(checkpoint, dataset, generated_solutions))
+    generated = len(restored)
+    yield from restored
+
+    worker = partial(
+        _generate_exercise,
+        dataset=dataset,
+        generated_solutions=generated_solutions,
+        checkpoint=checkpoint,
+        # Serialize log output to avoid interleaving (and to keep dav_tools usage thread-safe).
+        log_lock=threading.Lock(),
+        budget=budget,
+        naming_func=naming_func,
+        sql_dialect=sql_dialect,
+        language=language,
+        max_exercise_attempts=max_exercise_attempts,
+        max_unique_attempts=max_unique_attempts,
+        exercise_candidates=exercise_candidates,
+        db_host=db_host,
+        db_port=db_port,
+        db_user=db_user,
+        db_password=db_password,
+        db_isolation=db_isolation,
+        embedded_db=embedded_db
+    )
+
+    with ExitStack() as stack:
+        validation_pool = _validation_pool(stack, validation_processes) if pending else None
+
+        dataset_schema: str | None = None
+        if reuse_dataset_schema and pending:
+            dataset_schema = _shared_schema(stack, dataset, db_host=db_host, db_port=db_port, db_user=db_user, db_password=db_password,
+                                            sql_dialect=sql_dialect, embedded_db=embedded_db)
+
+        if max_workers == 1:
+            for exercise in pending:
+                result = worker(*exercise, dataset_schema, validation_pool=validation_pool)
+                generated += result.exercise is not None
+                yield result
+        else:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+            try:
+                # each worker runs in a copy of the current context, so that its spans are nested in the current one
+                futures = [
+                    executor.submit(contextvars.copy_context().run, worker, *exercise, dataset_schema, validation_pool=validation_pool)
+                    for exercise in pending
+                ]
+                for fut in as_completed(futures):
+                    result = fut.result()
+                    generated += result.exercise is not None
+                    yield result
+            finally:
+                # running exercises still use the shared schema, so wait for them before dropping it
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    _log_summary(requested=len(errors), supported=len(requirements), generated=generated)
+
+
+def generate_assignments(
+        batch_specs: list[AssignmentSpec],
+        db_host: str,
+        db_port: int,
+        db_user: str,
+        db_password: str,
+        sql_dialect: str = 'postgres',
+        *,
+        language: str = 'en',
+        naming_func: Callable[[SqlErrors, DifficultyLevel], str] = lambda error, difficulty: f'{error.name} - {difficulty.name}',
+        max_dataset_attempts: int = 3,
+        max_exercise_attempts: int = 3,
+        max_unique_attempts: int = 3,
+        exercise_candidates: int = 1,
+        max_workers: int | None = None,
+        share_datasets: bool = True,
+        reuse_dataset_schema: bool = True,
+        db_isolation: str = 'schema',
+        embedded_db: bool = False,
+        token_budget: int | None = None,
+        time_budget: float | None = None,
+        dataset_rows: int | dict[str, int] | None = None,
+        validation_processes: int | None = None
+    ) -> list[Assignment | None]:
+    '''
+    Generate one assignment for each spec in `batch_specs` (e.g. one per student), planning the whole batch up front.
+
+    - Specs with the same domain and dataset string share a single dataset, generated to satisfy the requirements
+      of all their exercises. Specs without a domain share a randomly selected one. Set `share_datasets` to False
+      to generate a dataset for each spec instead.
+    - Datasets and exercises of all specs are generated by a single pool of `max_workers` threads, so that throughput
+      depends on the number of workers rather than on the number of specs. Exercises start as soon as their dataset is ready.
+    - Each dataset is loaded once into a shared schema (if `reuse_dataset_schema`), which is used by all the specs sharing it.
+    - Duplicate solutions are rejected across the whole batch.
+    - `token_budget` and `time_budget` apply to the whole batch.
+
+    The LLM usage of a shared dataset is accounted to the first assignment using it.
+
+    Args:
+        batch_specs (list[AssignmentSpec]): The assignments to generate.
+        share_datasets (bool): Whether specs with the same domain and dataset string share a dataset.
+        (all other arguments are the same as `generate_assignment`)
+
+    Returns:
+        list[Assignment | None]: The generated assignments, in the same order as `batch_specs`.
+            None for the specs whose dataset could not be generated, and for those without any supported error.
+    '''
+
+    specs_requirements: list[list[tuple[int, SqlErrors, SqlErrorRequirements, DifficultyLevel]] | None] = []
+    for spec in batch_specs:
+        try:
+            specs_requirements.append(_prepare_requirements(spec.errors, language=language, shuffle_exercises=spec.shuffle_exercises))
+        except ValueError as e:
+            # e.g. none of the errors is supported: only this assignment is skipped
+            dav_tools.messages.error(f'Skipping assignment: {e}')
+            specs_requirements.append(None)
+
+    groups = [
+        [spec_index for spec_index in group if specs_requirements[spec_index] is not None]
+        for group in _dataset_groups(batch_specs, share_datasets=share_datasets)
+    ]
+    groups = [group for group in groups if group]
+
+    budget = Budget(tokens=token_budget, seconds=time_budget)
+    usages = [llm.Usage() for _ in batch_specs]
+
+    obtain_dataset = partial(
+        _obtain_dataset,
+        sql_dialect=sql_dialect,
+        language=language,
+        max_dataset_attempts=max_dataset_attempts,
+        db_host=db_host,
+        db_port=db_port,
+        db_user=db_user,
+        db_password=db_password,
+        db_isolation=db_isolation,
+        embedded_db=embedded_db,
+        budget=budget,
+        dataset_rows=dataset_rows
+    )
+    worker = partial(
+        _generate_exercise,
+        generated_solutions=SolutionRegistry(),
+        checkpoint=None,
+        log_lock=threading.Lock(),
+        budget=budget,
+        naming_func=naming_func,
+        sql_dialect=sql_dialect,
+        language=language,
+        max_exercise_attempts=max_exercise_attempts,
+        max_unique_attempts=max_unique_attempts,
+        exercise_candidates=exercise_candidates,
+        db_host=db_host,
+        db_port=db_port,
+        db_user=db_user,
+        db_password=db_password,
+        db_isolation=db_isolation,
+        embedded_db=embedded_db
+    )
+
+    def _submit(executor: ThreadPoolExecutor, usage: llm.Usage, function: Callable, *args, **kwargs):
+        '''Run `function` in the pool, recording its LLM usage in `usage`. Spans are nested in the current one.'''
+
+        def _tracked():
+            with llm.tracking_usage(usage):
+                return function(*args, **kwargs)
+
+        return executor.submit(contextvars.copy_context().run, _tracked)
+
+    datasets: dict[int, Dataset] = {}
+    exercise_results: list[list[ExerciseResult]] = [[] for _ in batch_specs]
+
+    with tracing.span('assignments', requested=len(batch_specs), datasets=len(groups)) as batch_span, ExitStack() as shared_schemas:
+        validation_pool = _validation_pool(shared_schemas, validation_processes)
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            dataset_futures = {
+                _submit(
+                    executor,
+                    usages[group[0]],
+                    obtain_dataset,
+                    [requirement for spec_index in group for requirement in specs_requirements[spec_index] or []],
+                    domain=batch_specs[group[0]].domain,
+                    dataset_str=batch_specs[group[0]].dataset_str
+                ): group
+                for group in groups
+            }
+
+            exercise_futures = {}
+            for dataset_future in as_completed(dataset_futures):
+                group = dataset_futures[dataset_future]
+                try:
+                    dataset = dataset_future.result()
+                except (DatasetGenerationError, BudgetExhaustedError) as e:
+                    dav_tools.messages.error(f'Skipping {len(group)} assignments: {e}')
+                    continue
+
+                dataset_schema: str | None = None
+                if reuse_dataset_schema:
+                    dataset_schema = _shared_schema(shared_schemas, dataset, db_host=db_host, db_port=db_port, db_user=db_user, db_password=db_password,
+                                                    sql_dialect=sql_dialect, embedded_db=embedded_db)
+
+                for spec_index in group:
+                    datasets[spec_index] = dataset
+                    for position, (index, error, requirement, difficulty) in enumerate(specs_requirements[spec_index] or []):
+                        exercise_future = _submit(executor, usages[spec_index], worker, position, index, error, requirement, difficulty, dataset_schema, dataset=dataset, validation_pool=validation_pool)
+                        exercise_futures[exercise_future] = spec_index
+
+            for exercise_future in as_completed(exercise_futures):
+                exercise_results[exercise_futures[exercise_future]].append(exercise_future.result())
+        finally:
+            # running exercises still use the shared schemas, so wait for them before dropping them
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        assignments: list[Assignment | None] = []
+        for spec_index in range(len(batch_specs)):
+            if spec_index not in datasets:
+                assignments.append(None)
+                continue
+
+            results = sorted(exercise_results[spec_index], key=lambda result: result.position)
+            assignments.append(Assignment(
+                dataset=datasets[spec_index],
+                exercises=[result.exercise for result in results if result.exercise is not None],
+                usage=usages[spec_index]
+            ))
+
+        generated = sum(len(assignment.exercises) for assignment in assignments if assignment is not None)
+        batch_span.set(generated=generated)
+
+    _log_summary(
+        requested=sum(len(spec.errors) for spec in batch_specs),
+        supported=sum(len(requirements) for requirements in specs_requirements if requirements is not None),
+        generated=generated
+    )
+
+    return assignments
+
+
+async def agenerate_assignment(
+        errors: list[tuple[SqlErrors, DifficultyLevel]],
+        db_host: str,
+        db_port: int,
+        db_user: str,
+        db_password: str,
+        sql_dialect: str = 'postgres',
+        *,
+        language: str = 'en',
+        domain: str | None = None,
+        dataset_str: str | None = None,
+        shuffle_exercises: bool = False,
+        naming_func: Callable[[SqlErrors, DifficultyLevel], str] = lambda error, difficulty: f'{error.name} - {difficulty.name}',
+        max_dataset_attempts: int = 3,
+        max_exercise_attempts: int = 3,
+        max_unique_attempts: int = 3,
+        exercise_candidates: int = 1,
+        max_concurrency: int = 16,
+        reuse_dataset_schema: bool = True,
+        db_isolation: str = 'schema',
+        embedded_db: bool = False,
+        token_budget: int | None = None,
+        time_budget: float | None = None,
+        dataset_rows: int | dict[str, int] | None = None,
+        checkpoint_dir: str | None = None,
+        validation_processes: int | None = None
+    ) -> Assignment:
+    '''
+    Asynchronous version of `generate_assignment`.
+
+    LLM calls are awaited instead of blocking worker threads, so a single event loop can drive many exercise generations at once.
+    Parsing, validation and database checks run in worker threads.
+
+    Args:
+        max_concurrency (int): Maximum number of exercises being generated at the same time.
+        (all other arguments are the same as `generate_assignment`)
+
+    Returns:
+        Assignment: The generated assignment (stable order).
+    '''
+
+    results = aiter_assignment(
+        errors,
+        db_host,
+        db_port,
+        db_user,
+        db_password,
+        sql_dialect,
+        language=language,
+        domain=domain,
+        dataset_str=dataset_str,
+        shuffle_exercises=shuffle_exercises,
+        naming_func=naming_func,
+        max_dataset_attempts=max_dataset_attempts,
+        max_exercise_attempts=max_exercise_attempts,
+        max_unique_attempts=max_unique_attempts,
+        exercise_candidates=exercise_candidates,
+        max_concurrency=max_concurrency,
+        reuse_dataset_schema=reuse_dataset_schema,
+        db_isolation=db_isolation,
+        embedded_db=embedded_db,
+        token_budget=token_budget,
+        time_budget=time_budget,
+        dataset_rows=dataset_rows,
+        checkpoint_dir=checkpoint_dir,
+        validation_processes=validation_processes
+    )
+
+    with tracing.span('assignment', requested=len(errors)) as assignment_span, llm.tracking_usage() as usage:
+        dataset = await anext(results)
+        assert isinstance(dataset, Dataset)
+
+        exercise_results: list[ExerciseResult] = [result async for result in results]   # type: ignore
+        exercise_results.sort(key=lambda result: result.position)
+
+        exercises = [result.exercise for result in exercise_results if result.exercise is not None]
+        assignment_span.set(generated=len(exercises))
+
+    return Assignment(
+        dataset=dataset,
+        exercises=exercises,
+        usage=usage
+    )
+
+
+async def aiter_assignment(
+        errors: list[tuple[SqlErrors, DifficultyLevel]],
+        db_host: str,
+        db_port: int,
+        db_user: str,
+        db_password: str,
+        sql_dialect: str = 'postgres',
+        *,
+        language: str = 'en',
+        domain: str | None = None,
+        dataset_str: str | None = None,
+        shuffle_exercises: bool = False,
+        naming_func: Callable[[SqlErrors, DifficultyLevel], str] = lambda error, difficulty: f'{error.name} - {difficulty.name}',
+        max_dataset_attempts: int = 3,
+        max_exercise_attempts: int = 3,
+        max_unique_attempts: int = 3,
+        exercise_candidates: int = 1,
+        max_concurrency: int = 16,
+        reuse_dataset_schema: bool = True,
+        db_isolation: str = 'schema',
+        embedded_db: bool = False,
+        token_budget: int | None = None,
+        time_budget: float | None = None,
+        dataset_rows: int | dict[str, int] | None = None,
+        checkpoint_dir: str | None = None,
+        validation_processes: int | None = None
+    ) -> AsyncIterator[Dataset | ExerciseResult]:
+    '''
+    Asynchronous version of `iter_assignment`.
+
+    Args:
+        max_concurrency (int): Maximum number of exercises being generated at the same time.
+        (all other arguments are the same as `generate_assignment`)
+    '''
+
+    budget = Budget(tokens=token_budget, seconds=time_budget)
+    requirements, checkpoint, dataset = await arun_steps(_assignment_steps(
+        errors,
+        language=language,
+        shuffle_exercises=shuffle_exercises,
+        checkpoint_dir=checkpoint_dir,
+        domain=domain,
+        dataset_str=dataset_str,
+        sql_dialect=sql_dialect,
+        max_dataset_attempts=max_dataset_attempts,
+        db_host=db_host,
+        db_port=db_port,
+        db_user=db_user,
+        db_password=db_password,
+        db_isolation=db_isolation,
+        embedded_db=embedded_db,
+        budget=budget,
+        dataset_rows=dataset_rows
+    ))
+
+    yield dataset
+
+    generated_solutions = SolutionRegistry()
+    restored, pending = _split_restored(requirements, _restore_exercises(checkpoint, dataset, generated_solutions))
+    generated = len(restored)
+    for result in restored:
+        yield result
+
+    exercise_steps = partial(
+        _exercise_steps,
+        dataset=dataset,
+        generated_solutions=generated_solutions,
+        checkpoint=checkpoint,
+        log_lock=threading.Lock(),
+        budget=budget,
+        naming_func=naming_func,
+        sql_dialect=sql_dialect,
+        language=language,
+        max_exercise_attempts=max_exercise_attempts,
+        max_unique_attempts=max_unique_attempts,
+        exercise_candidates=exercise_candidates,
+        db_host=db_host,
+        db_port=db_port,
+        db_user=db_user,
+        db_password=db_password,
+        db_isolation=db_isolation,
+        embedded_db=embedded_db
+    )
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _worker(*args, **kwargs) -> ExerciseResult:
+        async with semaphore:
+            return await arun_steps(exercise_steps(*args, **kwargs))
+
+    with ExitStack() as stack:
+        validation_pool = _validation_pool(stack, validation_processes) if pending else None
+
+        dataset_schema: str | None = None
+        if reuse_dataset_schema and pending:
+            dataset_schema = await asyncio.to_thread(_shared_schema, stack, dataset, db_host=db_host, db_port=db_port, db_user=db_user, db_password=db_password,
+                                                     sql_dialect=sql_dialect, embedded_db=embedded_db)
+
+        tasks = [
+            asyncio.ensure_future(_worker(*exercise, dataset_schema, validation_pool=validation_pool))
+            for exercise in pending
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                generated += result.exercise is not None
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await asyncio.to_thread(stack.close)
+
+    _log_summary(requested=len(errors), supported=len(requirements), generated=generated)
+
+
+def _dataset_steps(
+        requirements: list[tuple[int, SqlErrors, SqlErrorRequirements, DifficultyLevel]],
+        *,
+        domain: str | None,
+        dataset_str: str | None,
+        sql_dialect: str,
+        language: str,
+        max_dataset_attempts: int,
+        db_host: str,
+        db_port: int,
+        db_user: str,
+        db_password: str,
+        db_isolation: str,
+        embedded_db: bool,
+        budget: Budget,
+        dataset_rows: int | dict[str, int] | None
+    ) -> Generator[Step, Any, Dataset]:
+    '''
+    Parse `dataset_str`, or reuse a stored dataset, or generate a new one satisfying the requirements of all exercises.
+    Yields a `Step` for the generation (see `steps`).
+    '''
+
+    if not dataset_str:
+        # No dataset string provided, so we need to generate a dataset based on the requirements of the exercises.
+        dataset_requirements, dataset_extra_details = _dataset_requirements(requirements, language=language)
+
+        # A stored dataset satisfying the same requirements is reused, if any (any domain, unless one was requested).
+        library = get_library()
+        dataset = library.find(domain, sql_dialect, dataset_requirements, dataset_extra_details) if library is not None else None
+
+        if dataset is not None:
+            dav_tools.messages.success(f'Reusing stored dataset for domain: {dataset.domain}')
+        else:
+            if domain is None:
+                domain = random_domain(language=language)
+
+            dav_tools.messages.info(f'Generating dataset for domain: {domain}')
+            with budget.tracking():
+                dataset = yield step(
+                    Dataset.generate, Dataset.agenerate,
+                    domain=domain,
+                    sql_dialect=sql_dialect,
+                    constraints=dataset_requirements,
+                    extra_details=dataset_extra_details,
+                    language=language,
+                    max_attempts=max_dataset_attempts,
+                    db_isolation=db_isolation,
+                    embedded_db=embedded_db,
+                    db_host=db_host,
+                    db_port=db_port,
+                    db_user=db_user,
+                    db_password=db_password,
+                    budget=budget
+                )
+            dav_tools.messages.success(f'Dataset generated')
+
+            if library is not None:
+                library.add(dataset, sql_dialect=sql_dialect, constraints=dataset_requirements, extra_details=dataset_extra_details)
+    else:
+        dataset = Dataset.from_sql(
+            sql_str=dataset_str,
+            sql_dialect=sql_dialect
+        )
+
+    if dataset_rows is not None:
+        dataset = dataset.amplify(dataset_rows, sql_dialect=sql_dialect)
+
+    return dataset
+
+
+def _obtain_dataset(requirements: list[tuple[int, SqlErrors, SqlErrorRequirements, DifficultyLevel]], **kwargs) -> Dataset:
+    '''Run `_dataset_steps` in the current thread.'''
+
+    return run_steps(_dataset_steps(requirements, **kwargs))
+
+
+def _exercise_steps(
+        position: int,
+        index: int,
+        error: SqlErrors,
+        requirement: SqlErrorRequirements,
+        difficulty: DifficultyLevel,
+        dataset_schema: str | None,
+        *,
+        dataset: Dataset,
+        generated_solutions: SolutionRegistry,
+        checkpoint: Checkpoint | None,
+        log_lock: threading.Lock,
+        budget: Budget,
+        naming_func: Callable[[SqlErrors, DifficultyLevel], str],
+        sql_dialect: str,
+        language: str,
+        max_exercise_attempts: int,
+        max_unique_attempts: int,
+        exercise_candidates: int,
+        db_host: str,
+        db_port: int,
+        db_user: str,
+        db_password: str,
+        db_isolation: str,
+        embedded_db: bool,
+        validation_pool: Executor | None = None
+    ) -> Generator[Step, Any, ExerciseResult]:
+    '''
+    Generate the exercise at `position`, retrying while its solution duplicates one in `generated_solutions`,
+    and save it to `checkpoint` (if any). Yields a `Step` for each attempt and for the save (see `steps`).
+    '''
+
+    title = naming_func(error, difficulty)
+
+    dav_tools.messages.info(f'Starting generation for exercise: {title}')
+
+    constraints = requirement.exercise_constraints(difficulty)
+    extra_details = requirement.exercise_extra_details().get(language=language)
+    failure = ExerciseResult(index=index, position=position, error=error, difficulty=difficulty, exercise=None)
+
+    last_generated_exercise: Exercise | None = None
+
+    for attempt in range(max_unique_attempts):
+        try:
+            with budget.tracking():
+                generated_exercise = yield step(
+                    Exercise.generate, Exercise.agenerate,
+                    error=error,
+                    difficulty=difficulty,
+                    constraints=constraints,
+                    extra_details=extra_details,
+                    sql_dialect=sql_dialect,
+                    dataset=dataset,
+                    title=title,
+                    max_attempts=max_exercise_attempts,
+                    language=language,
+                    db_host=db_host,
+                    db_port=db_port,
+                    db_user=db_user,
+                    db_password=db_password,
+                    dataset_schema=dataset_schema,
+                    db_isolation=db_isolation,
+                    embedded_db=embedded_db,
+                    # a cached answer would just repeat the duplicate
+                    use_cache=attempt == 0,
+                    candidates=exercise_candidates,
+                    budget=budget,
+                    seen_solutions=generated_solutions,
+                    validation_pool=validation_pool,
+                )
+        except ExerciseGenerationError:
+            with log_lock:
+                dav_tools.messages.warning(f'{title}: Skipping exercise generation for {error.name} due to validation failures.')
+            return failure
+        except BudgetExhaustedError as e:
+            with log_lock:
+                dav_tools.messages.warning(f'{title}: Skipping exercise generation for {error.name}: {e}')
+            return failure
+
+        last_generated_exercise = generated_exercise
+
+        fingerprint = solution_fingerprint(generated_exercise.solutions[0].sql, catalog=dataset.catalog, sql_dialect=sql_dialect)
+        if not generated_solutions.register(fingerprint):
+            tracing.increment('assignment.duplicates', error=error.name)
+            with log_lock:
+                dav_tools.messages.warning(f'{title}: Duplicate solution detected for {error.name} (Attempt {attempt + 1}/{max_unique_attempts}). Regenerating...')
+            continue
+
+        if checkpoint is not None:
+            yield step(checkpoint.save_exercise, None, index, generated_exercise, fingerprint)
+
+        with log_lock:
+            dav_tools.messages.info(f'{title}: Successfully generated.')
+
+        return ExerciseResult(index=index, position=position, error=error, difficulty=difficulty, exercise=generated_exercise)
+
+    if last_generated_exercise is not None:
+        with log_lock:
+            dav_tools.messages.error(f'{title}: Could not generate a UNIQUE exercise for {error.name} after {max_unique_attempts} retries. Skipping.')
+    return failure
+
+
+def _generate_exercise(*args, **kwargs) -> ExerciseResult:
+    '''Run `_exercise_steps` in the current thread.'''
+
+    return run_steps(_exercise_steps(*args, **kwargs))
+
+
+def _assignment_steps(
+        errors: list[tuple[SqlErrors, DifficultyLevel]],
+        *,
+        language: str,
+        shuffle_exercises: bool,
+        checkpoint_dir: str | None,
+        domain: str | None,
+        dataset_str: str | None,
+        sql_dialect: str,
+        budget: Budget,
+        dataset_rows: int | dict[str, int] | None,
+        **dataset_options
+    ) -> Generator[Step, Any, tuple[list[tuple[int, SqlErrors, SqlErrorRequirements, DifficultyLevel]], Checkpoint | None, Dataset]]:
+    '''
+    Prepare the requirements of an assignment, in the order of its checkpoint (if any), and its dataset,
+    restored from the checkpoint or obtained with `_dataset_steps` (which receives `dataset_options`).
+    '''
+
+    requirements = _prepare_requirements(errors, language=language, shuffle_exercises=shuffle_exercises)
+
+    checkpoint = _open_checkpoint(checkpoint_dir, errors, sql_dialect=sql_dialect, language=language, domain=domain, dataset_str=dataset_str, dataset_rows=dataset_rows)
+    if checkpoint is not None:
+        requirements = checkpoint.restore_order(requirements, [index for index, _, _, _ in requirements])
+
+    dataset = checkpoint.load_dataset() if checkpoint is not None else None
+    if dataset is None:
+        dataset = yield from _dataset_steps(
+            requirements,
+            domain=domain,
+            dataset_str=dataset_str,
+            sql_dialect=sql_dialect,
+            language=language,
+            budget=budget,
+            dataset_rows=dataset_rows,
+            **dataset_options
+        )
+        if checkpoint is not None:
+            checkpoint.save_dataset(dataset)
+
+    return requirements, checkpoint, dataset
+
+
+def _split_restored(
+        requirements: list[tuple[int, SqlErrors, SqlErrorRequirements, DifficultyLevel]],
+        completed: dict[int, Exercise]
+    ) -> tuple[list[ExerciseResult], list[tuple[int, int, SqlErrors, SqlErrorRequirements, DifficultyLevel]]]:
+    '''Results of the exercises in `completed` (see `_restore_exercises`), and (position, *requirement) of those still to generate.'''
+
+    restored: list[ExerciseResult] = []
+    pending: list[tuple[int, int, SqlErrors, SqlErrorRequirements, DifficultyLevel]] = []
+    for position, (index, error, requirement, difficulty) in enumerate(requirements):
+        if index in completed:
+            restored.append(ExerciseResult(index=index, position=position, error=error, difficulty=difficulty, exercise=completed[index]))
+        else:
+            pending.append((position, index, error, requirement, difficulty))
+
+    return restored, pending
+
+
+def _shared_schema(stack: ExitStack, dataset: Dataset, *, db_host: str, db_port: int, db_user: str, db_password: str, sql_dialect: str, embedded_db: bool) -> str | None:
+    '''Load `dataset` into a shared schema, dropped when `stack` is closed. None if it cannot be loaded.'''
+
+    try:
+        return stack.enter_context(dataset.materialize(
+            db_host=db_host,
+            db_port=db_port,
+            db_user=db_user,
+            db_password=db_password,
+            sql_dialect=sql_dialect,
+            embedded_db=embedded_db
+        ))
+    except QueryExecutionError as e:
+        dav_tools.messages.warning(f'Could not load the dataset into a shared schema, it will be loaded on each exercise attempt: {e}')
+        return None
+
+
+def _validation_pool(stack: ExitStack, processes: int | None) -> Executor | None:
+    '''A pool of `processes` processes for validating candidate solutions, shut down when `stack` is closed. None if `processes` is None.'''
+
+    if processes is None:
+        return None
+
+    # 'fork' is unsafe once threads (and database connections) exist
+    return stack.enter_context(ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn')))
+
+
+def _open_checkpoint(
+        checkpoint_dir: str | None,
+        errors: list[tuple[SqlErrors, DifficultyLevel]],
+        *,
+        sql_dialect: str,
+        language: str,
+        domain: str | None,
+        dataset_str: str | None,
+        dataset_rows: int | dict[str, int] | None
+    ) -> Checkpoint | None:
+    '''Open the checkpoint of the requested assignment in `checkpoint_dir`, if any.'''
+
+    if checkpoint_dir is None:
+        return None
+
+    return Checkpoint(checkpoint_dir, {
+        'errors': [[error.name, difficulty.name] for error, difficulty in errors],
+        'sql_dialect': sql_dialect,
+        'language': language,
+        'domain': domain,
+        'dataset_str': dataset_str,
+        'dataset_rows': dataset_rows,
+    })
+
+
+def _restore_exercises(checkpoint: Checkpoint | None, dataset: Dataset, generated_solutions: SolutionRegistry) -> dict[int, Exercise]:
+    '''Exercises completed by a previous run, by error index. Their solutions are added to `generated_solutions`.'''
+
+    if checkpoint is None:
+        return {}
+
+    generated_solutions.update(checkpoint.load_solutions())
+    completed = checkpoint.load_exercises(dataset.catalog)
+    if completed:
+        dav_tools.messages.info(f'Resuming from checkpoint: {len(completed)} exercises already generated')
+
+    return completed
+
+
+def _prepare_requirements(
+        errors: list[tuple[SqlErrors, DifficultyLevel]],
+        *,
+        language: str,
+        shuffle_exercises: bool
+    ) -> list[tuple[int, SqlErrors, SqlErrorRequirements, DifficultyLevel]]:
+    '''
+    Filter out unsupported errors and convert the remaining ones to their requirements, keeping difficulty levels
+    and the index of each error in `errors`.
+    '''
+
+    # filter only supported errors
+    supported_errors: list[tuple[int, SqlErrors, DifficultyLevel]] = []
+    for index, (error, difficulty) in enumerate(errors):
+        if error in ERROR_REQUIREMENTS_MAP:
+            supported_errors.append((index, error, difficulty))
+        else:
+            dav_tools.messages.warning(f'Skipping unsupported error: {error.name}')
+
+    if not supported_errors:
+        raise ValueError('No supported errors provided for assignment generation.')
+
+    if shuffle_exercises:
+        random.shuffle(supported_errors)
+
+
+    dav_tools.messages.info(f'Starting assignment generation for {len(supported_errors)} exercises (out of {len(errors)} requested)')
+
+    # convert SqlErrors -> SqlErrorRequirements, keeping difficulty levels
+    return [
+        (
+            index,
+            error,
+            ERROR_REQUIREMENTS_MAP[error](language=language),
+            difficulty
+        )
+        for index, error, difficulty in supported_errors
+    ]
+
+
+def _dataset_requirements(
+        requirements: list[tuple[int, SqlErrors, SqlErrorRequirements, DifficultyLevel]],
+        *,
+        language: str
+    ) -> tuple[list[SchemaConstraint], list[str]]:
+    '''Collect the schema constraints and extra details the dataset must satisfy for all exercises.'''
+
+    dataset_requirements: list[SchemaConstraint] = []
+    for _, _, req, difficulty in requirements:
+        dataset_requirements.extend(req.dataset_constraints(difficulty))
+
+    dataset_extra_details: list[str] = [
+        req.dataset_extra_details().get(language=language)
+        for _, _, req, _ in requirements
+    ]
+    dataset_extra_details = [detail for detail in dataset_extra_details if detail.strip()]  # filter out empty details
+    dataset_extra_details = list(set(dataset_extra_details))  # deduplicate details
+
+    return dataset_requirements, dataset_extra_details
+
+
+def _dataset_groups(batch_specs: list[AssignmentSpec], *, share_datasets: bool) -> list[list[int]]:
+    '''Indices of the specs sharing each dataset: those with the same domain and dataset string, if `share_datasets`.'''
+
+    if not share_datasets:
+        return [[spec_index] for spec_index in range(len(batch_specs))]
+
+    groups: dict[tuple[str | None, str | None], list[int]] = {}
+    for spec_index, spec in enumerate(batch_specs):
+        groups.setdefault((spec.domain, spec.dataset_str or None), []).append(spec_index)
+
+    return list(groups.values())
+
+
+def _log_summary(*, requested: int, supported: int, generated: int) -> None:
+    if generated < supported:
+        dav_tools.messages.warning(f'Finished generating exercises with some failures. Generated: {generated}. Unsupported: {requested - supported}. Failed: {supported - generated}.')
+    else:
+        dav_tools.messages.success(f'Successfully generated all {generated} exercises. Unsupported: {requested - supported}.')
@@ -1,5 +1,8 @@
 '''Interaction with LLMs'''
 
-from .chatgpt import generate_answer
+from .chatgpt import generate_answer, generate_answer_async, generate_answers, generate_answers_async
 from .message import Message
+from .cache import ResponseCache, get_cache, set_cache, deferring_writes
+from .ratelimit import RateLimiter, AdaptiveConcurrency, get_limiter, set_limiter
+from .usage import Usage, ModelUsage, tracking_usage
 from . import models
\ No newline at end of file
@@ -0,0 +1,212 @@
+'''On-disk cache for LLM responses, keyed by a hash of the whole request.'''
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pydantic import BaseModel
+from typing import Any
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from ..environment import load_environment
+
+
+class ResponseCache:
+    '''
+    Content-addressed cache of LLM responses, stored in a SQLite file.
+
+    Entries older than `ttl` seconds are ignored and removed. When the total size of the stored responses
+    exceeds `max_bytes`, the least recently used entries are evicted.
+    '''
+
+    def __init__(self, path: str, *, ttl: float | None = None, max_bytes: int | None = None) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+
+    @staticmethod
+    def key(*, model: str, messages: list[dict], json_format: type[BaseModel], **kwargs: Any) -> str:
+        '''Hash identifying a request: the same model, messages, response schema and parameters give the same key.'''
+
+        request = {
+            'model': model,
+            'messages': messages,
+            'schema': json_format.model_json_schema(),
+            'kwargs': kwargs,
+        }
+        encoded = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        '''Return the cached response content, or None if missing or expired.'''
+
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute('SELECT content, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+
+            content, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+                return None
+
+            self._connection.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            return content
+
+    def put(self, key: str, content: str) -> None:
+        '''Store a response, evicting expired and least recently used entries if needed.'''
+
+        now = time.time()
+        size = len(content.encode('utf-8'))
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO responses (key, content, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+                (key, content, size, now, now)
+            )
+            self._evict(now)
+
+    def clear(self) -> None:
+        '''Remove all entries.'''
+        with self._lock:
+            self._connection.execute('DELETE FROM responses')
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _evict(self, now: float) -> None:
+        '''Must be called while holding the lock.'''
+
+        if self.ttl is not None:
+            self._connection.execute('DELETE FROM responses WHERE created_at < ?', (now - self.ttl,))
+
+        if self.max_bytes is None:
+            return
+
+        total, = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        keys = []
+        for key, size in self._connection.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+            keys.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._connection.executemany('DELETE FROM responses WHERE key = ?', keys)
+
+
+_cache: ResponseCache | None = None
+_cache_configured = False
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache | None:
+    '''
+    Return the response cache used by `generate_answer`, or None if caching is disabled.
+
+    Unless `set_cache` was called, the cache is configured from environment variables:
+    `SQL_GENERATION_LLM_CACHE` (path of the cache file; caching is disabled if unset),
+    `SQL_GENERATION_LLM_CACHE_TTL` (seconds) and `SQL_GENERATION_LLM_CACHE_MAX_BYTES`.
+    '''
+
+    global _cache, _cache_configured
+
+    with _cache_lock:
+        if not _cache_configured:
+            load_environment()
+            path = os.getenv('SQL_GENERATION_LLM_CACHE')
+            if path:
+                ttl = os.getenv('SQL_GENERATION_LLM_CACHE_TTL')
+                max_bytes = os.getenv('SQL_GENERATION_LLM_CACHE_MAX_BYTES')
+                _cache = ResponseCache(
+                    path,
+                    ttl=float(ttl) if ttl else None,
+                    max_bytes=int(max_bytes) if max_bytes else None,
+                )
+            _cache_configured = True
+
+        return _cache
+
+
+def set_cache(cache: ResponseCache | None) -> None:
+    '''Use `cache` for all subsequent LLM requests. Passing None disables caching.'''
+
+    global _cache, _cache_configured
+
+    with _cache_lock:
+        _cache = cache
+        _cache_configured = True
+
+
+class PendingWrites:
+    '''Responses received within `deferring_writes`, which are stored in the cache only when `commit` is called. Thread-safe.'''
+
+    def __init__(self) -> None:
+        self._entries: list[tuple[ResponseCache, str, str]] = []
+        self._lock = threading.Lock()
+
+    def add(self, cache: ResponseCache, key: str, content: str) -> None:
+        with self._lock:
+            self._entries.append((cache, key, content))
+
+    def commit(self) -> None:
+        '''Store the responses received so far.'''
+
+        with self._lock:
+            entries, self._entries = self._entries, []
+
+        for cache, key, content in entries:
+            cache.put(key, content)
+
+
+_pending: ContextVar[PendingWrites | None] = ContextVar('sql_assignment_generator_pending_cache_writes', default=None)
+
+
+@contextmanager
+def deferring_writes() -> Iterator[PendingWrites]:
+    '''
+    Hold back the responses received within the context, including those received by threads and asyncio tasks started from it
+    with a copy of the current context. They are stored only if `commit` is called, e.g. once the answer has been validated:
+    responses not committed when the context exits are dropped, so that rejected answers are not replayed from the cache.
+    '''
+
+    pending = PendingWrites()
+    token = _pending.set(pending)
+    try:
+        yield pending
+    finally:
+        _pending.reset(token)
+
+
+def store(cache: ResponseCache, key: str, content: str) -> None:
+    '''Store a response in `cache`, or hold it back if within `deferring_writes`.'''
+
+    pending = _pending.get()
+    if pending is None:
+        cache.put(key, content)
+    else:
+        pending.add(cache, key, content)
@@ -1,38 +1,341 @@
-from openai import OpenAI
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
 from pydantic import BaseModel
 from .message import Message
+from .cache import get_cache, store
+from .ratelimit import Permit, RateLimiter, get_limiter
+from .usage import record_request, record_cached_response
+from .. import tracing
+from ..environment import load_environment
+from ..exceptions import LLMRequestError
 
-from dotenv import load_dotenv
+if TYPE_CHECKING:
+    from openai import OpenAI, AsyncOpenAI
 
-load_dotenv()
-client = OpenAI()
+# the clients are created on first use: importing `openai` is slow, and creating a client fails without an API key
+_client: OpenAI | None = None
+_async_client: AsyncOpenAI | None = None
+_client_lock = threading.Lock()
 
-def generate_answer(message: Message, *, model: str, json_format: type[BaseModel], add_to_messages: bool = True, **kwargs) -> BaseModel:
-    '''
-    Generate an answer from the LLM using the provided message and tools.
-    '''
+def _get_client() -> OpenAI:
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            from openai import OpenAI
+
+            load_environment()
+            # retries are handled by `_create`, which also accounts for them in the rate limiter
+            _client = OpenAI(max_retries=0)
+        return _client
+
+def _get_async_client() -> AsyncOpenAI:
+    global _async_client
+
+    with _client_lock:
+        if _async_client is None:
+            from openai import AsyncOpenAI
+
+            load_environment()
+            _async_client = AsyncOpenAI(max_retries=0)
+        return _async_client
+
+_BACKOFF_BASE = 0.5
+'''Seconds of the first backoff before retrying a failed request. Each retry doubles it.'''
+
+_BACKOFF_MAX = 30.0
+'''Maximum seconds of a single backoff.'''
+
+def _response_format(json_format: type[BaseModel]) -> dict:
+    '''Build the `response_format` argument requiring the LLM to answer with the given JSON model.'''
 
     schema = json_format.model_json_schema()
     schema['additionalProperties'] = False      # Required for strict validation
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=message.messages,
-        response_format={
-            'type': 'json_schema',
-            'json_schema': {
-                'name': 'Response',
-                'strict': True,
-                'schema': schema,
-            },
+    return {
+        'type': 'json_schema',
+        'json_schema': {
+            'name': 'Response',
+            'strict': True,
+            'schema': schema,
         },
-        **kwargs
+    }
+
+def _cache_lookup(message: Message, *, model: str, json_format: type[BaseModel], use_cache: bool, **kwargs) -> tuple[str | None, str | None]:
+    '''Return the cache key for the request (None if caching is disabled) and the cached content, if any.'''
+
+    cache = get_cache() if use_cache else None
+    if cache is None:
+        return None, None
+
+    key = cache.key(model=model, messages=message.messages, json_format=json_format, **kwargs)
+    return key, cache.get(key)
+
+def _prompt_cache_key(message: Message) -> str | None:
+    '''
+    Key routing requests that start with the same message to the same provider-side prompt cache.
+    Callers should put the content shared by many requests (e.g. the dataset) in the first message.
+    '''
+
+    if not message.messages:
+        return None
+    return hashlib.sha256(message.messages[0]['content'].encode('utf-8')).hexdigest()[:32]
+
+def _estimate_tokens(message: Message) -> int:
+    '''Rough number of input tokens of a request, reserved in the rate limiter until the actual usage is known.'''
+
+    return sum(len(m['content']) for m in message.messages) // 4 + 1
+
+def _retry_delay(error: Exception, retry: int) -> float | None:
+    '''
+    Seconds to wait before retrying a request that failed with `error`, or None if it should not be retried.
+    Only throttled requests, server errors and connection failures are retried, after the delay requested by the server
+    or after an exponential backoff with full jitter.
+    '''
+
+    import openai
+
+    if isinstance(error, openai.APIStatusError):
+        if not isinstance(error, openai.RateLimitError) and error.status_code < 500:
+            return None
+
+        retry_after = error.response.headers.get('retry-after')
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), _BACKOFF_MAX)
+        except ValueError:
+            pass
+    elif not isinstance(error, openai.APIConnectionError):
+        return None
+
+    return random.uniform(0, min(_BACKOFF_MAX, _BACKOFF_BASE * 2 ** retry))
+
+def _max_retries() -> int:
+    return int(os.getenv('SQL_GENERATION_LLM_MAX_RETRIES', '5'))
+
+def _is_api_error(error: Exception) -> bool:
+    import openai
+
+    return isinstance(error, openai.APIError)
+
+def _release(limiter: RateLimiter | None, permit: Permit | None, *, error: Exception | None = None, response=None) -> None:
+    '''
+    Record the outcome of a request in the rate limiter.
+    If neither `error` nor `response` is given, the outcome is unknown (e.g. the request was cancelled) and only the permit is freed.
+    '''
+
+    if limiter is None or permit is None:
+        return
+
+    if error is None and response is None:
+        limiter.release(permit, throttled=None)
+        return
+
+    import openai
+
+    usage = getattr(response, 'usage', None)
+    limiter.release(
+        permit,
+        throttled=isinstance(error, openai.RateLimitError),
+        tokens=usage.total_tokens if usage is not None else None
     )
 
-    msg = response.choices[0].message
+def _create(message: Message, *, model: str, **kwargs):
+    '''
+    Send a chat completion request, waiting for the rate limiter (see `ratelimit.get_limiter`) if configured.
+    Throttled requests and transient failures are retried up to `SQL_GENERATION_LLM_MAX_RETRIES` times (5 by default),
+    so that they do not count as failed attempts of the callers.
+
+    Raises:
+        LLMRequestError: If the API rejects the request, or it still fails after all retries.
+    '''
+
+    max_retries = _max_retries()
+    limiter = get_limiter()
+
+    for retry in range(max_retries + 1):
+        permit = limiter.acquire(model, _estimate_tokens(message)) if limiter is not None else None
+        response = error = None
+        try:
+            response = _get_client().chat.completions.create(model=model, messages=message.messages, **kwargs)
+        except Exception as e:
+            error = e
+        finally:
+            # also when cancelled, in which case the outcome is unknown
+            _release(limiter, permit, error=error, response=response)
+
+        if error is None:
+            return response
+
+        delay = _retry_delay(error, retry)
+        if delay is None or retry == max_retries:
+            if _is_api_error(error):
+                raise LLMRequestError(f'Request to {model} failed after {retry + 1} attempts: {error}') from error
+            raise error
+
+        tracing.increment('llm.retries', model=model, exception=type(error).__name__)
+        time.sleep(delay)
+
+async def _acreate(message: Message, *, model: str, **kwargs):
+    '''Asynchronous version of `_create`.'''
+
+    max_retries = _max_retries()
+    limiter = get_limiter()
+
+    for retry in range(max_retries + 1):
+        permit = await limiter.aacquire(model, _estimate_tokens(message)) if limiter is not None else None
+        response = error = None
+        try:
+            response = await _get_async_client().chat.completions.create(model=model, messages=message.messages, **kwargs)
+        except Exception as e:
+            error = e
+        finally:
+            # also when cancelled, in which case the outcome is unknown
+            _release(limiter, permit, error=error, response=response)
+
+        if error is None:
+            return response
+
+        delay = _retry_delay(error, retry)
+        if delay is None or retry == max_retries:
+            if _is_api_error(error):
+                raise LLMRequestError(f'Request to {model} failed after {retry + 1} attempts: {error}') from error
+            raise error
+
+        tracing.increment('llm.retries', model=model, exception=type(error).__name__)
+        await asyncio.sleep(delay)
+
+def _record_usage(response, *, model: str) -> None:
+    '''Count the tokens used by a request (zero if the API did not report them).'''
+
+    usage = getattr(response, 'usage', None)
+    prompt_tokens = usage.prompt_tokens if usage is not None else 0
+    completion_tokens = usage.completion_tokens if usage is not None else 0
+
+    details = getattr(usage, 'prompt_tokens_details', None)
+    cached_tokens = (details.cached_tokens or 0) if details is not None else 0
+
+    record_request(model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cached_tokens=cached_tokens)
+    tracing.increment('llm.tokens_in', prompt_tokens, model=model)
+    tracing.increment('llm.tokens_out', completion_tokens, model=model)
+    tracing.increment('llm.tokens_cached', cached_tokens, model=model)
+
+def _record_cache_hit(*, model: str, json_format: type[BaseModel]) -> None:
+    record_cached_response()
+    tracing.increment('llm.cache_hits', model=model, json_format=json_format.__name__)
+
+def _finalize(message: Message, content: str, *, json_format: type[BaseModel], add_to_messages: bool, cache_key: str | None, from_cache: bool) -> BaseModel:
+    answer = json_format.model_validate_json(content)
+
+    # only cache answers that are valid for the requested format
+    if cache_key is not None and not from_cache:
+        store(get_cache(), cache_key, content)
 
     if add_to_messages:
-        message.add_message_assistant(msg.content)
+        message.add_message_assistant(content)
+
+    return answer
+
+def generate_answer(message: Message, *, model: str, json_format: type[BaseModel], add_to_messages: bool = True, use_cache: bool = True, **kwargs) -> BaseModel:
+    '''
+    Generate an answer from the LLM using the provided message and tools.
+    If a response cache is configured (see `cache.get_cache`) and `use_cache` is True, identical requests are answered from the cache.
+    '''
+
+    cache_key, content = _cache_lookup(message, model=model, json_format=json_format, use_cache=use_cache, **kwargs)
+    from_cache = content is not None
+
+    if from_cache:
+        _record_cache_hit(model=model, json_format=json_format)
+    else:
+        kwargs.setdefault('prompt_cache_key', _prompt_cache_key(message))
+        with tracing.span('llm.request', model=model, json_format=json_format.__name__):
+            response = _create(message, model=model, response_format=_response_format(json_format), **kwargs)
+        _record_usage(response, model=model)
+        content = response.choices[0].message.content
+
+    return _finalize(message, content, json_format=json_format, add_to_messages=add_to_messages, cache_key=cache_key, from_cache=from_cache)
+
+async def generate_answer_async(message: Message, *, model: str, json_format: type[BaseModel], add_to_messages: bool = True, use_cache: bool = True, **kwargs) -> BaseModel:
+    '''
+    Asynchronous version of `generate_answer`, which does not block a thread while waiting for the LLM.
+    '''
+
+    cache_key, content = _cache_lookup(message, model=model, json_format=json_format, use_cache=use_cache, **kwargs)
+    from_cache = content is not None
+
+    if from_cache:
+        _record_cache_hit(model=model, json_format=json_format)
+    else:
+        kwargs.setdefault('prompt_cache_key', _prompt_cache_key(message))
+        with tracing.span('llm.request', model=model, json_format=json_format.__name__):
+            response = await _acreate(message, model=model, response_format=_response_format(json_format), **kwargs)
+        _record_usage(response, model=model)
+        content = response.choices[0].message.content
+
+    return _finalize(message, content, json_format=json_format, add_to_messages=add_to_messages, cache_key=cache_key, from_cache=from_cache)
+
+def _finalize_choices(contents: list[str], *, json_format: type[BaseModel], cache_key: str | None, from_cache: bool) -> list[BaseModel]:
+    answers = []
+    valid_contents = []
+    error = None
+    for content in contents:
+        try:
+            answers.append(json_format.model_validate_json(content))
+            valid_contents.append(content)
+        except ValueError as e:
+            error = e
+
+    if not answers:
+        assert error is not None
+        raise error
+
+    if cache_key is not None and not from_cache:
+        store(get_cache(), cache_key, json.dumps(valid_contents))
+
+    return answers
+
+def generate_answers(message: Message, *, model: str, json_format: type[BaseModel], n: int, use_cache: bool = True, **kwargs) -> list[BaseModel]:
+    '''
+    Generate `n` alternative answers to the same conversation with a single request.
+    Answers that do not match `json_format` are dropped. Answers are not added to `message`.
+    '''
+
+    cache_key, cached = _cache_lookup(message, model=model, json_format=json_format, use_cache=use_cache, n=n, **kwargs)
+    if cached is not None:
+        _record_cache_hit(model=model, json_format=json_format)
+        return _finalize_choices(json.loads(cached), json_format=json_format, cache_key=cache_key, from_cache=True)
+
+    kwargs.setdefault('prompt_cache_key', _prompt_cache_key(message))
+    with tracing.span('llm.request', model=model, json_format=json_format.__name__, n=n):
+        response = _create(message, model=model, response_format=_response_format(json_format), n=n, **kwargs)
+    _record_usage(response, model=model)
+    contents = [choice.message.content for choice in response.choices]
+
+    return _finalize_choices(contents, json_format=json_format, cache_key=cache_key, from_cache=False)
+
+async def generate_answers_async(message: Message, *, model: str, json_format: type[BaseModel], n: int, use_cache: bool = True, **kwargs) -> list[BaseModel]:
+    '''
+    Asynchronous version of `generate_answers`.
+    '''
+
+    cache_key, cached = _cache_lookup(message, model=model, json_format=json_format, use_cache=use_cache, n=n, **kwargs)
+    if cached is not None:
+        _record_cache_hit(model=model, json_format=json_format)
+        return _finalize_choices(json.loads(cached), json_format=json_format, cache_key=cache_key, from_cache=True)
+
+    kwargs.setdefault('prompt_cache_key', _prompt_cache_key(message))
+    with tracing.span('llm.request', model=model, json_format=json_format.__name__, n=n):
+        response = await _acreate(message, model=model, response_format=_response_format(json_format), n=n, **kwargs)
+    _record_usage(response, model=model)
+    contents = [choice.message.content for choice in response.choices]
 
-    return json_format.model_validate_json(msg.content)
-        
\ No newline at end of file
+    return _finalize_choices(contents, json_format=json_format, cache_key=cache_key, from_cache=False)
@@ -7,29 +7,41 @@ class MessageRole:
     TOOL = 'tool'
 
 class Message:
-    def __init__(self) -> None:
+    def __init__(self, *, max_history: int | None = None) -> None:
+        '''
+        If `max_history` is set, only the last `max_history` turns are kept, where a turn is an assistant message
+        together with the messages following it (e.g. feedback on a rejected answer).
+        Messages preceding the first assistant message (the initial prompt) are always kept.
+        '''
+
+        if max_history is not None and max_history < 1:
+            raise ValueError('max_history must be at least 1.')
+
         self.messages = []
+        self.max_history = max_history
+        self.omitted_turns = 0
+        '''Number of turns removed from the history so far.'''
 
     def add_message_user(self, message: str):
-        self.messages.append({
+        self.append({
             'role': MessageRole.USER,
             'content': message
         })
 
     def add_message_assistant(self, message: str):
-        self.messages.append({
+        self.append({
             'role': MessageRole.ASSISTANT,
             'content': message
         })
 
     def add_message_system(self, message: str):
-        self.messages.append({
+        self.append({
             'role': MessageRole.SYSTEM,
             'content': message
         })
 
     def add_message_tool(self, call_id: int, message: str):
-        self.messages.append({
+        self.append({
             'role': MessageRole.TOOL,
             'tool_call_id': call_id,
             'content': message
@@ -38,6 +50,22 @@ class Message:
     def append(self, message: dict):
         self.messages.append(message)
 
+        if self.max_history is not None and message['role'] == MessageRole.ASSISTANT:
+            self._compact(self.max_history)
+
+    def _compact(self, max_turns: int):
+        '''Remove the oldest turns, keeping the initial prompt and the last `max_turns` turns.'''
+
+        turn_starts = [idx for idx, msg in enumerate(self.messages) if msg['role'] == MessageRole.ASSISTANT]
+        if len(turn_starts) <= max_turns:
+            return
+
+        prefix_end = turn_starts[0]
+        first_kept = turn_starts[-max_turns]
+
+        self.omitted_turns += len(turn_starts) - max_turns
+        self.messages = self.messages[:prefix_end] + self.messages[first_kept:]
+
 
     def print_chat(self):
         for msg in self.messages:
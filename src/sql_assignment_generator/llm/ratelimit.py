@@ -0,0 +1,319 @@
+'''Client-side rate limiting of LLM requests, and adaptive control of the number of requests in flight.'''
+
+from dataclasses import dataclass
+import asyncio
+import os
+import threading
+import time
+
+from ..environment import load_environment
+
+
+class TokenBucket:
+    '''
+    Bucket refilled continuously at `per_minute` units per minute, holding at most one minute worth of units. Thread-safe.
+
+    Callers reserve units in advance, and the level may go negative: later callers wait until the debt is repaid,
+    so that requests are served in arrival order.
+    '''
+
+    def __init__(self, per_minute: float) -> None:
+        if per_minute <= 0:
+            raise ValueError('The rate of a token bucket must be positive.')
+
+        self.per_minute = per_minute
+        self._level = float(per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        '''Take `amount` units, and return the number of seconds to wait before using them.'''
+
+        # a single reservation larger than the capacity could never be satisfied
+        amount = min(amount, self.per_minute)
+
+        with self._lock:
+            self._refill()
+            self._level -= amount
+            return max(0.0, -self._level) * 60 / self.per_minute
+
+    def adjust(self, amount: float) -> None:
+        '''Take `amount` more units without waiting (or give them back, if negative), e.g. to correct an estimate.'''
+
+        with self._lock:
+            self._refill()
+            self._level = min(self._level - amount, self.per_minute)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.per_minute, self._level + (now - self._updated) * self.per_minute / 60)
+        self._updated = now
+
+
+class AdaptiveConcurrency:
+    '''
+    Limit on the number of requests in flight, adjusted with AIMD (additive increase, multiplicative decrease). Thread-safe.
+
+    Each successful request raises the limit by `1 / limit`, i.e. by about one per round of requests.
+    A throttled request, or one slower than `target_latency` seconds, multiplies the limit by `decrease`.
+    Requests started before the last decrease do not decrease it again, so that a single burst of failures counts once.
+    '''
+
+    def __init__(self, *, initial: int = 4, minimum: int = 1, maximum: int = 64, target_latency: float | None = None, decrease: float = 0.5) -> None:
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError('Concurrency limits must satisfy 1 <= minimum <= initial <= maximum.')
+
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.decrease = decrease
+
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._last_decrease = float('-inf')
+        self._condition = threading.Condition()
+
+        # coroutines waiting for a slot, woken by `release` on their own event loop
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> float:
+        '''Wait for a free slot and take it. Returns the start time to pass to `release`.'''
+
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+            return time.monotonic()
+
+    async def aacquire(self) -> float:
+        '''Asynchronous version of `acquire`, which does not block the event loop while waiting.'''
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+            with self._condition:
+                if self._in_flight < int(self._limit):
+                    self._in_flight += 1
+                    return time.monotonic()
+
+                waiter = (loop, loop.create_future())
+                self._waiters.append(waiter)
+
+            try:
+                await waiter[1]
+            finally:
+                with self._condition:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+    def release(self, started: float, *, throttled: bool | None = False) -> None:
+        '''
+        Free the slot taken at `started`, adjusting the limit based on the outcome of the request.
+        If `throttled` is None, the outcome is unknown (e.g. the request was cancelled) and the limit is left unchanged.
+        '''
+
+        now = time.monotonic()
+
+        with self._condition:
+            self._in_flight -= 1
+
+            if throttled is not None:
+                congested = throttled or (self.target_latency is not None and now - started > self.target_latency)
+                if not congested:
+                    self._limit = min(float(self.maximum), self._limit + 1 / self._limit)
+                elif started >= self._last_decrease:
+                    self._limit = max(float(self.minimum), self._limit * self.decrease)
+                    self._last_decrease = now
+
+            self._condition.notify_all()
+
+            waiters, self._waiters = self._waiters, []
+
+        # every waiter checks again for a free slot, like the threads woken by `notify_all`
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+@dataclass
+class Permit:
+    '''Permission to send a request, obtained from `RateLimiter.acquire`.'''
+
+    model: str
+    tokens: int
+    '''Estimated number of tokens of the request.'''
+
+    started: float | None
+    '''When the concurrency slot was taken, if the concurrency is limited.'''
+
+
+class _ModelLimits:
+    def __init__(self, requests: TokenBucket | None, tokens: TokenBucket | None, concurrency: AdaptiveConcurrency | None) -> None:
+        self.requests = requests
+        self.tokens = tokens
+        self.concurrency = concurrency
+
+
+class RateLimiter:
+    '''
+    Limits on the LLM requests sent to each model: requests per minute, tokens per minute (see `TokenBucket`),
+    and requests in flight (see `AdaptiveConcurrency`). Each model has its own limits. Unset limits are not enforced.
+
+    Since the number of tokens of a request is only known once it completes, requests reserve an estimate,
+    which is corrected by `release`.
+    '''
+
+    def __init__(
+            self,
+            *,
+            requests_per_minute: float | None = None,
+            tokens_per_minute: float | None = None,
+            max_concurrency: int | None = None,
+            initial_concurrency: int | None = None,
+            target_latency: float | None = None
+        ) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.initial_concurrency = initial_concurrency
+        self.target_latency = target_latency
+
+        self._models: dict[str, _ModelLimits] = {}
+        self._lock = threading.Lock()
+
+    def concurrency(self, model: str) -> AdaptiveConcurrency | None:
+        '''The concurrency controller of `model`, if the concurrency is limited.'''
+
+        return self._limits(model).concurrency
+
+    def acquire(self, model: str, tokens: int) -> Permit:
+        '''Wait until a request to `model` of about `tokens` tokens can be sent.'''
+
+        limits = self._limits(model)
+
+        delay = self._reserve(limits, tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+        started = limits.concurrency.acquire() if limits.concurrency is not None else None
+        return Permit(model=model, tokens=tokens, started=started)
+
+    async def aacquire(self, model: str, tokens: int) -> Permit:
+        '''Asynchronous version of `acquire`.'''
+
+        limits = self._limits(model)
+
+        delay = self._reserve(limits, tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        started = await limits.concurrency.aacquire() if limits.concurrency is not None else None
+        return Permit(model=model, tokens=tokens, started=started)
+
+    def release(self, permit: Permit, *, throttled: bool | None = False, tokens: int | None = None) -> None:
+        '''
+        Record the end of the request sent with `permit`.
+
+        Args:
+            throttled (bool | None): Whether the API rejected the request because of its rate limits.
+                None if the outcome of the request is unknown (e.g. it was cancelled).
+            tokens (int | None): The actual number of tokens of the request, if known.
+        '''
+
+        limits = self._limits(permit.model)
+
+        if limits.tokens is not None and tokens is not None:
+            limits.tokens.adjust(tokens - permit.tokens)
+
+        if limits.concurrency is not None and permit.started is not None:
+            limits.concurrency.release(permit.started, throttled=throttled)
+
+    def _limits(self, model: str) -> _ModelLimits:
+        with self._lock:
+            limits = self._models.get(model)
+            if limits is None:
+                concurrency = None
+                if self.max_concurrency is not None:
+                    concurrency = AdaptiveConcurrency(
+                        initial=min(self.initial_concurrency or self.max_concurrency, self.max_concurrency),
+                        maximum=self.max_concurrency,
+                        target_latency=self.target_latency,
+                    )
+
+                limits = _ModelLimits(
+                    requests=TokenBucket(self.requests_per_minute) if self.requests_per_minute else None,
+                    tokens=TokenBucket(self.tokens_per_minute) if self.tokens_per_minute else None,
+                    concurrency=concurrency,
+                )
+                self._models[model] = limits
+            return limits
+
+    @staticmethod
+    def _reserve(limits: _ModelLimits, tokens: int) -> float:
+        '''Reserve a request and its tokens, returning the number of seconds to wait for both.'''
+
+        delay = 0.0
+        if limits.requests is not None:
+            delay = max(delay, limits.requests.reserve(1))
+        if limits.tokens is not None:
+            delay = max(delay, limits.tokens.reserve(tokens))
+        return delay
+
+
+_limiter: RateLimiter | None = None
+_limiter_configured = False
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> RateLimiter | None:
+    '''
+    Return the rate limiter used by `generate_answer`, or None if requests are not limited.
+
+    Unless `set_limiter` was called, the limiter is configured from environment variables (limits apply to each model):
+    `SQL_GENERATION_LLM_RPM` (requests per minute), `SQL_GENERATION_LLM_TPM` (tokens per minute),
+    `SQL_GENERATION_LLM_MAX_CONCURRENCY` (maximum requests in flight, adjusted within this limit)
+    and `SQL_GENERATION_LLM_TARGET_LATENCY` (seconds; slower requests reduce the concurrency).
+    Requests are not limited if none of the first three is set.
+    '''
+
+    global _limiter, _limiter_configured
+
+    with _limiter_lock:
+        if not _limiter_configured:
+            load_environment()
+            requests_per_minute = os.getenv('SQL_GENERATION_LLM_RPM')
+            tokens_per_minute = os.getenv('SQL_GENERATION_LLM_TPM')
+            max_concurrency = os.getenv('SQL_GENERATION_LLM_MAX_CONCURRENCY')
+            if requests_per_minute or tokens_per_minute or max_concurrency:
+                target_latency = os.getenv('SQL_GENERATION_LLM_TARGET_LATENCY')
+                _limiter = RateLimiter(
+                    requests_per_minute=float(requests_per_minute) if requests_per_minute else None,
+                    tokens_per_minute=float(tokens_per_minute) if tokens_per_minute else None,
+                    max_concurrency=int(max_concurrency) if max_concurrency else None,
+                    target_latency=float(target_latency) if target_latency else None,
+                )
+            _limiter_configured = True
+
+        return _limiter
+
+
+def set_limiter(limiter: RateLimiter | None) -> None:
+    '''Use `limiter` for all subsequent LLM requests. Passing None disables rate limiting.'''
+
+    global _limiter, _limiter_configured
+
+    with _limiter_lock:
+        _limiter = limiter
+        _limiter_configured = True
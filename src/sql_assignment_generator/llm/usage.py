@@ -0,0 +1,155 @@
+'''Accounting of the tokens used by LLM requests.'''
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import threading
+
+
+@dataclass
+class ModelUsage:
+    '''Tokens used by the requests to a single model.'''
+
+    requests: int = 0
+    '''Number of requests sent to the API (answers served from the response cache are not counted).'''
+
+    prompt_tokens: int = 0
+    '''Input tokens.'''
+
+    completion_tokens: int = 0
+    '''Output tokens.'''
+
+    cached_tokens: int = 0
+    '''Input tokens served from the provider-side prompt cache (included in `prompt_tokens`).'''
+
+
+@dataclass
+class Usage:
+    '''
+    Tokens used by LLM requests, per model. Thread-safe.
+
+    Use `tracking_usage` to collect the usage of all requests made within a block of code.
+    '''
+
+    models: dict[str, ModelUsage] = field(default_factory=dict)
+    '''Usage of each model, by model name.'''
+
+    cached_responses: int = 0
+    '''Number of answers served from the response cache, which used no tokens.'''
+
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    @property
+    def requests(self) -> int:
+        return sum(model.requests for model in self.models.values())
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(model.prompt_tokens for model in self.models.values())
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(model.completion_tokens for model in self.models.values())
+
+    @property
+    def cached_tokens(self) -> int:
+        return sum(model.cached_tokens for model in self.models.values())
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, model: str, *, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> None:
+        '''Record a request to `model`.'''
+
+        with self._lock:
+            model_usage = self.models.setdefault(model, ModelUsage())
+            model_usage.requests += 1
+            model_usage.prompt_tokens += prompt_tokens
+            model_usage.completion_tokens += completion_tokens
+            model_usage.cached_tokens += cached_tokens
+
+    def add_cached(self) -> None:
+        '''Record an answer served from the response cache.'''
+
+        with self._lock:
+            self.cached_responses += 1
+
+    def merge(self, other: 'Usage') -> None:
+        '''Add the usage recorded in `other` to this one.'''
+
+        with other._lock:
+            models = {name: ModelUsage(m.requests, m.prompt_tokens, m.completion_tokens, m.cached_tokens) for name, m in other.models.items()}
+            cached_responses = other.cached_responses
+
+        with self._lock:
+            for name, other_model in models.items():
+                model_usage = self.models.setdefault(name, ModelUsage())
+                model_usage.requests += other_model.requests
+                model_usage.prompt_tokens += other_model.prompt_tokens
+                model_usage.completion_tokens += other_model.completion_tokens
+                model_usage.cached_tokens += other_model.cached_tokens
+            self.cached_responses += cached_responses
+
+    def cost(self, prices: dict[str, tuple[float, float] | tuple[float, float, float]]) -> float:
+        '''
+        Cost of the recorded usage.
+
+        Args:
+            prices: For each model, the price of one million input tokens and of one million output tokens,
+                optionally followed by the (discounted) price of one million cached input tokens.
+
+        Raises:
+            KeyError: If no price is given for one of the used models.
+        '''
+
+        with self._lock:
+            total = 0.0
+            for name, model_usage in self.models.items():
+                if name not in prices:
+                    raise KeyError(f'No price given for model "{name}".')
+
+                input_price, output_price, *cached_price = prices[name]
+                cached_input_price = cached_price[0] if cached_price else input_price
+
+                total += (model_usage.prompt_tokens - model_usage.cached_tokens) * input_price / 1_000_000
+                total += model_usage.cached_tokens * cached_input_price / 1_000_000
+                total += model_usage.completion_tokens * output_price / 1_000_000
+
+            return total
+
+
+_active: ContextVar[tuple[Usage, ...]] = ContextVar('sql_assignment_generator_usage', default=())
+
+
+@contextmanager
+def tracking_usage(usage: Usage | None = None) -> Iterator[Usage]:
+    '''
+    Record in `usage` (a new `Usage` by default) the tokens of all LLM requests made within the context,
+    including those made by threads and asyncio tasks started from it with a copy of the current context.
+    Contexts can be nested: each request is recorded by all enclosing ones.
+    '''
+
+    if usage is None:
+        usage = Usage()
+
+    token = _active.set(_active.get() + (usage,))
+    try:
+        yield usage
+    finally:
+        _active.reset(token)
+
+
+def record_request(model: str, *, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> None:
+    '''Record a request in all active `tracking_usage` contexts.'''
+
+    for usage in _active.get():
+        usage.add(model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cached_tokens=cached_tokens)
+
+
+def record_cached_response() -> None:
+    '''Record an answer served from the response cache in all active `tracking_usage` contexts.'''
+
+    for usage in _active.get():
+        usage.add_cached()
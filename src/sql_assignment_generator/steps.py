@@ -0,0 +1,71 @@
+'''
+Generation logic shared by the synchronous and asynchronous APIs.
+
+The logic is written once, as a generator that yields a `Step` whenever it needs to call the LLM or the database,
+and receives the result of the step (or has its exception raised at the `yield`).
+`run_steps` executes the steps in the current thread, while `arun_steps` awaits them.
+'''
+
+from collections.abc import Awaitable, Callable, Generator
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+import asyncio
+
+
+T = TypeVar('T')
+
+
+@dataclass
+class Step:
+    '''A blocking call made by the generation logic.'''
+
+    function: Callable[..., Any]
+    '''Called by `run_steps`.'''
+
+    async_function: Callable[..., Awaitable[Any]] | None = None
+    '''Awaited by `arun_steps`. If None, `arun_steps` calls `function` in a worker thread.'''
+
+    args: tuple = ()
+    kwargs: dict[str, Any] = field(default_factory=dict)
+
+
+def step(function: Callable[..., Any], async_function: Callable[..., Awaitable[Any]] | None, /, *args: Any, **kwargs: Any) -> Step:
+    '''Shorthand for creating a `Step`.'''
+
+    return Step(function, async_function, args, kwargs)
+
+
+def run_steps(steps: Generator[Step, Any, T]) -> T:
+    '''Run the generation logic `steps`, executing each step in the current thread. Returns its return value.'''
+
+    try:
+        current = next(steps)
+        while True:
+            try:
+                result = current.function(*current.args, **current.kwargs)
+            except BaseException as e:
+                current = steps.throw(e)
+            else:
+                current = steps.send(result)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def arun_steps(steps: Generator[Step, Any, T]) -> T:
+    '''Asynchronous version of `run_steps`, which awaits each step without blocking the event loop.'''
+
+    try:
+        current = next(steps)
+        while True:
+            try:
+                if current.async_function is not None:
+                    result = await current.async_function(*current.args, **current.kwargs)
+                else:
+                    result = await asyncio.to_thread(current.function, *current.args, **current.kwargs)
+            except BaseException as e:
+                # also when cancelled, so that the generation logic can clean up
+                current = steps.throw(e)
+            else:
+                current = steps.send(result)
+    except StopIteration as stop:
+        return stop.value
@@ -0,0 +1,285 @@
+'''
+Timing and counters for the stages of the generation pipeline.
+
+Instrumented code opens spans (`with tracing.span('stage', ...)`) and increments counters (`tracing.increment(...)`).
+Both are forwarded to the registered collectors: nothing is recorded, and the overhead is negligible, when there are none.
+'''
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+import itertools
+import json
+import os
+import threading
+import time
+
+from .environment import load_environment
+
+
+@dataclass
+class Span:
+    '''A timed stage of the pipeline.'''
+
+    name: str
+    '''Name of the stage, e.g. `exercise.attempt`.'''
+
+    span_id: int
+    '''Identifier of the span, unique within the process.'''
+
+    parent_id: int | None
+    '''Identifier of the enclosing span, if any.'''
+
+    start: float
+    '''Start time, as a UNIX timestamp.'''
+
+    duration: float = 0.0
+    '''Duration, in seconds. Only set once the span has ended.'''
+
+    attributes: dict[str, Any] = field(default_factory=dict)
+    '''Additional information about the stage (e.g. attempt number, outcome).'''
+
+    def set(self, **attributes: Any) -> None:
+        '''Add or update attributes of the span.'''
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        return {
+            'type': 'span',
+            'name': self.name,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start': self.start,
+            'duration': self.duration,
+            'attributes': self.attributes,
+        }
+
+
+class _NoopSpan(Span):
+    '''Span returned when no collector is registered. Attributes are discarded.'''
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan(name='', span_id=0, parent_id=None, start=0.0)
+
+
+class Collector(ABC):
+    '''Receives the spans and counter increments of the pipeline. Must be thread-safe.'''
+
+    @abstractmethod
+    def record_span(self, span: Span) -> None:
+        '''Called when a span ends.'''
+
+    @abstractmethod
+    def record_counter(self, name: str, value: float, span_id: int | None, attributes: dict[str, Any]) -> None:
+        '''Called when a counter is incremented, inside the span identified by `span_id` (if any).'''
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryCollector(Collector):
+    '''Keeps all spans and counter increments in memory, e.g. for inspection in a notebook or in tests.'''
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+        self.counters: list[tuple[str, float, int | None, dict[str, Any]]] = []
+        self._lock = threading.Lock()
+
+    def record_span(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def record_counter(self, name: str, value: float, span_id: int | None, attributes: dict[str, Any]) -> None:
+        with self._lock:
+            self.counters.append((name, value, span_id, attributes))
+
+    def total(self, name: str, **attributes: Any) -> float:
+        '''Sum of the increments of counter `name` whose attributes include the given ones.'''
+
+        with self._lock:
+            return sum(
+                value
+                for counter, value, _, counter_attributes in self.counters
+                if counter == name and all(counter_attributes.get(k) == v for k, v in attributes.items())
+            )
+
+    def durations(self, name: str) -> list[float]:
+        '''Durations of all ended spans called `name`.'''
+
+        with self._lock:
+            return [span.duration for span in self.spans if span.name == name]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+
+
+class JsonLinesCollector(Collector):
+    '''Appends spans and counter increments to a file, one JSON object per line.'''
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _write(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def record_span(self, span: Span) -> None:
+        self._write(span.to_dict())
+
+    def record_counter(self, name: str, value: float, span_id: int | None, attributes: dict[str, Any]) -> None:
+        self._write({
+            'type': 'counter',
+            'name': name,
+            'value': value,
+            'span_id': span_id,
+            'time': time.time(),
+            'attributes': attributes,
+        })
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+_collectors: list[Collector] = []
+_collectors_configured = False
+_collectors_lock = threading.Lock()
+
+_current_span: ContextVar[Span | None] = ContextVar('sql_assignment_generator_span', default=None)
+_span_ids = itertools.count(1)
+
+
+def get_collectors() -> list[Collector]:
+    '''
+    Return the registered collectors.
+
+    Unless collectors were registered explicitly, a `JsonLinesCollector` is registered when the
+    `SQL_GENERATION_TRACE_FILE` environment variable is set to the path of the output file.
+    '''
+
+    global _collectors_configured
+
+    if not _collectors_configured:
+        with _collectors_lock:
+            if not _collectors_configured:
+                load_environment()
+                path = os.getenv('SQL_GENERATION_TRACE_FILE')
+                if path:
+                    _collectors.append(JsonLinesCollector(path))
+                _collectors_configured = True
+
+    return _collectors
+
+
+def add_collector(collector: Collector) -> None:
+    '''Send all subsequent spans and counters to `collector`, in addition to the already registered ones.'''
+
+    global _collectors_configured
+
+    get_collectors()
+    with _collectors_lock:
+        _collectors.append(collector)
+        _collectors_configured = True
+
+
+def remove_collector(collector: Collector) -> None:
+    '''Stop sending spans and counters to `collector`. The collector is not closed.'''
+
+    with _collectors_lock:
+        if collector in _collectors:
+            _collectors.remove(collector)
+
+
+@contextmanager
+def collecting(collector: Collector | None = None) -> Iterator[Collector]:
+    '''Register `collector` (a new `MemoryCollector` by default) for the duration of the context.'''
+
+    if collector is None:
+        collector = MemoryCollector()
+
+    add_collector(collector)
+    try:
+        yield collector
+    finally:
+        remove_collector(collector)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    '''
+    Time the enclosed code as stage `name`.
+    Spans opened inside the context (in the same thread or asyncio task) are recorded as its children.
+    '''
+
+    collectors = get_collectors()
+    if not collectors:
+        yield _NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    current = Span(
+        name=name,
+        span_id=next(_span_ids),
+        parent_id=parent.span_id if parent is not None else None,
+        start=time.time(),
+        attributes=attributes,
+    )
+
+    token = _current_span.set(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.attributes.setdefault('exception', type(e).__name__)
+        raise
+    finally:
+        current.duration = time.perf_counter() - start
+        _current_span.reset(token)
+
+        for collector in list(collectors):
+            collector.record_span(current)
+
+
+def increment(name: str, value: float = 1, **attributes: Any) -> None:
+    '''Increment counter `name` by `value`, within the current span.'''
+
+    collectors = get_collectors()
+    if not collectors:
+        return
+
+    parent = _current_span.get()
+    span_id = parent.span_id if parent is not None else None
+
+    for collector in list(collectors):
+        collector.record_counter(name, value, span_id, attributes)
+
+
+@contextmanager
+def timed(counter: str, **attributes: Any) -> Iterator[None]:
+    '''Increment `counter` by the number of seconds spent in the context.'''
+
+    if not get_collectors():
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        increment(counter, time.perf_counter() - start, **attributes)
@@ -0,0 +1,71 @@
+import time
+from sql_assignment_generator.assignments import Dataset
+from sql_assignment_generator.assignments.dataset.library import DatasetLibrary, constraints_signature
+from sql_assignment_generator.constraints.schema.tables import MinTables, MaxColumns
+from sql_assignment_generator.constraints.schema.values import MinRows
+
+
+def _dataset(tables: int = 2, rows: int = 3, domain: str = 'library') -> Dataset:
+    return Dataset(
+        create_commands=[f'CREATE TABLE t{i} (id INT PRIMARY KEY, name VARCHAR(20));' for i in range(tables)],
+        insert_commands=[
+            f'INSERT INTO t{i} (id, name) VALUES ' + ', '.join(f"({j}, 'n{j}')" for j in range(rows)) + ';'
+            for i in range(tables)
+        ],
+        domain=domain,
+    )
+
+
+def test_signature_ignores_order_and_merges():
+    assert constraints_signature([MinRows(3), MinTables(2)]) == constraints_signature([MinTables(2), MinRows(3)])
+    assert constraints_signature([MinRows(3), MinRows(5)]) == constraints_signature([MinRows(5)])
+    assert constraints_signature([MinRows(3)]) != constraints_signature([MinRows(5)])
+
+
+def test_dict_roundtrip():
+    dataset = _dataset().amplify(10, sql_dialect='postgres')
+    assert Dataset.from_dict(dataset.to_dict()).to_dict() == dataset.to_dict()
+
+
+def test_find_reuses_datasets_satisfying_constraints(tmp_path):
+    library = DatasetLibrary(str(tmp_path / 'library.sqlite'))
+    library.add(_dataset(tables=2, rows=3), sql_dialect='postgres', constraints=[MinRows(3)])
+
+    # same constraints, or weaker ones, are satisfied by the stored dataset
+    assert library.find('library', 'postgres', [MinRows(3)]).to_dict() == _dataset(tables=2, rows=3).to_dict()
+    assert library.find('library', 'postgres', [MinRows(2), MaxColumns(2)]) is not None
+    assert library.find(None, 'postgres', [MinTables(2)]) is not None
+
+    # stricter constraints, other domains and other dialects are not
+    assert library.find('library', 'postgres', [MinRows(5)]) is None
+    assert library.find('library', 'postgres', [MinTables(3)]) is None
+    assert library.find('shop', 'postgres', [MinRows(3)]) is None
+    assert library.find('library', 'mysql', [MinRows(3)]) is None
+
+
+def test_find_requires_extra_details(tmp_path):
+    library = DatasetLibrary(str(tmp_path / 'library.sqlite'))
+    library.add(_dataset(), sql_dialect='postgres', constraints=[], extra_details=['use snake_case names'])
+
+    assert library.find('library', 'postgres', [], ['use snake_case names']) is not None
+    assert library.find('library', 'postgres', []) is not None
+    assert library.find('library', 'postgres', [], ['include a self-referencing table']) is None
+
+
+def test_persists_and_evicts_least_recently_used(tmp_path):
+    path = str(tmp_path / 'library.sqlite')
+    library = DatasetLibrary(path, max_entries=2)
+    library.add(_dataset(domain='a'), sql_dialect='postgres', constraints=[])
+    time.sleep(0.01)
+    library.add(_dataset(domain='b'), sql_dialect='postgres', constraints=[])
+    time.sleep(0.01)
+    library.find('a', 'postgres', [])     # 'b' is now the least recently used
+    time.sleep(0.01)
+    library.add(_dataset(domain='c'), sql_dialect='postgres', constraints=[])
+    library.close()
+
+    reopened = DatasetLibrary(path, max_entries=2)
+    assert len(reopened) == 2
+    assert reopened.find('a', 'postgres', []) is not None
+    assert reopened.find('b', 'postgres', []) is None
+    assert reopened.find('c', 'postgres', []) is not None
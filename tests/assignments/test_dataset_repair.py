@@ -0,0 +1,118 @@
+from sql_assignment_generator import llm
+from sql_assignment_generator.assignments import Dataset
+from sql_assignment_generator.constraints.schema import tables, values
+
+
+CUSTOMERS = 'CREATE TABLE customers (id INT PRIMARY KEY, name VARCHAR);'
+ORDERS = 'CREATE TABLE orders (id INT PRIMARY KEY, customer_id INT REFERENCES customers(id));'
+CUSTOMERS_ROWS = "INSERT INTO customers (id, name) VALUES (1, 'a'), (2, 'b'), (3, 'c');"
+
+
+def scripted_llm(monkeypatch, answers: list[dict]) -> list[llm.Message]:
+    '''Answer dataset requests with `answers`, in order, and return the conversations sent to the LLM.'''
+
+    conversations = []
+
+    def generate_answer(messages, *, json_format, **kwargs):
+        conversations.append([msg['content'] for msg in messages.messages])
+        answer = json_format.model_validate(answers[len(conversations) - 1])
+        messages.add_message_assistant(answer.model_dump_json())
+        return answer
+
+    monkeypatch.setattr(llm, 'generate_answer', generate_answer)
+    return conversations
+
+
+def generate(constraints, max_attempts: int = 3) -> Dataset:
+    return Dataset.generate(
+        'shop', 'postgres', constraints,
+        db_host='', db_port=0, db_user='', db_password='',
+        language='en', max_attempts=max_attempts, embedded_db=True,
+    )
+
+
+def test_only_failing_tables_are_regenerated(monkeypatch):
+    conversations = scripted_llm(monkeypatch, [
+        {
+            'schema_tables': [CUSTOMERS, ORDERS],
+            'insert_commands': [CUSTOMERS_ROWS, 'INSERT INTO orders (id, customer_id) VALUES (1, 1);'],
+        },
+        {
+            'schema_tables': [ORDERS],
+            'insert_commands': ['INSERT INTO orders (id, customer_id) VALUES (1, 1), (2, 1), (3, 2);'],
+        },
+    ])
+
+    dataset = generate([values.MinRows(3)])
+
+    assert len(conversations) == 2
+    assert '"orders"' in conversations[1][-1]
+    assert '"customers"' not in conversations[1][-1]
+    assert 'CREATE TABLE customers' in conversations[1][-1]
+
+    assert [command.split('(')[0].split()[-1] for command in dataset.create_commands] == ['customers', 'orders']
+    assert len(dataset.insert_commands) == 2
+    assert "'c'" in dataset.insert_commands[0]
+    assert '(3, 2)' in dataset.insert_commands[1]
+    assert set(dataset.catalog['public'].table_names) == {'customers', 'orders'}
+
+
+def test_repairs_show_kept_tables_after_history_compaction(monkeypatch):
+    few_orders = {'schema_tables': [ORDERS], 'insert_commands': ['INSERT INTO orders (id, customer_id) VALUES (1, 1);']}
+    conversations = scripted_llm(monkeypatch, [
+        {
+            'schema_tables': [CUSTOMERS, ORDERS],
+            'insert_commands': [CUSTOMERS_ROWS, 'INSERT INTO orders (id, customer_id) VALUES (1, 1);'],
+        },
+        few_orders,
+        few_orders,
+        {'schema_tables': [ORDERS], 'insert_commands': ['INSERT INTO orders (id, customer_id) VALUES (1, 1), (2, 1), (3, 2);']},
+    ])
+    monkeypatch.setenv('SQL_GENERATION_LLM_MAX_HISTORY', '2')
+
+    generate([values.MinRows(3)], max_attempts=4)
+
+    # the answer with the complete dataset is no longer in the history, but the kept table is still shown
+    last = conversations[-1]
+    assert not any(CUSTOMERS_ROWS in message for message in last)
+    assert 'CREATE TABLE customers' in last[-1]
+
+
+def test_schema_wide_violations_regenerate_everything(monkeypatch):
+    conversations = scripted_llm(monkeypatch, [
+        {
+            'schema_tables': [CUSTOMERS],
+            'insert_commands': [CUSTOMERS_ROWS],
+        },
+        {
+            'schema_tables': [CUSTOMERS, ORDERS],
+            'insert_commands': [CUSTOMERS_ROWS, 'INSERT INTO orders (id, customer_id) VALUES (1, 1);'],
+        },
+    ])
+
+    dataset = generate([tables.MinTables(2)])
+
+    assert 'Regenerate ONLY' not in conversations[1][-1]
+    assert len(dataset.create_commands) == 2
+
+
+def test_failed_repair_falls_back_to_complete_dataset(monkeypatch):
+    conversations = scripted_llm(monkeypatch, [
+        {
+            'schema_tables': [CUSTOMERS, ORDERS],
+            'insert_commands': [CUSTOMERS_ROWS, 'INSERT INTO orders (id, customer_id) VALUES (1, 1);'],
+        },
+        {
+            'schema_tables': ['CREATE TABLE orders (id INT PRIMARY KEY, customer_id INT REFERENCES missing(id);'],
+            'insert_commands': [],
+        },
+        {
+            'schema_tables': [CUSTOMERS],
+            'insert_commands': [CUSTOMERS_ROWS],
+        },
+    ])
+
+    dataset = generate([values.MinRows(3)])
+
+    assert 'complete dataset' in conversations[2][-1]
+    assert len(dataset.create_commands) == 1
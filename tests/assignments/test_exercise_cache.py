@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+import json
+import pytest
+from sql_assignment_generator.assignments import Dataset, Exercise
+from sql_assignment_generator.assignments.exercise.fingerprint import SolutionRegistry, solution_fingerprint
+from sql_assignment_generator.constraints.query.aggregation import Aggregation
+from sql_assignment_generator.difficulty_level import DifficultyLevel
+from sql_assignment_generator.llm import chatgpt, ResponseCache
+from sql_error_taxonomy import SqlErrors
+
+
+DATASET = Dataset(
+    create_commands=['CREATE TABLE customers (id INT PRIMARY KEY, name VARCHAR(50), score INT);'],
+    insert_commands=["INSERT INTO customers (id, name, score) VALUES (1, 'a', 3), (2, 'b', 5);"],
+    domain='shop',
+)
+
+
+class ScriptedCompletions:
+    '''Answers exercise requests with the given solutions, in order, and refinement requests with a fixed text.'''
+
+    def __init__(self, solutions: list[str]) -> None:
+        self.solutions = list(solutions)
+        self.calls = 0
+
+    def create(self, *, response_format, **kwargs):
+        self.calls += 1
+        if 'solution' in response_format['json_schema']['schema']['properties']:
+            content = json.dumps({'request': 'count the customers', 'solution': self.solutions.pop(0)})
+        else:
+            content = json.dumps({'request_without_hints': 'how many customers are there?'})
+
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'))
+    monkeypatch.setattr(chatgpt, 'get_cache', lambda: cache)
+    monkeypatch.setattr(chatgpt, 'get_limiter', lambda: None)
+    yield cache
+    cache.close()
+
+
+def _install(monkeypatch, solutions: list[str]) -> ScriptedCompletions:
+    completions = ScriptedCompletions(solutions)
+    monkeypatch.setattr(chatgpt, '_get_client', lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    return completions
+
+
+def _generate(seen_solutions: SolutionRegistry | None = None) -> Exercise:
+    return Exercise.generate(
+        SqlErrors.SYN_2_AMBIGUOUS_COLUMN, DifficultyLevel.EASY, [Aggregation()],
+        db_host='', db_port=0, db_user='', db_password='',
+        extra_details='', dataset=DATASET, title='t', sql_dialect='postgres', language='en',
+        embedded_db=True, seen_solutions=seen_solutions,
+    )
+
+
+def _cached_solutions(cache: ResponseCache) -> list[str]:
+    contents = [content for content, in cache._connection.execute('SELECT content FROM responses')]
+    return [json.loads(content)['solution'] for content in contents if 'solution' in json.loads(content)]
+
+
+def test_only_validated_answers_are_cached(cache, monkeypatch):
+    _install(monkeypatch, ['SELECT name FROM customers', 'SELECT COUNT(*) FROM customers'])
+
+    exercise = _generate()
+
+    assert exercise.solutions[0].sql == 'SELECT COUNT(*) FROM customers'
+    assert _cached_solutions(cache) == ['SELECT COUNT(*) FROM customers']
+
+
+def test_cache_is_used_when_other_solutions_were_seen(cache, monkeypatch):
+    _install(monkeypatch, ['SELECT COUNT(*) FROM customers'])
+    _generate()
+
+    seen_solutions = SolutionRegistry()
+    seen_solutions.register(solution_fingerprint('SELECT MAX(score) FROM customers', catalog=DATASET.catalog))
+
+    completions = _install(monkeypatch, [])
+    exercise = _generate(seen_solutions)
+
+    assert exercise.solutions[0].sql == 'SELECT COUNT(*) FROM customers'
+    assert completions.calls == 0
+
+
+def test_cached_duplicates_are_regenerated(cache, monkeypatch):
+    _install(monkeypatch, ['SELECT COUNT(*) FROM customers'])
+    _generate()
+
+    # the cached answer is rejected as a duplicate, and the feedback changes the next request
+    seen_solutions = SolutionRegistry()
+    seen_solutions.register(solution_fingerprint('SELECT COUNT(*) FROM customers', catalog=DATASET.catalog))
+
+    completions = _install(monkeypatch, ['SELECT MAX(score) FROM customers'])
+    exercise = _generate(seen_solutions)
+
+    assert exercise.solutions[0].sql == 'SELECT MAX(score) FROM customers'
+    assert completions.calls == 2
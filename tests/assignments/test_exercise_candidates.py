@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import pytest
+from sql_assignment_generator.assignments import Exercise
+from sql_assignment_generator.exceptions import SQLParsingError
+
+
+def make_check(outcomes: dict[str, list[str] | Exception], release: threading.Event | None = None):
+    def check(answer: str):
+        if release is not None and answer == 'slow':
+            release.wait(5)
+        outcome = outcomes[answer]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return f'query:{answer}', outcome
+    return check
+
+
+def test_first_valid_returns_passing_candidate():
+    check = make_check({'a': ['missing WHERE'], 'b': [], 'c': ['missing JOIN', 'missing WHERE']})
+
+    idx, outcome = Exercise._first_valid(['a', 'b', 'c'], check)
+
+    assert idx == 1
+    assert outcome == ('query:b', [])
+
+
+def test_first_valid_does_not_wait_for_slow_candidates():
+    release = threading.Event()
+    check = make_check({'slow': [], 'fast': []}, release)
+
+    idx, _ = Exercise._first_valid(['slow', 'fast'], check)
+    release.set()
+
+    assert idx == 1
+
+
+def test_first_valid_falls_back_to_closest_candidate():
+    check = make_check({
+        'a': SQLParsingError('syntax error', 'SELEC'),
+        'b': ['missing JOIN', 'missing WHERE'],
+        'c': ['missing WHERE'],
+    })
+
+    idx, outcome = Exercise._first_valid(['a', 'b', 'c'], check)
+
+    assert idx == 2
+    assert outcome == ('query:c', ['missing WHERE'])
+
+
+def test_first_valid_reports_errors_when_nothing_runs():
+    error = SQLParsingError('syntax error', 'SELEC')
+    check = make_check({'a': error, 'b': SQLParsingError('other', 'x')})
+
+    idx, outcome = Exercise._first_valid(['a', 'b'], check)
+
+    assert idx == 0
+    assert outcome is error
+
+
+def test_afirst_valid_matches_sync_version():
+    check = make_check({'a': ['missing WHERE'], 'b': [], 'c': SQLParsingError('syntax error', 'SELEC')})
+
+    idx, outcome = asyncio.run(Exercise._afirst_valid(['a', 'b', 'c'], check))
+
+    assert idx == 1
+    assert outcome == ('query:b', [])
@@ -0,0 +1,51 @@
+import asyncio
+from sql_error_taxonomy import SqlErrors
+from sql_assignment_generator.assignments import Dataset, Exercise
+from sql_assignment_generator.assignments.exercise.fingerprint import SolutionRegistry, solution_fingerprint
+from sql_assignment_generator.difficulty_level import DifficultyLevel
+from sql_assignment_generator.error_requirements import ERROR_REQUIREMENTS_MAP
+
+
+DATASET = Dataset(
+    create_commands=['CREATE TABLE customers (id INT PRIMARY KEY, name VARCHAR(50), score INT);'],
+    insert_commands=["INSERT INTO customers (id, name, score) VALUES (1, 'a', 3), (2, 'b', 5);"],
+    domain='shop',
+)
+
+ERROR = SqlErrors.LOG_52_OR_INSTEAD_OF_AND
+CONSTRAINTS = ERROR_REQUIREMENTS_MAP[ERROR](language='en').exercise_constraints(DifficultyLevel.EASY)
+
+# the first answer has a single condition and is rejected, the second one is accepted
+SOLUTIONS = ['SELECT name FROM customers WHERE score > 1', 'SELECT name FROM customers WHERE score > 1 AND id < 10']
+
+
+def _options(seen_solutions: SolutionRegistry | None = None) -> dict:
+    return dict(
+        db_host='', db_port=0, db_user='', db_password='',
+        extra_details='', dataset=DATASET, title='t', sql_dialect='postgres', language='en',
+        embedded_db=True, seen_solutions=seen_solutions,
+    )
+
+
+def test_agenerate_matches_generate(scripted_llm):
+    sync_llm = scripted_llm(SOLUTIONS.__getitem__)
+    generated = Exercise.generate(ERROR, DifficultyLevel.EASY, CONSTRAINTS, **_options())
+
+    async_llm = scripted_llm(SOLUTIONS.__getitem__)
+    agenerated = asyncio.run(Exercise.agenerate(ERROR, DifficultyLevel.EASY, CONSTRAINTS, **_options()))
+
+    assert agenerated.solutions[0].sql == generated.solutions[0].sql == SOLUTIONS[1]
+    assert agenerated.request == generated.request == 'request 0'
+    assert async_llm.calls == sync_llm.calls == {'Assignment': 2, 'RemoveHints': 1}
+
+
+def test_agenerate_rejects_seen_solutions(scripted_llm):
+    seen_solutions = SolutionRegistry()
+    seen_solutions.register(solution_fingerprint(SOLUTIONS[1], catalog=DATASET.catalog))
+    solutions = [SOLUTIONS[1], 'SELECT name FROM customers WHERE score > 2 OR id = 1']
+
+    fake = scripted_llm(solutions.__getitem__)
+    exercise = asyncio.run(Exercise.agenerate(ERROR, DifficultyLevel.EASY, CONSTRAINTS, **_options(seen_solutions)))
+
+    assert exercise.solutions[0].sql == solutions[1]
+    assert fake.calls['Assignment'] == 2
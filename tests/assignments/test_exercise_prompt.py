@@ -0,0 +1,40 @@
+from sql_assignment_generator.assignments import Dataset, Exercise
+from sql_assignment_generator.constraints import query as query_constraints
+from sql_assignment_generator.difficulty_level import DifficultyLevel
+from sql_assignment_generator.llm.chatgpt import _prompt_cache_key
+
+
+DATASET = Dataset(
+    create_commands=['CREATE TABLE t (id INT PRIMARY KEY, name VARCHAR(10));'],
+    insert_commands=["INSERT INTO t (id, name) VALUES (1, 'a'), (2, 'b');"],
+    domain='test',
+)
+
+
+def initial_messages(extra_details: str, difficulty: DifficultyLevel, constraints: list):
+    return Exercise._initial_messages(
+        DATASET,
+        constraints,
+        extra_details=extra_details,
+        sql_dialect='postgres',
+        language='en',
+        difficulty=difficulty,
+    )
+
+
+def test_prompt_prefix_is_shared_across_exercises():
+    first = initial_messages('use a JOIN', DifficultyLevel.EASY, [query_constraints.clause_where.Condition(1)])
+    second = initial_messages('use a subquery', DifficultyLevel.HARD, [])
+
+    assert first.messages[0] == second.messages[0]
+    assert first.messages[1] != second.messages[1]
+    assert _prompt_cache_key(first) == _prompt_cache_key(second)
+
+
+def test_prompt_prefix_contains_dataset_only_once():
+    messages = initial_messages('use a JOIN', DifficultyLevel.MEDIUM, [])
+
+    assert DATASET.to_sql_no_context() in messages.messages[0]['content']
+    assert DATASET.to_sql_no_context() not in messages.messages[1]['content']
+    assert 'intermediate' in messages.messages[1]['content']
+    assert 'use a JOIN' in messages.messages[1]['content']
@@ -0,0 +1,63 @@
+import pytest
+from sqlscope import build_catalog_from_sql
+from sql_assignment_generator.assignments.exercise.fingerprint import SolutionRegistry, solution_fingerprint
+
+
+CATALOG = build_catalog_from_sql('''
+    CREATE TABLE customers (id INT PRIMARY KEY, name VARCHAR(50), score INT);
+    CREATE TABLE products (id INT PRIMARY KEY, customer_id INT REFERENCES customers(id), score INT);
+''')
+
+
+def fingerprint(sql: str) -> str:
+    return solution_fingerprint(sql, catalog=CATALOG, sql_dialect='postgres')
+
+
+@pytest.mark.parametrize('first, second', [
+    # formatting and case
+    ('SELECT name FROM customers WHERE score > 2', 'select  NAME\nfrom Customers\nwhere score>2'),
+    # table and column aliases, qualification
+    ('SELECT name FROM customers WHERE score > 2', 'SELECT c.name AS customer FROM customers AS c WHERE c.score > 2'),
+    ('SELECT c.name, p.id FROM customers c JOIN products p ON p.customer_id = c.id',
+     'SELECT x.name, y.id FROM customers x JOIN products y ON x.id = y.customer_id'),
+    # condition order and comparison direction
+    ('SELECT name FROM customers WHERE score > 2 AND id < 5', 'SELECT name FROM customers WHERE 5 > id AND 2 < score'),
+    ("SELECT name FROM customers WHERE (score = 1 OR id = 2) AND name = 'a'",
+     "SELECT name FROM customers WHERE name = 'a' AND (2 = id OR score = 1)"),
+    # output aliases, also in the branches of set operations
+    ('SELECT name AS a FROM customers UNION SELECT name AS b FROM customers',
+     'SELECT name FROM customers UNION SELECT name FROM customers'),
+])
+def test_equivalent_queries_have_same_fingerprint(first, second):
+    assert fingerprint(first) == fingerprint(second)
+
+
+@pytest.mark.parametrize('first, second', [
+    ('SELECT name FROM customers WHERE score > 2', 'SELECT name FROM customers WHERE score < 2'),
+    ('SELECT name FROM customers WHERE score - id > 2', 'SELECT name FROM customers WHERE id - score > 2'),
+    ('SELECT c1.name FROM customers c1 JOIN customers c2 ON c1.id < c2.id',
+     'SELECT c2.name FROM customers c1 JOIN customers c2 ON c1.id < c2.id'),
+    ('SELECT name FROM customers WHERE score > 2 AND id < 5', 'SELECT name FROM customers WHERE score > 2 OR id < 5'),
+    ('SELECT DISTINCT name FROM customers', 'SELECT name FROM customers'),
+    # the outer query selects a different column of the CTE
+    ('WITH s AS (SELECT name AS x, MAX(score) AS y FROM customers GROUP BY name) SELECT x FROM s',
+     'WITH s AS (SELECT name AS y, MAX(score) AS x FROM customers GROUP BY name) SELECT x FROM s'),
+    ('SELECT x FROM (SELECT name AS x, score AS y FROM customers) AS s',
+     'SELECT x FROM (SELECT name AS y, score AS x FROM customers) AS s'),
+])
+def test_different_queries_have_different_fingerprints(first, second):
+    assert fingerprint(first) != fingerprint(second)
+
+
+def test_unparsable_query_falls_back_to_text():
+    assert solution_fingerprint('SELEC name FROM') == solution_fingerprint('selec  NAME from')
+
+
+def test_registry():
+    registry = SolutionRegistry()
+    fp = fingerprint('SELECT name FROM customers')
+
+    assert fp not in registry
+    assert registry.register(fp)
+    assert fp in registry
+    assert not registry.register(fingerprint('SELECT c.name FROM customers c'))
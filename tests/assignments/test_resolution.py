@@ -0,0 +1,77 @@
+import pytest
+from sql_assignment_generator import llm, tracing
+from sql_assignment_generator.assignments import Dataset, Exercise
+from sql_assignment_generator.assignments.exercise.resolution import unresolved_references
+from sql_assignment_generator.constraints.query.aggregation import Aggregation
+from sql_assignment_generator.db import get_database
+from sql_assignment_generator.exceptions import SQLParsingError
+
+
+DATASET = Dataset(
+    create_commands=[
+        'CREATE TABLE customers (id INT PRIMARY KEY, name VARCHAR(50), score INT);',
+        'CREATE TABLE products (id INT PRIMARY KEY, customer_id INT REFERENCES customers(id), price INT);',
+    ],
+    insert_commands=[
+        "INSERT INTO customers (id, name, score) VALUES (1, 'a', 3), (2, 'b', 5);",
+        'INSERT INTO products (id, customer_id, price) VALUES (1, 1, 10), (2, 2, 20);',
+    ],
+    domain='shop',
+)
+
+
+def unresolved(sql: str) -> list[str]:
+    return unresolved_references(sql, catalog=DATASET.catalog, sql_dialect='postgres')
+
+
+@pytest.mark.parametrize('sql', [
+    'SELECT name FROM customers WHERE score > 2',
+    'SELECT C.Name FROM Customers AS c JOIN products p ON p.customer_id = c.id',
+    'SELECT name AS n FROM customers ORDER BY n',
+    'WITH rich AS (SELECT id FROM customers WHERE score > 4) SELECT id FROM rich',
+    'SELECT id FROM customers c WHERE EXISTS (SELECT 1 FROM products p WHERE p.customer_id = c.id)',
+    'SELECT * FROM generate_series(1, 3)',
+])
+def test_existing_references_are_resolved(sql):
+    assert unresolved(sql) == []
+
+
+@pytest.mark.parametrize('sql, expected', [
+    ('SELECT name FROM customer', ['table "customer"']),
+    ('SELECT nme FROM customers', ['column "nme"']),
+    ('SELECT p.price FROM customers c JOIN products p ON p.customer_id = c.id WHERE c.price > 2', ['column "price"']),
+])
+def test_missing_references_are_reported(sql, expected):
+    assert unresolved(sql) == expected
+
+
+def _check(solution: str):
+    def open_db():
+        return get_database('', 0, '', '', 'postgres', embedded=True)
+
+    return Exercise._check_answer(
+        llm.models.Assignment.model_validate({'request': '', 'solution': solution}),
+        DATASET,
+        [Aggregation()],
+        open_db=open_db,
+        load_dataset=True,
+        language='en',
+    )
+
+
+def test_stages_stop_before_execution():
+    with tracing.collecting() as collector:
+        _, constraint_errors = _check('SELECT name FROM customers')
+        assert constraint_errors
+
+        with pytest.raises(SQLParsingError, match='nme'):
+            _check('SELECT COUNT(nme) FROM customers')
+
+        _, constraint_errors = _check('SELECT COUNT(*) FROM customers')
+        assert constraint_errors == []
+
+    assert collector.total('exercise.validation', stage='constraints') == 1
+    assert collector.total('exercise.validation', stage='resolution') == 1
+    assert collector.total('exercise.validation', stage='accepted') == 1
+    assert collector.total('db.round_trips_saved') == 2
+    assert len(collector.durations('db.execute')) == 1
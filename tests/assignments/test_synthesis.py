@@ -0,0 +1,71 @@
+from sql_assignment_generator.assignments import Dataset
+from sql_assignment_generator.db import RowBatch, get_database
+
+
+DATASET_SQL = '''
+CREATE TABLE customers (id SERIAL PRIMARY KEY, email VARCHAR UNIQUE NOT NULL, score INT CHECK (score BETWEEN 0 AND 100), joined DATE);
+CREATE TABLE products (code VARCHAR PRIMARY KEY, price DECIMAL(8, 2) CHECK (price > 0), name VARCHAR);
+CREATE TABLE orders (
+    id INT PRIMARY KEY,
+    customer_id INT NOT NULL REFERENCES customers(id),
+    product_code VARCHAR REFERENCES products(code),
+    placed DATE,
+    shipped DATE,
+    CHECK (shipped >= placed)
+);
+INSERT INTO customers (email, score, joined) VALUES ('a@x.com', 10, '2020-01-01'), ('b@x.com', NULL, '2021-05-03'), ('c@y.org', 99, '2022-02-02');
+INSERT INTO products (code, price, name) VALUES ('P1', 9.99, 'pen'), ('P2', 120.5, 'O''Reilly book'), ('P3', 3, NULL);
+INSERT INTO orders (id, customer_id, product_code, placed, shipped) VALUES
+    (1, 1, 'P1', '2023-01-01', '2023-01-05'), (2, 3, 'P2', '2023-02-01', NULL), (3, 2, 'P1', '2023-03-02', '2023-03-09');
+'''
+
+
+def load(dataset: Dataset, query: str) -> list[tuple]:
+    with get_database('', 0, '', '', 'postgres', embedded=True) as db:
+        db.load_dataset(dataset, batch_size=100)
+        return db.execute(query)
+
+
+def test_amplified_dataset_satisfies_constraints():
+    dataset = Dataset.from_sql(DATASET_SQL, 'postgres').amplify(500, sql_dialect='postgres')
+
+    # loading fails on any key, foreign key or CHECK violation
+    counts = load(dataset, '''
+        SELECT (SELECT COUNT(*) FROM customers), (SELECT COUNT(*) FROM products), (SELECT COUNT(*) FROM orders),
+               (SELECT COUNT(*) FROM orders o JOIN customers c ON c.id = o.customer_id)
+    ''')
+
+    assert counts == [(500, 500, 500, 500)]
+
+
+def test_values_follow_seed_rows():
+    dataset = Dataset.from_sql(DATASET_SQL, 'postgres').amplify({'customers': 300}, sql_dialect='postgres')
+
+    rows = load(dataset, 'SELECT MIN(score), MAX(score), MIN(joined), MAX(joined), COUNT(*), COUNT(score) FROM customers')
+    min_score, max_score, min_joined, max_joined, count, not_null = rows[0]
+
+    assert 10 <= min_score and max_score <= 99
+    assert '2020-01-01' <= min_joined and max_joined <= '2022-02-02'
+    assert count == 300
+    assert 0 < not_null < count
+
+
+def test_only_requested_tables_are_scaled():
+    dataset = Dataset.from_sql(DATASET_SQL, 'postgres').amplify({'orders': 50}, sql_dialect='postgres')
+
+    assert load(dataset, 'SELECT (SELECT COUNT(*) FROM customers), (SELECT COUNT(*) FROM orders)') == [(3, 50)]
+
+
+def inserts(dataset: Dataset) -> list[str]:
+    return [item.to_sql() if isinstance(item, RowBatch) else item for item in dataset.iter_inserts()]
+
+
+def test_synthesis_is_deterministic_and_not_in_prompts():
+    dataset = Dataset.from_sql(DATASET_SQL, 'postgres')
+    amplified = dataset.amplify(100, sql_dialect='postgres', seed=1)
+
+    assert inserts(amplified) == inserts(dataset.amplify(100, sql_dialect='postgres', seed=1))
+    assert inserts(amplified) != inserts(dataset.amplify(100, sql_dialect='postgres', seed=2))
+    assert amplified.to_sql_no_context() == dataset.to_sql_no_context()
+    assert len(amplified.to_sql('test')) > len(dataset.to_sql('test'))
+
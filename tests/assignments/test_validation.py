@@ -0,0 +1,81 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import pytest
+from sql_assignment_generator import llm
+from sql_assignment_generator.assignments import Dataset, Exercise
+from sql_assignment_generator.assignments.exercise.fingerprint import SolutionRegistry, solution_fingerprint
+from sql_assignment_generator.assignments.exercise.validation import validate_locally
+from sql_assignment_generator.constraints.query.aggregation import Aggregation
+from sql_assignment_generator.db import get_database
+from sql_assignment_generator.exceptions import SQLParsingError
+
+
+DATASET = Dataset(
+    create_commands=['CREATE TABLE customers (id INT PRIMARY KEY, name VARCHAR(50), score INT);'],
+    insert_commands=["INSERT INTO customers (id, name, score) VALUES (1, 'a', 3), (2, 'b', 5);"],
+    domain='shop',
+)
+
+SEEN = {solution_fingerprint('SELECT COUNT(*) FROM customers WHERE score > 4', catalog=DATASET.catalog, sql_dialect='postgres')}
+
+
+def validate(solution: str):
+    return validate_locally(solution, DATASET.catalog, [Aggregation()], sql_dialect='postgres', language='en', seen_fingerprints=SEEN)
+
+
+def test_stages():
+    assert validate("SELECT name FROM customers WHERE name = 'a").parse_error
+
+    assert validate('SELECT COUNT(*) FROM customers c WHERE c.score > 4').duplicate
+
+    result = validate('SELECT name FROM customers')
+    assert result.failed_constraints == ['Aggregation']
+    assert result.constraint_errors
+    assert result.unresolved == []  # not reached
+
+    assert validate('SELECT COUNT(nme) FROM customers').unresolved == ['column "nme"']
+
+    result = validate('SELECT COUNT(*) FROM customers')
+    assert result.query is not None
+    assert not (result.parse_error or result.duplicate or result.constraint_errors or result.unresolved)
+
+
+@pytest.fixture(scope='module')
+def pool():
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context('spawn')) as executor:
+        yield executor
+
+
+def _check(solution: str, validation_pool=None):
+    seen_solutions = SolutionRegistry()
+    seen_solutions.update(SEEN)
+
+    return Exercise._check_answer(
+        llm.models.Assignment.model_validate({'request': '', 'solution': solution}),
+        DATASET,
+        [Aggregation()],
+        open_db=lambda: get_database('', 0, '', '', 'postgres', embedded=True),
+        load_dataset=True,
+        language='en',
+        seen_solutions=seen_solutions,
+        validation_pool=validation_pool,
+    )
+
+
+@pytest.mark.parametrize('solution', [
+    'SELECT COUNT(*) FROM customers',
+    'SELECT name FROM customers',
+    'SELECT COUNT(*) FROM customers WHERE score > 4',
+])
+def test_pool_gives_same_outcome(pool, solution):
+    local_query, local_errors = _check(solution)
+    pool_query, pool_errors = _check(solution, pool)
+
+    assert pool_query.sql == local_query.sql
+    assert pool_errors == local_errors
+
+
+@pytest.mark.parametrize('solution', ["SELECT name FROM customers WHERE name = 'a", 'SELECT COUNT(nme) FROM customers'])
+def test_pool_raises_in_caller(pool, solution):
+    with pytest.raises(SQLParsingError):
+        _check(solution, pool)
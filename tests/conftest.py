@@ -0,0 +1,105 @@
+from collections.abc import Callable
+import asyncio
+import threading
+import time
+import pytest
+from sql_assignment_generator import llm
+
+
+DATASET_SQL = '''
+CREATE TABLE customers (id INT PRIMARY KEY, name VARCHAR(50), score INT);
+CREATE TABLE orders (id INT PRIMARY KEY, customer_id INT REFERENCES customers(id), total INT);
+INSERT INTO customers (id, name, score) VALUES (1, 'a', 3), (2, 'b', 5), (3, 'c', 1);
+INSERT INTO orders (id, customer_id, total) VALUES (1, 1, 10), (2, 1, 20), (3, 2, 30);
+'''
+
+
+def unique_solution(call: int) -> str:
+    '''A different solution with two conditions on a single table for each call.'''
+    return f'SELECT name FROM customers WHERE score > {call} AND id < 100'
+
+
+class ScriptedLLM:
+    '''
+    Replacement for the answer functions of the `llm` package.
+
+    The solution of the n-th exercise request is `solution(n)`, returned after `delay(n)` seconds (if given).
+    Dataset requests are answered with `DATASET_SQL`, unless their prompt contains one of `failing_domains`,
+    in which case the answer has no tables.
+    '''
+
+    def __init__(
+            self,
+            solution: Callable[[int], str] = unique_solution,
+            *,
+            delay: Callable[[int], float] | None = None,
+            failing_domains: tuple[str, ...] = ()
+        ) -> None:
+        self.solution = solution
+        self.delay = delay
+        self.failing_domains = failing_domains
+        self.calls: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, json_format: type) -> int:
+        with self._lock:
+            call = self.calls.get(json_format.__name__, 0)
+            self.calls[json_format.__name__] = call + 1
+            return call
+
+    def _delay(self, json_format: type, call: int) -> float:
+        return self.delay(call) if self.delay is not None and json_format is llm.models.Assignment else 0.0
+
+    def _answer(self, message: llm.Message, json_format: type, call: int):
+        if json_format is llm.models.Assignment:
+            solution = self.solution(call)
+            return llm.models.Assignment.model_validate({'request': f'Write: {solution}', 'solution': solution})
+        if json_format is llm.models.RemoveHints:
+            return llm.models.RemoveHints.model_validate({'request_without_hints': f'request {call}'})
+        if json_format is llm.models.Schema:
+            if any(domain in message.messages[0]['content'] for domain in self.failing_domains):
+                return llm.models.Schema.model_validate({'schema_tables': [], 'insert_commands': []})
+            commands = [f'{command.strip()};' for command in DATASET_SQL.split(';') if command.strip()]
+            return llm.models.Schema.model_validate({
+                'schema_tables': [command for command in commands if command.startswith('CREATE')],
+                'insert_commands': [command for command in commands if command.startswith('INSERT')],
+            })
+
+        raise NotImplementedError(json_format)
+
+    def generate_answer(self, message: llm.Message, *, json_format: type, add_to_messages: bool = True, **kwargs):
+        call = self._count(json_format)
+        time.sleep(self._delay(json_format, call))
+
+        answer = self._answer(message, json_format, call)
+        if add_to_messages:
+            message.add_message_assistant(answer.model_dump_json())
+        return answer
+
+    async def generate_answer_async(self, message: llm.Message, *, json_format: type, add_to_messages: bool = True, **kwargs):
+        call = self._count(json_format)
+        await asyncio.sleep(self._delay(json_format, call))
+
+        answer = self._answer(message, json_format, call)
+        if add_to_messages:
+            message.add_message_assistant(answer.model_dump_json())
+        return answer
+
+    def generate_answers(self, message: llm.Message, *, json_format: type, n: int, **kwargs):
+        return [self._answer(message, json_format, self._count(json_format)) for _ in range(n)]
+
+    async def generate_answers_async(self, message: llm.Message, *, json_format: type, n: int, **kwargs):
+        return self.generate_answers(message, json_format=json_format, n=n, **kwargs)
+
+
+@pytest.fixture
+def scripted_llm(monkeypatch) -> Callable[..., ScriptedLLM]:
+    '''Install a `ScriptedLLM` built with the given arguments.'''
+
+    def install(*args, **kwargs) -> ScriptedLLM:
+        fake = ScriptedLLM(*args, **kwargs)
+        for name in ('generate_answer', 'generate_answer_async', 'generate_answers', 'generate_answers_async'):
+            monkeypatch.setattr(llm, name, getattr(fake, name))
+        return fake
+
+    return install
@@ -0,0 +1,47 @@
+import pytest
+from sqlglot import exp
+from sqlscope import Query
+from sql_assignment_generator.constraints.query.features import QueryFeatures
+
+
+def test_features_are_cached_per_query():
+    query = Query("SELECT a FROM t1 WHERE a = 1")
+
+    assert QueryFeatures.of(query) is QueryFeatures.of(query)
+    assert QueryFeatures.of(query) is not QueryFeatures.of(Query("SELECT a FROM t1 WHERE a = 1"))
+
+
+@pytest.mark.parametrize("sql, types", [
+    ("SELECT * FROM t1 WHERE (a = 1 OR b LIKE 'x%') AND c > 3", (exp.EQ, exp.Like, exp.GT)),
+    ("SELECT * FROM t1 WHERE NOT a IS NULL AND b NOT IN (1, 2)", (exp.Not, exp.Is, exp.In)),
+    ("SELECT * FROM t1 WHERE a + b * 2 > c - 1", (exp.Binary,)),
+])
+def test_find_all_matches_sqlglot(sql, types):
+    query = Query(sql)
+    select = QueryFeatures.of(query).main_selects[0]
+
+    expected = list(query.main_query.where.find_all(*types))
+    assert select.find_all_in_where(*types) == expected
+
+
+@pytest.mark.parametrize("sql, conditions", [
+    ("SELECT * FROM t1", 0),
+    ("SELECT * FROM t1 WHERE a = 1", 1),
+    ("SELECT * FROM t1 WHERE (a = 1 OR b = 2) AND c = 3", 3),
+])
+def test_where_conditions(sql, conditions):
+    assert QueryFeatures.of(Query(sql)).main_selects[0].where_conditions == conditions
+
+
+def test_stripped_ignores_subqueries():
+    query = Query("SELECT a FROM t1 WHERE a = 1 AND b IN (SELECT b FROM t2 WHERE c = 2 AND d = 3)")
+    select = QueryFeatures.of(query).main_selects[0]
+
+    assert len(select.find_all(exp.EQ)) == 3
+    assert len(select.stripped.find_all(exp.EQ)) == 1
+
+
+def test_order_by_directions():
+    query = Query("SELECT a, b, c FROM t1 ORDER BY a, b DESC, c ASC")
+
+    assert QueryFeatures.of(query).selects[0].order_by_directions == [True, False, True]
@@ -221,3 +221,22 @@ def test_max_columns_merge_wrong_type():
 
     with pytest.raises(ConstraintMergeError):
         c1.merge(c2)
+
+
+# =================================================================
+# TEST FAILING TABLES
+# =================================================================
+
+def test_max_columns_failing_tables():
+    catalog, tables_ast, values_ast = prepare_catalog([
+        "CREATE TABLE t1 (id INT PRIMARY KEY, a INT, b INT)",
+        "CREATE TABLE t2 (id INT PRIMARY KEY)",
+    ])
+
+    assert MaxColumns(max_columns=2).failing_tables(catalog, tables_ast, values_ast) == {'t1'}
+
+
+def test_schema_wide_constraints_have_no_failing_tables():
+    catalog, tables_ast, values_ast = prepare_catalog(["CREATE TABLE t1 (id INT PRIMARY KEY)"])
+
+    assert MinTables(min_tables=2).failing_tables(catalog, tables_ast, values_ast) is None
@@ -153,4 +153,31 @@ def test_single_insert_per_table_merge_wrong_type():
     c1 = SingleInsertPerTable()
     c2 = MinRows(min_=3)
     with pytest.raises(ConstraintMergeError):
-        c1.merge(c2)
\ No newline at end of file
+        c1.merge(c2)
+
+# =================================================================
+# TEST FAILING TABLES
+# =================================================================
+
+def test_min_rows_failing_tables():
+    catalog, tables_ast, values_ast = prepare_catalog(
+        ["CREATE TABLE t1 (id INT PRIMARY KEY)", "CREATE TABLE t2 (id INT PRIMARY KEY)"],
+        ["INSERT INTO t1 (id) VALUES (1), (2), (3)", "INSERT INTO T2 (id) VALUES (1)"],
+    )
+
+    assert MinRows(min_=3).failing_tables(catalog, tables_ast, values_ast) == {'t2'}
+
+
+def test_min_rows_failing_tables_without_data():
+    catalog, tables_ast, values_ast = prepare_catalog(["CREATE TABLE t1 (id INT PRIMARY KEY)"], [])
+
+    assert MinRows(min_=3).failing_tables(catalog, tables_ast, values_ast) is None
+
+
+def test_single_insert_per_table_failing_tables():
+    catalog, tables_ast, values_ast = prepare_catalog(
+        ["CREATE TABLE t1 (id INT PRIMARY KEY)", "CREATE TABLE t2 (id INT PRIMARY KEY)"],
+        ["INSERT INTO t1 (id) VALUES (1)", "INSERT INTO t1 (id) VALUES (2)", "INSERT INTO t2 (id) VALUES (1)"],
+    )
+
+    assert SingleInsertPerTable().failing_tables(catalog, tables_ast, values_ast) == {'t1'}
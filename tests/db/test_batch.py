@@ -0,0 +1,53 @@
+from decimal import Decimal
+import sqlglot
+from sql_assignment_generator.assignments import Dataset
+from sql_assignment_generator.db import RowBatch, get_database
+from sql_assignment_generator.db.batch import RawValue
+from sql_assignment_generator.db.drivers.postgresql import _copy_value
+
+
+def test_row_batch_to_sql():
+    batch = RowBatch('t', ['a', 'b', 'c'], [(1, "it's", None), (2.5, 'x', True)])
+
+    assert batch.to_sql() == "INSERT INTO t (a, b, c) VALUES\n(1, 'it''s', NULL),\n(2.5, 'x', TRUE);"
+
+
+def test_row_batch_from_insert():
+    insert = sqlglot.parse_one("INSERT INTO t (a, b) VALUES (1, 'x'), (-2, NULL), (3, CURRENT_DATE)", read='postgres')
+
+    batches = list(RowBatch.from_insert(insert, 'postgres', batch_size=2))
+
+    assert [batch.rows for batch in batches] == [[(1, 'x'), (-2, None)], [(3, RawValue('CURRENT_DATE'))]]
+    assert batches[0].columns == ['a', 'b']
+    assert not batches[0].has_raw_values and batches[1].has_raw_values
+
+
+def test_row_batch_keeps_numeric_precision():
+    insert = sqlglot.parse_one('INSERT INTO t (a) VALUES (12345678901234567.123456789), (-0.10)', read='postgres')
+
+    batch, = RowBatch.from_insert(insert, 'postgres', batch_size=10)
+
+    assert batch.rows == [(Decimal('12345678901234567.123456789'),), (Decimal('-0.10'),)]
+    assert batch.to_sql() == 'INSERT INTO t (a) VALUES\n(12345678901234567.123456789),\n(-0.10);'
+    assert [_copy_value(value) for value, in batch.rows] == ['12345678901234567.123456789', '-0.10']
+
+
+def test_row_batch_from_insert_select():
+    insert = sqlglot.parse_one('INSERT INTO t (a) SELECT a FROM s', read='postgres')
+
+    assert RowBatch.from_insert(insert, 'postgres', batch_size=10) is None
+
+
+def test_load_dataset():
+    dataset = Dataset.from_sql('''
+        CREATE TABLE customer (id SERIAL PRIMARY KEY, name VARCHAR NOT NULL, since DATE);
+        CREATE TABLE orders (id SERIAL PRIMARY KEY, customer_id INT REFERENCES customer(id), total NUMERIC(8, 2) CHECK (total > 0));
+        INSERT INTO customer (name, since) VALUES ('Alice', '2020-01-01'), ('O''Brien', CURRENT_DATE);
+        INSERT INTO orders (customer_id, total) VALUES (1, 10.5), (1, 3), (2, 7);
+    ''', 'postgres')
+
+    with get_database('', 0, '', '', 'postgres', embedded=True) as db:
+        db.load_dataset(dataset, batch_size=2)
+        result = db.execute('SELECT c.name, COUNT(*), SUM(o.total) FROM customer c JOIN orders o ON o.customer_id = c.id GROUP BY c.name ORDER BY c.name')
+
+    assert result == [('Alice', 2, 13.5), ("O'Brien", 1, 7)]
@@ -0,0 +1,126 @@
+import threading
+import pytest
+from sql_assignment_generator.db.pool import ConnectionPool
+from sql_assignment_generator.db.exceptions import PoolExhaustedError
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.closed = False
+        self.rollbacks = 0
+
+    def close(self) -> None:
+        self.closed = True
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+
+
+def make_pool(**kwargs) -> tuple[ConnectionPool, list[FakeConnection]]:
+    created: list[FakeConnection] = []
+
+    def connect() -> FakeConnection:
+        conn = FakeConnection()
+        created.append(conn)
+        return conn
+
+    pool = ConnectionPool(
+        connect=connect,
+        is_alive=lambda conn: not conn.closed,
+        reset=lambda conn: conn.rollback(),
+        **kwargs
+    )
+    return pool, created
+
+# =================================================================
+# TEST REUSE
+# =================================================================
+
+def test_connection_is_reused():
+    pool, created = make_pool(max_size=2)
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first is second
+    assert len(created) == 1
+    assert first.rollbacks == 2
+
+def test_dead_connection_is_replaced():
+    pool, created = make_pool(max_size=1)
+
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.closed = True      # simulate a server-side disconnection
+
+    new_conn = pool.acquire()
+    assert new_conn is not conn
+    assert len(created) == 2
+    assert pool.size == 1
+
+def test_idle_connections_are_evicted():
+    pool, created = make_pool(max_size=1, max_idle_time=0)
+
+    conn = pool.acquire()
+    pool.release(conn)
+
+    new_conn = pool.acquire()
+    assert new_conn is not conn
+    assert conn.closed
+
+# =================================================================
+# TEST BOUNDS
+# =================================================================
+
+def test_pool_is_bounded():
+    pool, created = make_pool(max_size=1, acquire_timeout=0.05)
+
+    conn = pool.acquire()
+    with pytest.raises(PoolExhaustedError):
+        pool.acquire()
+
+    pool.release(conn)
+    assert pool.acquire() is conn
+
+def test_waiters_are_woken_up_on_release():
+    pool, created = make_pool(max_size=1, acquire_timeout=5)
+    conn = pool.acquire()
+    acquired = []
+
+    thread = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    thread.start()
+    pool.release(conn)
+    thread.join()
+
+    assert acquired == [conn]
+    assert len(created) == 1
+
+def test_close_all():
+    pool, created = make_pool(max_size=2)
+
+    conn = pool.acquire()
+    pool.release(conn)
+    pool.close_all()
+
+    assert conn.closed
+    with pytest.raises(PoolExhaustedError):
+        pool.acquire()
+
+# =================================================================
+# TEST CONNECTION INFO
+# =================================================================
+
+def test_info_survives_reuse_and_is_cleaned_up():
+    closed_with: list[dict] = []
+    pool, created = make_pool(max_size=1, max_idle_time=0)
+    pool.on_close = lambda conn, info: closed_with.append(info)
+
+    conn = pool.acquire()
+    pool.info(conn)['scratch_schema'] = 's1'
+    pool.release(conn)
+    assert pool.info(conn) == {'scratch_schema': 's1'}
+
+    pool.acquire()      # evicts the idle connection
+    assert closed_with == [{'scratch_schema': 's1'}]
@@ -0,0 +1,81 @@
+import pytest
+from sql_assignment_generator.db import get_database, DummyDatabase, QueryExecutionError
+from sql_assignment_generator.db.drivers import MySQLDatabase, SQLiteDatabase
+
+DATASET = '''
+CREATE TABLE customer (id SERIAL PRIMARY KEY, name VARCHAR NOT NULL);
+CREATE TABLE orders (id SERIAL PRIMARY KEY, customer_id INT REFERENCES customer(id), total NUMERIC(8, 2) CHECK (total > 0));
+INSERT INTO customer (name) VALUES ('Alice'), ('Bob');
+INSERT INTO orders (customer_id, total) VALUES (1, 10.5), (1, 3), (2, 7);
+'''
+
+def embedded_db(**kwargs) -> SQLiteDatabase:
+    db = get_database('', 0, '', '', 'postgres', embedded=True, **kwargs)
+    assert isinstance(db, SQLiteDatabase)
+    return db
+
+# =================================================================
+# TEST EXECUTION
+# =================================================================
+
+def test_postgres_dataset_is_transpiled():
+    with embedded_db() as db:
+        db.execute(DATASET)
+        result = db.execute("SELECT c.name, SUM(o.total) FROM customer c JOIN orders o ON o.customer_id = c.id WHERE c.name ILIKE 'a%' GROUP BY c.name")
+
+    assert result == [('Alice', 13.5)]
+
+@pytest.mark.parametrize("sql", [
+    "SELECT missing FROM customer",                     # undefined column
+    "INSERT INTO orders (customer_id, total) VALUES (99, 1)",   # foreign key violation
+    "INSERT INTO orders (customer_id, total) VALUES (1, -1)",   # check violation
+    "SELECT FROM WHERE",                                # syntax error
+])
+def test_errors_are_reported(sql):
+    with embedded_db() as db:
+        db.execute(DATASET)
+        with pytest.raises(QueryExecutionError):
+            db.execute(sql)
+
+def test_unsupported_dialect_uses_embedded_database_only_on_request():
+    assert isinstance(get_database('', 0, '', '', 'duckdb', embedded=True), SQLiteDatabase)
+    assert isinstance(get_database('', 0, '', '', 'duckdb'), DummyDatabase)
+
+# =================================================================
+# TEST ISOLATION
+# =================================================================
+
+@pytest.mark.parametrize("isolation", ['schema', 'transaction'])
+def test_checks_are_isolated(isolation):
+    for _ in range(2):
+        with embedded_db(isolation=isolation) as db:
+            db.execute(DATASET)     # would fail if tables survived the previous block
+
+def test_transaction_isolation_requires_transactional_ddl():
+    # MySQL falls back to `schema` isolation, and would otherwise get an error from `begin_isolated_transaction`
+    assert MySQLDatabase('', 0, '', '', isolation='transaction').isolation == 'schema'
+    assert embedded_db(isolation='transaction').isolation == 'transaction'
+
+    with pytest.raises(QueryExecutionError, match='does not support "transaction" isolation'):
+        MySQLDatabase('', 0, '', '').begin_isolated_transaction()
+
+def test_read_only_schema():
+    db = embedded_db()
+    db.connect()
+    db.create_schema('test_read_only_schema')
+    db.execute(DATASET)
+    db.disconnect()
+
+    try:
+        with embedded_db(read_only_schema='test_read_only_schema') as reader:
+            assert reader.execute('SELECT COUNT(*) FROM orders') == [(3,)]
+            with pytest.raises(QueryExecutionError):
+                reader.execute('DELETE FROM orders')
+    finally:
+        db.connect()
+        db.delete_schema()
+        db.disconnect()
+
+    with pytest.raises(QueryExecutionError):
+        with embedded_db(read_only_schema='test_read_only_schema'):
+            pass
@@ -0,0 +1,54 @@
+import time
+from pydantic import BaseModel
+from sql_assignment_generator.llm.cache import ResponseCache
+
+
+class Answer(BaseModel):
+    text: str
+
+
+def test_key_depends_on_whole_request():
+    messages = [{'role': 'user', 'content': 'hello'}]
+    key = ResponseCache.key(model='m', messages=messages, json_format=Answer)
+
+    assert key == ResponseCache.key(model='m', messages=[dict(m) for m in messages], json_format=Answer)
+    assert key != ResponseCache.key(model='other', messages=messages, json_format=Answer)
+    assert key != ResponseCache.key(model='m', messages=[{'role': 'user', 'content': 'bye'}], json_format=Answer)
+    assert key != ResponseCache.key(model='m', messages=messages, json_format=Answer, temperature=0.5)
+
+
+def test_roundtrip_persists(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = ResponseCache(path)
+    cache.put('k', '{"text": "a"}')
+    assert cache.get('k') == '{"text": "a"}'
+    assert cache.get('missing') is None
+    cache.close()
+
+    reopened = ResponseCache(path)
+    assert reopened.get('k') == '{"text": "a"}'
+    reopened.close()
+
+
+def test_ttl_expires_entries(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), ttl=0.05)
+    cache.put('k', 'value')
+    assert cache.get('k') == 'value'
+
+    time.sleep(0.1)
+    assert cache.get('k') is None
+
+
+def test_size_eviction_removes_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), max_bytes=20)
+    cache.put('a', 'x' * 8)
+    time.sleep(0.01)
+    cache.put('b', 'x' * 8)
+    time.sleep(0.01)
+    cache.get('a')      # 'b' is now the least recently used
+    time.sleep(0.01)
+    cache.put('c', 'x' * 8)
+
+    assert cache.get('a') is not None
+    assert cache.get('b') is None
+    assert cache.get('c') is not None
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+import asyncio
+import json
+from sql_assignment_generator.llm import chatgpt, Message, models
+
+
+class ScriptedCompletions:
+    '''Answers each request with the next of `contents`, as the synchronous or asynchronous client.'''
+
+    def __init__(self, contents: list[str]) -> None:
+        self.contents = list(contents)
+        self.requests: list[dict] = []
+
+    def _response(self, kwargs: dict):
+        self.requests.append(kwargs)
+        n = kwargs.get('n', 1)
+        choices = [SimpleNamespace(message=SimpleNamespace(content=self.contents.pop(0))) for _ in range(n)]
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15, prompt_tokens_details=None)
+        return SimpleNamespace(choices=choices, usage=usage)
+
+    def create(self, **kwargs):
+        return self._response(kwargs)
+
+    async def acreate(self, **kwargs):
+        await asyncio.sleep(0)
+        return self._response(kwargs)
+
+
+def _install(monkeypatch, contents: list[str]) -> ScriptedCompletions:
+    completions = ScriptedCompletions(contents)
+    monkeypatch.setattr(chatgpt, '_get_client', lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    monkeypatch.setattr(chatgpt, '_get_async_client', lambda: SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=completions.acreate))))
+    monkeypatch.setattr(chatgpt, 'get_cache', lambda: None)
+    monkeypatch.setattr(chatgpt, 'get_limiter', lambda: None)
+    return completions
+
+
+ANSWER = json.dumps({'request': 'count the customers', 'solution': 'SELECT COUNT(*) FROM customers'})
+
+
+def test_generate_answer_async_matches_sync(monkeypatch):
+    completions = _install(monkeypatch, [ANSWER, ANSWER])
+
+    sync_message = Message()
+    sync_message.add_message_user('hello')
+    sync_answer = chatgpt.generate_answer(sync_message, model='m', json_format=models.Assignment)
+
+    async_message = Message()
+    async_message.add_message_user('hello')
+    async_answer = asyncio.run(chatgpt.generate_answer_async(async_message, model='m', json_format=models.Assignment))
+
+    assert async_answer == sync_answer
+    assert async_message.messages == sync_message.messages
+    assert async_message.messages[-1] == {'role': 'assistant', 'content': ANSWER}
+    assert completions.requests[0] == completions.requests[1]
+
+
+def test_generate_answers_async_drops_invalid_choices(monkeypatch):
+    _install(monkeypatch, [ANSWER, '{"request": "missing solution"}'])
+
+    message = Message()
+    message.add_message_user('hello')
+    answers = asyncio.run(chatgpt.generate_answers_async(message, model='m', json_format=models.Assignment, n=2))
+
+    assert [answer.solution for answer in answers] == ['SELECT COUNT(*) FROM customers']
@@ -0,0 +1,61 @@
+import pytest
+from sql_assignment_generator.llm import Message
+
+
+def attempt(messages: Message, n: int) -> None:
+    messages.add_message_assistant(f'answer {n}')
+    messages.add_message_user(f'feedback {n}')
+
+
+def contents(messages: Message) -> list[str]:
+    return [msg['content'] for msg in messages.messages]
+
+
+def test_unbounded_history_keeps_everything():
+    messages = Message()
+    messages.add_message_user('prompt')
+    for n in range(5):
+        attempt(messages, n)
+
+    assert len(messages.messages) == 11
+    assert messages.omitted_turns == 0
+
+
+def test_bounded_history_keeps_prompt_and_last_turns():
+    messages = Message(max_history=2)
+    messages.add_message_system('system')
+    messages.add_message_user('prompt')
+    for n in range(5):
+        attempt(messages, n)
+
+    assert contents(messages) == ['system', 'prompt', 'answer 3', 'feedback 3', 'answer 4', 'feedback 4']
+    assert messages.omitted_turns == 3
+
+
+def test_history_size_is_stable_across_attempts():
+    messages = Message(max_history=1)
+    messages.add_message_user('prompt')
+
+    sizes = []
+    for n in range(6):
+        attempt(messages, n)
+        sizes.append(len(messages.messages))
+
+    assert sizes == [3] * 6
+    assert contents(messages) == ['prompt', 'answer 5', 'feedback 5']
+
+
+def test_turn_includes_all_following_messages():
+    messages = Message(max_history=1)
+    messages.add_message_user('prompt')
+    attempt(messages, 0)
+    messages.add_message_user('more feedback 0')
+    attempt(messages, 1)
+    messages.add_message_user('more feedback 1')
+
+    assert contents(messages) == ['prompt', 'answer 1', 'feedback 1', 'more feedback 1']
+
+
+def test_invalid_history_size():
+    with pytest.raises(ValueError):
+        Message(max_history=0)
@@ -0,0 +1,176 @@
+from types import SimpleNamespace
+import asyncio
+import threading
+import time
+import openai
+import pytest
+from sql_assignment_generator import tracing
+from sql_assignment_generator.exceptions import LLMRequestError
+from sql_assignment_generator.llm import chatgpt, Message
+from sql_assignment_generator.llm.ratelimit import AdaptiveConcurrency, RateLimiter, TokenBucket
+
+
+def test_token_bucket_makes_callers_wait_for_debt():
+    bucket = TokenBucket(60)    # one unit per second
+
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(1) == pytest.approx(1, abs=0.05)
+    assert bucket.reserve(2) == pytest.approx(3, abs=0.05)
+
+    bucket.adjust(-3)           # e.g. an overestimated request
+    assert bucket.reserve(0) == pytest.approx(0, abs=0.05)
+
+
+def test_concurrency_increases_additively_and_decreases_multiplicatively():
+    concurrency = AdaptiveConcurrency(initial=4, maximum=8)
+
+    # about one more slot after a round of `limit` requests
+    for _ in range(5):
+        concurrency.release(concurrency.acquire())
+    assert concurrency.limit == 5
+
+    # requests started before a decrease do not decrease the limit again
+    started = [concurrency.acquire() for _ in range(3)]
+    for start in started:
+        concurrency.release(start, throttled=True)
+    assert concurrency.limit == 2
+
+    concurrency.release(concurrency.acquire(), throttled=True)
+    assert concurrency.limit == 1
+
+
+def test_concurrency_blocks_over_limit():
+    concurrency = AdaptiveConcurrency(initial=1, maximum=1)
+    started = concurrency.acquire()
+
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: (concurrency.acquire(), acquired.set()))
+    thread.start()
+
+    assert not acquired.wait(0.05)
+    concurrency.release(started)
+    assert acquired.wait(1)
+    thread.join()
+
+
+def test_slow_requests_reduce_concurrency():
+    concurrency = AdaptiveConcurrency(initial=4, maximum=8, target_latency=0.01)
+
+    started = concurrency.acquire()
+    time.sleep(0.02)
+    concurrency.release(started)
+
+    assert concurrency.limit == 2
+
+
+def _api_error(error_class: type[openai.APIStatusError], status_code: int) -> openai.APIStatusError:
+    error = error_class.__new__(error_class)
+    Exception.__init__(error, f'status {status_code}')
+    error.status_code = status_code
+    error.response = SimpleNamespace(headers={'retry-after': '0'})
+    return error
+
+
+class FlakyCompletions:
+    '''Fails with the given errors, then answers.'''
+
+    def __init__(self, errors: list[Exception]) -> None:
+        self.errors = list(errors)
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return SimpleNamespace(usage=SimpleNamespace(total_tokens=10))
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    def install(errors: list[Exception]) -> FlakyCompletions:
+        fake = FlakyCompletions(errors)
+        client = SimpleNamespace(chat=SimpleNamespace(completions=fake))
+        monkeypatch.setattr(chatgpt, '_get_client', lambda: client)
+        monkeypatch.setattr(chatgpt, 'get_limiter', lambda: RateLimiter(max_concurrency=4))
+        return fake
+    return install
+
+
+def test_throttled_and_server_errors_are_retried(completions):
+    fake = completions([_api_error(openai.RateLimitError, 429), _api_error(openai.InternalServerError, 503)])
+
+    message = Message()
+    message.add_message_user('hello')
+    with tracing.collecting() as collector:
+        chatgpt._create(message, model='m')
+
+    assert fake.calls == 3
+    assert collector.total('llm.retries') == 2
+
+
+def test_client_errors_are_not_retried(completions):
+    fake = completions([_api_error(openai.BadRequestError, 400)])
+
+    message = Message()
+    message.add_message_user('hello')
+    with pytest.raises(LLMRequestError):
+        chatgpt._create(message, model='m')
+
+    assert fake.calls == 1
+
+
+def test_retries_are_bounded(completions, monkeypatch):
+    monkeypatch.setenv('SQL_GENERATION_LLM_MAX_RETRIES', '2')
+    fake = completions([_api_error(openai.RateLimitError, 429)] * 5)
+
+    message = Message()
+    message.add_message_user('hello')
+    with pytest.raises(LLMRequestError):
+        chatgpt._create(message, model='m')
+
+    assert fake.calls == 3
+
+
+def test_async_waiters_are_woken_by_release():
+    concurrency = AdaptiveConcurrency(initial=1, maximum=1)
+
+    async def scenario():
+        started = await concurrency.aacquire()
+        waiter = asyncio.ensure_future(concurrency.aacquire())
+
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+
+        concurrency.release(started)
+        await asyncio.wait_for(waiter, 1)
+
+    asyncio.run(scenario())
+    assert concurrency.in_flight == 1
+
+
+def test_cancelled_requests_free_their_slot(monkeypatch):
+    limiter = RateLimiter(max_concurrency=4, initial_concurrency=1)
+    monkeypatch.setattr(chatgpt, 'get_limiter', lambda: limiter)
+
+    class HangingCompletions:
+        async def create(self, **kwargs):
+            await asyncio.sleep(10)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=HangingCompletions()))
+    monkeypatch.setattr(chatgpt, '_get_async_client', lambda: client)
+
+    message = Message()
+    message.add_message_user('hello')
+
+    async def scenario():
+        request = asyncio.ensure_future(chatgpt._acreate(message, model='m'))
+        await asyncio.sleep(0.05)
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+
+        # the slot is free again, and the unknown outcome did not change the limit
+        await asyncio.wait_for(limiter.aacquire('m', 1), 1)
+
+    asyncio.run(scenario())
+    assert limiter.concurrency('m').limit == 1
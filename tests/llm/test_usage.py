@@ -0,0 +1,99 @@
+import contextvars
+import threading
+import pytest
+from types import SimpleNamespace
+from sql_assignment_generator.llm.chatgpt import _record_usage
+from sql_assignment_generator.llm.usage import Usage, tracking_usage, record_request, record_cached_response
+
+
+def test_totals_are_aggregated_per_model():
+    usage = Usage()
+    usage.add('small', prompt_tokens=100, completion_tokens=10)
+    usage.add('small', prompt_tokens=50, completion_tokens=5)
+    usage.add('large', prompt_tokens=1000, completion_tokens=200)
+
+    assert usage.requests == 3
+    assert usage.models['small'].requests == 2
+    assert usage.prompt_tokens == 1150
+    assert usage.completion_tokens == 215
+    assert usage.total_tokens == 1365
+
+
+def test_cost_uses_given_prices():
+    usage = Usage()
+    usage.add('small', prompt_tokens=2_000_000, completion_tokens=1_000_000)
+    usage.add('large', prompt_tokens=1_000_000, completion_tokens=0)
+
+    assert usage.cost({'small': (0.1, 0.4), 'large': (2.0, 8.0)}) == pytest.approx(0.2 + 0.4 + 2.0)
+
+    with pytest.raises(KeyError):
+        usage.cost({'small': (0.1, 0.4)})
+
+
+def test_merge():
+    usage = Usage()
+    usage.add('m', prompt_tokens=1, completion_tokens=2)
+    other = Usage()
+    other.add('m', prompt_tokens=10, completion_tokens=20)
+    other.add('n', prompt_tokens=5, completion_tokens=5)
+    other.add_cached()
+
+    usage.merge(other)
+
+    assert usage.models['m'].requests == 2
+    assert usage.models['m'].prompt_tokens == 11
+    assert usage.models['n'].completion_tokens == 5
+    assert usage.cached_responses == 1
+
+
+def test_requests_are_recorded_by_all_enclosing_contexts():
+    record_request('m', prompt_tokens=1, completion_tokens=1)   # not tracked
+
+    with tracking_usage() as outer:
+        record_request('m', prompt_tokens=10, completion_tokens=1)
+        with tracking_usage() as inner:
+            record_request('m', prompt_tokens=100, completion_tokens=1)
+            record_cached_response()
+
+    assert outer.prompt_tokens == 110
+    assert inner.prompt_tokens == 100
+    assert outer.cached_responses == inner.cached_responses == 1
+
+
+def test_tracking_follows_copied_contexts_into_threads():
+    with tracking_usage() as usage:
+        threads = [
+            threading.Thread(target=contextvars.copy_context().run, args=(record_request, 'm'), kwargs={'prompt_tokens': 1, 'completion_tokens': 1})
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert usage.requests == 8
+
+
+def test_cached_tokens_use_discounted_price():
+    usage = Usage()
+    usage.add('m', prompt_tokens=1_000_000, completion_tokens=0, cached_tokens=400_000)
+
+    assert usage.cached_tokens == 400_000
+    assert usage.cost({'m': (1.0, 4.0, 0.25)}) == pytest.approx(0.6 + 0.1)
+    assert usage.cost({'m': (1.0, 4.0)}) == pytest.approx(1.0)
+
+
+def test_api_usage_is_recorded_with_cached_tokens():
+    response = SimpleNamespace(usage=SimpleNamespace(
+        prompt_tokens=1200,
+        completion_tokens=80,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=1024),
+    ))
+
+    with tracking_usage() as usage:
+        _record_usage(response, model='m')
+        _record_usage(SimpleNamespace(usage=None), model='m')
+
+    assert usage.requests == 2
+    assert usage.prompt_tokens == 1200
+    assert usage.cached_tokens == 1024
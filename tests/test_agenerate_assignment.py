@@ -0,0 +1,45 @@
+import asyncio
+from sql_error_taxonomy import SqlErrors
+from sql_assignment_generator import agenerate_assignment, generate_assignment
+from sql_assignment_generator.difficulty_level import DifficultyLevel
+
+
+DATASET_SQL = '''
+CREATE TABLE customers (id INT PRIMARY KEY, name VARCHAR(50), score INT);
+INSERT INTO customers (id, name, score) VALUES (1, 'a', 3), (2, 'b', 5), (3, 'c', 1);
+'''
+
+ERRORS = [
+    (SqlErrors.LOG_52_OR_INSTEAD_OF_AND, DifficultyLevel.EASY),
+    (SqlErrors.LOG_53_EXTRANEOUS_NOT_OPERATOR, DifficultyLevel.EASY),
+    (SqlErrors.LOG_58_JOIN_ON_INCORRECT_TABLE, DifficultyLevel.EASY),
+]
+
+
+def _generate(function, **kwargs):
+    return function(ERRORS, '', 0, '', '', dataset_str=DATASET_SQL, embedded_db=True, **kwargs)
+
+
+def test_agenerate_assignment(scripted_llm):
+    fake = scripted_llm()
+    assignment = asyncio.run(_generate(agenerate_assignment, max_concurrency=2))
+
+    assert assignment.dataset.create_commands
+    assert [exercise.error for exercise in assignment.exercises] == [error for error, _ in ERRORS]
+    assert [exercise.difficulty for exercise in assignment.exercises] == [difficulty for _, difficulty in ERRORS]
+    assert len({exercise.solutions[0].sql for exercise in assignment.exercises}) == len(ERRORS)
+    assert fake.calls == {'Assignment': 3, 'RemoveHints': 3}
+
+
+def test_agenerate_assignment_retries_duplicates_like_generate_assignment(scripted_llm):
+    # every other request repeats the previous solution
+    solution = lambda call: f'SELECT name FROM customers WHERE score > {call // 2} AND id < 100'
+
+    sync_llm = scripted_llm(solution)
+    generated = _generate(generate_assignment, max_workers=1)
+
+    async_llm = scripted_llm(solution)
+    agenerated = asyncio.run(_generate(agenerate_assignment, max_concurrency=1))
+
+    assert [exercise.solutions[0].sql for exercise in agenerated.exercises] == [exercise.solutions[0].sql for exercise in generated.exercises]
+    assert async_llm.calls == sync_llm.calls
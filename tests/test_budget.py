@@ -0,0 +1,41 @@
+import time
+import pytest
+from sql_assignment_generator.budget import Budget
+from sql_assignment_generator.exceptions import BudgetExhaustedError
+from sql_assignment_generator.llm.usage import record_request
+
+
+def test_unlimited_budget_is_never_exhausted():
+    budget = Budget()
+    with budget.tracking():
+        record_request('m', prompt_tokens=10**9, completion_tokens=10**9)
+
+    assert not budget.exhausted()
+    budget.check('anything')
+
+
+def test_token_budget_counts_tracked_requests_only():
+    budget = Budget(tokens=100)
+    record_request('m', prompt_tokens=1000, completion_tokens=0)
+    assert not budget.exhausted()
+
+    with budget.tracking():
+        record_request('m', prompt_tokens=60, completion_tokens=30)
+    assert not budget.exhausted()
+
+    with budget.tracking():
+        record_request('m', prompt_tokens=5, completion_tokens=5)
+    assert budget.exhausted()
+
+    with pytest.raises(BudgetExhaustedError, match='token budget'):
+        budget.check('generating exercise')
+
+
+def test_time_budget():
+    budget = Budget(seconds=0.05)
+    assert not budget.exhausted()
+
+    time.sleep(0.06)
+
+    with pytest.raises(BudgetExhaustedError, match='time budget'):
+        budget.check('generating dataset')
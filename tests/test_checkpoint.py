@@ -0,0 +1,119 @@
+import json
+import pytest
+from sql_error_taxonomy import SqlErrors
+from sqlscope import Query
+from sql_assignment_generator import generate_assignment, iter_assignment, generation
+from sql_assignment_generator.assignments import Dataset, Exercise, ExerciseResult
+from sql_assignment_generator.assignments.exercise.fingerprint import solution_fingerprint
+from sql_assignment_generator.checkpoint import Checkpoint
+from sql_assignment_generator.difficulty_level import DifficultyLevel
+from sql_assignment_generator.error_requirements import ERROR_REQUIREMENTS_MAP
+
+
+DATASET_SQL = '''
+CREATE TABLE customers (id INT PRIMARY KEY, name VARCHAR(50), score INT);
+INSERT INTO customers (id, name, score) VALUES (1, 'a', 3), (2, 'b', 5);
+'''
+
+ERRORS = [(error, DifficultyLevel.EASY) for error in list(ERROR_REQUIREMENTS_MAP)[:4]]
+
+
+def test_spec_mismatch_is_rejected(tmp_path):
+    Checkpoint(str(tmp_path), {'errors': [['A', 'EASY']]})
+    Checkpoint(str(tmp_path), {'errors': [['A', 'EASY']]})
+
+    with pytest.raises(ValueError):
+        Checkpoint(str(tmp_path), {'errors': [['B', 'EASY']]})
+
+
+def test_only_saved_solutions_are_persisted(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path), {})
+    catalog = Dataset.from_sql(DATASET_SQL, 'postgres').catalog
+    exercise = Exercise(title='t', request='r', solutions=[Query('SELECT name FROM customers', catalog=catalog)],
+                        difficulty=DifficultyLevel.EASY, error=ERRORS[0][0])
+
+    checkpoint.save_exercise(0, exercise, 'a')
+    checkpoint.save_exercise(1, exercise, 'b')
+
+    assert Checkpoint(str(tmp_path), {}).load_solutions() == {'a', 'b'}
+
+
+def test_order_is_restored(tmp_path):
+    Checkpoint(str(tmp_path), {}).restore_order(['c', 'a', 'b'], [2, 0, 1])
+
+    assert Checkpoint(str(tmp_path), {}).restore_order(['a', 'b', 'c'], [0, 1, 2]) == ['c', 'a', 'b']
+
+
+def _fake_generator(calls: list[int], failing: set[int]):
+    '''Replacement for `_generate_exercise` that records the requested indices and fails for those in `failing`.'''
+
+    def generate(position, index, error, requirement, difficulty, dataset_schema, *, dataset, generated_solutions, checkpoint, **kwargs):
+        calls.append(index)
+        if index in failing:
+            return ExerciseResult(index=index, position=position, error=error, difficulty=difficulty, exercise=None)
+
+        solution = f'SELECT name FROM customers WHERE score > {index}'
+        generated_solutions.register(f'fingerprint-{index}')
+        exercise = Exercise(
+            title=f'exercise {index}',
+            request=f'request {index}',
+            solutions=[Query(solution, catalog=dataset.catalog)],
+            difficulty=difficulty,
+            error=error,
+        )
+        checkpoint.save_exercise(index, exercise, f'fingerprint-{index}')
+        return ExerciseResult(index=index, position=position, error=error, difficulty=difficulty, exercise=exercise)
+
+    return generate
+
+
+def test_resume_generates_only_missing_exercises(tmp_path, monkeypatch):
+    generate = lambda: generate_assignment(
+        ERRORS, 'localhost', 0, '', '',
+        dataset_str=DATASET_SQL,
+        shuffle_exercises=True,
+        reuse_dataset_schema=False,
+        max_workers=1,
+        checkpoint_dir=str(tmp_path),
+    )
+
+    first_calls: list[int] = []
+    monkeypatch.setattr(generation, '_generate_exercise', _fake_generator(first_calls, failing={1, 3}))
+    first = generate()
+
+    resumed_calls: list[int] = []
+    monkeypatch.setattr(generation, '_generate_exercise', _fake_generator(resumed_calls, failing=set()))
+    resumed = generate()
+
+    assert sorted(first_calls) == [0, 1, 2, 3]
+    assert sorted(resumed_calls) == [1, 3]
+
+    # exercises keep the (shuffled) order of the first run
+    assert [exercise.title for exercise in first.exercises] == [f'exercise {index}' for index in first_calls if index not in {1, 3}]
+    assert [exercise.title for exercise in resumed.exercises] == [f'exercise {index}' for index in first_calls]
+
+    with open(tmp_path / 'solutions.json') as f:
+        assert set(json.load(f)) == {f'fingerprint-{index}' for index in range(4)}
+
+
+def test_exercises_are_saved_when_they_complete(tmp_path, scripted_llm):
+    # the first exercise completes quickly, the others are still running when the consumer stops
+    scripted_llm(delay=lambda call: 0 if call == 0 else 0.2)
+    errors = [
+        (SqlErrors.LOG_52_OR_INSTEAD_OF_AND, DifficultyLevel.EASY),
+        (SqlErrors.LOG_53_EXTRANEOUS_NOT_OPERATOR, DifficultyLevel.EASY),
+        (SqlErrors.LOG_58_JOIN_ON_INCORRECT_TABLE, DifficultyLevel.EASY),
+    ]
+
+    results = iter_assignment(errors, '', 0, '', '', dataset_str=DATASET_SQL, embedded_db=True,
+                              max_workers=len(errors), checkpoint_dir=str(tmp_path))
+    next(results)   # the dataset
+    next(results)
+    results.close()
+
+    # each persisted fingerprint belongs to a saved exercise
+    checkpoint = generation._open_checkpoint(str(tmp_path), errors, sql_dialect='postgres', language='en', domain=None, dataset_str=DATASET_SQL, dataset_rows=None)
+    catalog = checkpoint.load_dataset().catalog
+    saved = checkpoint.load_exercises(catalog)
+    assert len(saved) >= 1
+    assert checkpoint.load_solutions() == {solution_fingerprint(exercise.solutions[0].sql, catalog=catalog) for exercise in saved.values()}
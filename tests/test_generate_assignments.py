@@ -0,0 +1,60 @@
+from sql_error_taxonomy import SqlErrors
+from sql_assignment_generator.generation import _dataset_groups, generate_assignments
+from sql_assignment_generator.assignments import AssignmentSpec
+from sql_assignment_generator.difficulty_level import DifficultyLevel
+
+
+ERRORS = [(next(iter(SqlErrors)), DifficultyLevel.EASY)]
+
+
+def test_specs_with_same_domain_and_dataset_share_it():
+    specs = [
+        AssignmentSpec(ERRORS),
+        AssignmentSpec(ERRORS, domain='library'),
+        AssignmentSpec(ERRORS),
+        AssignmentSpec(ERRORS, domain='library', shuffle_exercises=True),
+        AssignmentSpec(ERRORS, domain='library', dataset_str='CREATE TABLE t (id INT);'),
+        AssignmentSpec(ERRORS, dataset_str=''),
+    ]
+
+    assert _dataset_groups(specs, share_datasets=True) == [[0, 2, 5], [1, 3], [4]]
+
+
+def test_datasets_are_not_shared_on_request():
+    specs = [AssignmentSpec(ERRORS), AssignmentSpec(ERRORS)]
+
+    assert _dataset_groups(specs, share_datasets=False) == [[0], [1]]
+
+
+DATASET_ERRORS = [
+    (SqlErrors.LOG_52_OR_INSTEAD_OF_AND, DifficultyLevel.EASY),
+    (SqlErrors.LOG_53_EXTRANEOUS_NOT_OPERATOR, DifficultyLevel.EASY),
+]
+
+
+def test_batch_shares_datasets_and_deduplicates_solutions(scripted_llm):
+    # every other request repeats the previous solution
+    fake = scripted_llm(lambda call: f'SELECT name FROM customers WHERE score > {call // 2} AND id < 100', failing_domains=('broken',))
+
+    specs = [
+        AssignmentSpec(DATASET_ERRORS, domain='shop'),
+        AssignmentSpec(DATASET_ERRORS, domain='shop'),
+        AssignmentSpec(DATASET_ERRORS, domain='broken'),
+        AssignmentSpec([(SqlErrors.SYN_1_OMITTING_CORRELATION_NAMES, DifficultyLevel.EASY)]),
+    ]
+    assignments = generate_assignments(specs, '', 0, '', '', embedded_db=True, max_dataset_attempts=1)
+
+    first, second, broken, unsupported = assignments
+    assert broken is None
+    assert unsupported is None
+
+    assert first is not None and second is not None
+    assert first.dataset is second.dataset
+    assert len(first.exercises) == len(second.exercises) == len(DATASET_ERRORS)
+
+    solutions = [exercise.solutions[0].sql for assignment in (first, second) for exercise in assignment.exercises]
+    assert len(set(solutions)) == len(solutions)
+    assert fake.calls['Assignment'] > len(solutions)    # duplicates were rejected and regenerated
+
+    # one dataset for the two shop assignments, one failed attempt for the broken one
+    assert fake.calls['Schema'] == 2
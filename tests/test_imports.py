@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+import pytest
+
+
+def _loaded_after_import(module: str, candidates: list[str]) -> list[str]:
+    '''Import `module` in a new interpreter without an OpenAI API key, and return which of `candidates` were imported.'''
+
+    environment = {name: value for name, value in os.environ.items() if name != 'OPENAI_API_KEY'}
+    script = f'import sys, {module}; print(",".join(name for name in {candidates!r} if name in sys.modules))'
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True, env=environment)
+    return [name for name in output.stdout.strip().split(',') if name]
+
+
+@pytest.mark.parametrize('module', [
+    'sql_assignment_generator.generation',
+    'sql_assignment_generator.constraints',
+])
+def test_heavy_dependencies_are_imported_on_first_use(module):
+    assert _loaded_after_import(module, [
+        'openai',
+        'dotenv',
+        'mysql.connector',
+        'sql_assignment_generator.db.drivers.mysql',
+        'sql_assignment_generator.db.drivers.postgresql',
+        'sql_assignment_generator.error_requirements.err_002',
+    ]) == []
+
+
+def test_constraints_do_not_import_generation():
+    assert _loaded_after_import('sql_assignment_generator.constraints', [
+        'sql_assignment_generator.generation',
+        'sql_assignment_generator.llm',
+        'sql_assignment_generator.db',
+    ]) == []
+
+
+def test_lazy_attributes_resolve():
+    from sql_assignment_generator import generate_assignment, generation
+    from sql_assignment_generator.db import SQLiteDatabase
+    from sql_assignment_generator.db.drivers import SQLiteDatabase as DriverSQLiteDatabase
+    from sql_assignment_generator.error_requirements import ERROR_REQUIREMENTS_MAP, Err002_AmbiguousColumn
+    from sql_error_taxonomy import SqlErrors
+
+    assert generate_assignment is generation.generate_assignment
+    assert SQLiteDatabase is DriverSQLiteDatabase
+    assert ERROR_REQUIREMENTS_MAP[SqlErrors.SYN_2_AMBIGUOUS_COLUMN] is Err002_AmbiguousColumn
+    assert SqlErrors.SYN_2_AMBIGUOUS_COLUMN in ERROR_REQUIREMENTS_MAP
+    assert len(list(ERROR_REQUIREMENTS_MAP)) == len(ERROR_REQUIREMENTS_MAP)
+
+
+def test_public_names_resolve():
+    import sql_assignment_generator
+    from sql_assignment_generator import Exercise, llm
+    from sql_assignment_generator.assignments.exercise.exercise import Exercise as ModuleExercise
+    from sql_assignment_generator.llm import generate_answer
+
+    for name in sql_assignment_generator._LAZY_ATTRIBUTES:
+        assert getattr(sql_assignment_generator, name) is not None
+
+    assert Exercise is ModuleExercise
+    assert llm.generate_answer is generate_answer
+
+    with pytest.raises(AttributeError):
+        sql_assignment_generator.missing
@@ -0,0 +1,107 @@
+import asyncio
+import pytest
+from sql_error_taxonomy import SqlErrors
+from sql_assignment_generator import aiter_assignment, iter_assignment
+from sql_assignment_generator.assignments import Dataset, ExerciseResult
+from sql_assignment_generator.db.drivers import SQLiteDatabase
+from sql_assignment_generator.difficulty_level import DifficultyLevel
+
+
+DATASET_SQL = '''
+CREATE TABLE customers (id INT PRIMARY KEY, name VARCHAR(50), score INT);
+INSERT INTO customers (id, name, score) VALUES (1, 'a', 3), (2, 'b', 5), (3, 'c', 1);
+'''
+
+ERRORS = [
+    (SqlErrors.LOG_52_OR_INSTEAD_OF_AND, DifficultyLevel.EASY),
+    (SqlErrors.LOG_53_EXTRANEOUS_NOT_OPERATOR, DifficultyLevel.EASY),
+    (SqlErrors.LOG_58_JOIN_ON_INCORRECT_TABLE, DifficultyLevel.EASY),
+    (SqlErrors.LOG_59_JOIN_WHEN_JOIN_NEEDS_TO_BE_OMITTED, DifficultyLevel.EASY),
+]
+
+
+def _call(result: ExerciseResult) -> int:
+    '''Number of the LLM request that produced the solution of `result` (see `unique_solution`).'''
+    assert result.exercise is not None
+    return int(result.exercise.solutions[0].sql.split('score > ')[1].split()[0])
+
+
+def _shared_schemas() -> list[str]:
+    return [schema for schema in SQLiteDatabase._schemas if schema.startswith('sql_assignment_generator_dataset_')]
+
+
+def _iter(**kwargs):
+    return iter_assignment(ERRORS, '', 0, '', '', dataset_str=DATASET_SQL, embedded_db=True, **kwargs)
+
+
+def _aiter(**kwargs):
+    return aiter_assignment(ERRORS, '', 0, '', '', dataset_str=DATASET_SQL, embedded_db=True, **kwargs)
+
+
+def _check_results(results: list[ExerciseResult]) -> None:
+    '''Each requested exercise has exactly one result, consistent with the requested error and difficulty.'''
+
+    assert sorted(result.position for result in results) == list(range(len(ERRORS)))
+    assert sorted(result.index for result in results) == list(range(len(ERRORS)))
+    for result in results:
+        assert (result.error, result.difficulty) == ERRORS[result.index]
+        assert result.position == result.index      # not shuffled
+
+
+def test_iter_yields_dataset_then_results_in_completion_order(scripted_llm):
+    # the earlier requests take longer, so exercises complete in the opposite order
+    scripted_llm(delay=lambda call: 0.1 * (len(ERRORS) - call))
+
+    items = list(_iter(max_workers=len(ERRORS)))
+
+    assert isinstance(items[0], Dataset)
+    results = items[1:]
+    _check_results(results)
+    assert [_call(result) for result in results] == [3, 2, 1, 0]
+
+
+def test_aiter_yields_dataset_then_results_in_completion_order(scripted_llm):
+    scripted_llm(delay=lambda call: 0.1 * (len(ERRORS) - call))
+
+    async def collect():
+        return [item async for item in _aiter(max_concurrency=len(ERRORS))]
+
+    items = asyncio.run(collect())
+
+    assert isinstance(items[0], Dataset)
+    results = items[1:]
+    _check_results(results)
+    assert [_call(result) for result in results] == [3, 2, 1, 0]
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_stopping_iter_early_cancels_pending_exercises(scripted_llm, max_workers):
+    fake = scripted_llm(delay=lambda call: 0.05)
+
+    results = _iter(max_workers=max_workers)
+    assert isinstance(next(results), Dataset)
+    assert isinstance(next(results), ExerciseResult)
+    assert _shared_schemas()
+
+    results.close()
+
+    # exercises already running are completed, the others are never started
+    assert fake.calls['Assignment'] <= max_workers + 1
+    assert _shared_schemas() == []
+
+
+def test_stopping_aiter_early_cancels_pending_exercises(scripted_llm):
+    fake = scripted_llm(delay=lambda call: 0.05)
+
+    async def first_result():
+        results = _aiter(max_concurrency=1)
+        assert isinstance(await anext(results), Dataset)
+        assert isinstance(await anext(results), ExerciseResult)
+        assert _shared_schemas()
+
+        await results.aclose()
+
+    asyncio.run(first_result())
+
+    assert fake.calls['Assignment'] <= 2
+    assert _shared_schemas() == []
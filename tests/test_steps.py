@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from sql_assignment_generator.steps import step, run_steps, arun_steps
+
+
+def _logic(log: list[str]):
+    '''Adds two results, recovering from a failed step.'''
+
+    first = yield step(lambda x: x * 2, None, 1)
+    try:
+        yield step(_fail, None)
+    except ValueError as e:
+        log.append(str(e))
+    second = yield step(lambda: 10, _async_ten)
+    return first + second
+
+
+def _fail():
+    raise ValueError('failed')
+
+
+async def _async_ten():
+    await asyncio.sleep(0)
+    return 10
+
+
+def test_sync_and_async_runners_agree():
+    sync_log: list[str] = []
+    async_log: list[str] = []
+
+    assert run_steps(_logic(sync_log)) == 12
+    assert asyncio.run(arun_steps(_logic(async_log))) == 12
+    assert sync_log == async_log == ['failed']
+
+
+def test_unhandled_errors_propagate():
+    def logic():
+        yield step(_fail, None)
+
+    with pytest.raises(ValueError):
+        run_steps(logic())
+    with pytest.raises(ValueError):
+        asyncio.run(arun_steps(logic()))
+
+
+def test_cancellation_reaches_the_logic():
+    cleaned_up = []
+
+    def logic():
+        try:
+            yield step(lambda: None, asyncio.sleep, 10)
+        finally:
+            cleaned_up.append(True)
+
+    async def scenario():
+        task = asyncio.ensure_future(arun_steps(logic()))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert cleaned_up == [True]
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import pytest
+from sql_assignment_generator import tracing
+from sql_assignment_generator.assignments import Exercise
+
+
+def test_spans_are_nested():
+    with tracing.collecting() as collector:
+        with tracing.span('outer', kind='test') as outer:
+            with tracing.span('inner') as inner:
+                tracing.increment('items', 2, color='red')
+            outer.set(outcome='done')
+
+    assert [span.name for span in collector.spans] == ['inner', 'outer']
+    assert inner.parent_id == outer.span_id
+    assert outer.parent_id is None
+    assert outer.attributes == {'kind': 'test', 'outcome': 'done'}
+    assert outer.duration >= inner.duration
+    assert collector.counters == [('items', 2, inner.span_id, {'color': 'red'})]
+
+
+def test_counter_totals_filter_by_attributes():
+    with tracing.collecting() as collector:
+        tracing.increment('failures', constraint='A')
+        tracing.increment('failures', constraint='B')
+        tracing.increment('failures', constraint='A')
+
+    assert collector.total('failures') == 3
+    assert collector.total('failures', constraint='A') == 2
+    assert collector.total('missing') == 0
+
+
+def test_span_records_exceptions():
+    with tracing.collecting() as collector:
+        with pytest.raises(ValueError):
+            with tracing.span('failing'):
+                raise ValueError('boom')
+
+    assert collector.spans[0].attributes == {'exception': 'ValueError'}
+
+
+def test_nothing_is_recorded_after_removal():
+    collector = tracing.MemoryCollector()
+    with tracing.collecting(collector):
+        tracing.increment('before')
+
+    with tracing.span('after') as span:
+        span.set(ignored=True)
+        tracing.increment('after')
+
+    assert collector.total('before') == 1
+    assert collector.total('after') == 0
+    assert collector.spans == []
+
+
+def test_spans_nest_across_tasks():
+    with tracing.collecting() as collector:
+        with tracing.span('parent') as parent:
+            async def child():
+                with tracing.span('task'):
+                    await asyncio.sleep(0)
+
+            async def main():
+                await asyncio.gather(child(), child())
+
+            asyncio.run(main())
+
+    tasks = [span for span in collector.spans if span.name == 'task']
+    assert len(tasks) == 2
+    assert all(span.parent_id == parent.span_id for span in tasks)
+
+
+def test_candidate_checks_are_nested_in_caller_span():
+    def check(answer):
+        with tracing.span('check', answer=answer):
+            return f'query:{answer}', []
+
+    with tracing.collecting() as collector:
+        with tracing.span('attempt') as attempt:
+            Exercise._first_valid(['a', 'b'], check)
+
+    checks = [span for span in collector.spans if span.name == 'check']
+    assert checks
+    assert all(span.parent_id == attempt.span_id for span in checks)
+
+
+def test_json_lines_collector(tmp_path):
+    path = tmp_path / 'trace' / 'run.jsonl'
+    collector = tracing.JsonLinesCollector(str(path))
+
+    with tracing.collecting(collector):
+        with tracing.span('stage', attempt=1):
+            tracing.increment('tokens', 10, model='m')
+    collector.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record['type'] for record in records] == ['counter', 'span']
+    assert records[0]['name'] == 'tokens' and records[0]['value'] == 10
+    assert records[0]['span_id'] == records[1]['span_id']
+    assert records[1]['name'] == 'stage' and records[1]['attributes'] == {'attempt': 1}